@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "book_reading_service.settings")
+# The sync code of every request runs in a thread of its own under ASGI, a
+# connection kept open would never be reused
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
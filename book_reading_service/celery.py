@@ -0,0 +1,9 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "book_reading_service.settings")
+
+app = Celery("book_reading_service")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
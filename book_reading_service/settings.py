@@ -31,6 +31,9 @@ SECRET_KEY = "django-insecure-r5gm*x&3vcwo25ihub$!v*h)y&h^=v6u=j7%u3cc*rdl40h6sj
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# The toolbar instruments every request, it is only enabled for development
+DEBUG_TOOLBAR = DEBUG and os.environ.get("DEBUG_TOOLBAR", "1") == "1"
+
 ALLOWED_HOSTS = []
 
 INTERNAL_IPS = [
@@ -48,16 +51,16 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "rest_framework",
-    'rest_framework_simplejwt',
+    "rest_framework_simplejwt",
     "drf_spectacular",
-    "debug_toolbar",
     "reader",
     "user",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "reader.metrics.MetricsMiddleware",
+    "reader.middleware.QueryInstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -66,6 +69,10 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(3, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "book_reading_service.urls"
 
 TEMPLATES = [
@@ -91,13 +98,148 @@ WSGI_APPLICATION = "book_reading_service.wsgi.application"
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "HOST": os.environ["POSTGRES_HOST"],
-        "NAME": os.environ["POSTGRES_DB"],
-        "USER": os.environ["POSTGRES_USER"],
-        "PASSWORD": os.environ["POSTGRES_PASSWORD"],
+if os.environ.get("DB_ENGINE") == "sqlite":
+    # Local runs and benchmarks without a PostgreSQL server
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+        },
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "HOST": os.environ["POSTGRES_HOST"],
+            "NAME": os.environ["POSTGRES_DB"],
+            "USER": os.environ["POSTGRES_USER"],
+            "PASSWORD": os.environ["POSTGRES_PASSWORD"],
+            "PORT": os.environ.get("POSTGRES_PORT", ""),
+            # Connections are kept open across requests for this many
+            # seconds, 0 closes them after every request. A connection that
+            # broke in between is replaced before it is used again
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+            "CONN_HEALTH_CHECKS": True,
+            # pgbouncer in transaction pooling mode hands out a server
+            # connection per transaction, a cursor cannot outlive it
+            "DISABLE_SERVER_SIDE_CURSORS": os.environ.get("DB_POOLER") == "pgbouncer",
+        },
+    }
+    # Full text search and the trigram lookups of the book search
+    INSTALLED_APPS.append("django.contrib.postgres")
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+
+# Whether every process of the service reads the same cache. The book pages
+# and the versions of the ETags are only cached in a shared cache, the local
+# memory of one process is not invalidated by the changes made in the others
+SHARED_CACHE = (
+    bool(os.environ.get("REDIS_URL")) or os.environ.get("SINGLE_PROCESS") == "1"
+)
+
+# Seconds the serialized book list pages and details are cached for
+BOOK_CACHE_TIMEOUT = int(os.environ.get("BOOK_CACHE_TIMEOUT", 60 * 15))
+
+# JSON of the book and reading session lists built from .values() rows
+# instead of the serializers, the output is the same
+FAST_JSON_LISTS = os.environ.get("FAST_JSON_LISTS", "1") == "1"
+
+# Rows fetched per round trip by the streamed reading session exports
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))
+
+# Celery
+# https://docs.celeryq.dev/en/stable/django/first-steps-with-django.html
+
+# Without a broker the profiles are only updated incrementally and nothing
+# is scheduled, the test runner runs the tasks eagerly instead
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "")
+CELERY_TASK_EAGER_PROPAGATES = True
+
+# Seconds a profile rebuild waits for more reading session events, that
+# single rebuild reconciles the counters with all of them
+PROFILE_REBUILD_DELAY = int(os.environ.get("PROFILE_REBUILD_DELAY", 5))
+# Seconds after which a rebuild that never ran is scheduled again
+PROFILE_REBUILD_TIMEOUT = 60
+
+# Rows kept per leaderboard and seconds between two refreshes, run by
+# celery beat or the refresh_leaderboards command
+LEADERBOARD_SIZE = 100
+LEADERBOARD_REFRESH_INTERVAL = int(os.environ.get("LEADERBOARD_REFRESH_INTERVAL", 300))
+
+CELERY_BEAT_SCHEDULE = {
+    "refresh-leaderboards": {
+        "task": "reader.tasks.refresh_leaderboards",
+        "schedule": LEADERBOARD_REFRESH_INTERVAL,
+    },
+}
+
+# Maximum number of SQL queries per request of a view, including the query
+# of the JWT authentication. Exceeding a budget raises when strict (the
+# test runner turns it on) and logs a warning otherwise
+QUERY_BUDGETS = {
+    "BookViewSet.list": 5,
+    "BookViewSet.retrieve": 5,
+    "BookViewSet.create": 10,
+    "BookViewSet.update": 10,
+    "BookViewSet.partial_update": 10,
+    "BookViewSet.destroy": 10,
+    "BookViewSet.bulk": 20,
+    "BookViewSet.activity": 3,
+    "BookViewSet.top": 3,
+    "ReadingSessionViewSet.list": 4,
+    "ReadingSessionViewSet.retrieve": 3,
+    # The first session of a book while another one is active, the stats
+    # rows of the book are created and the active session is stopped
+    "ReadingSessionViewSet.create": 19,
+    "ReadingSessionViewSet.stop_reading": 8,
+    "ReadingSessionViewSet.bulk": 16,
+    "ReadingSessionViewSet.export": 2,
+    "ReadingSessionViewSet.export_all": 2,
+    "ProfileViewSet.list": 4,
+    "ProfileViewSet.retrieve": 3,
+    "ProfileViewSet.books": 3,
+    "ProfileViewSet.activity": 2,
+    "ReaderViewSet.top": 3,
+    "AsyncReadingSessionViewSet.list": 4,
+    # The start of ReadingSessionViewSet.create without its savepoint
+    "AsyncReadingSessionViewSet.create": 17,
+    # The stopped session is loaded after the UPDATE, there is no RETURNING
+    "AsyncReadingSessionViewSet.stop_reading": 9,
+}
+QUERY_BUDGET_STRICT = os.environ.get("QUERY_BUDGET_STRICT") == "1"
+
+# Bearer token required to scrape /metrics, open when empty
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+TEST_RUNNER = "book_reading_service.test_runner.TestRunner"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        # INFO logs a JSON line with the queries of every request
+        "reader.queries": {
+            "handlers": ["console"],
+            "level": os.environ.get("QUERY_LOG_LEVEL", "WARNING"),
+        },
     },
 }
 
@@ -173,6 +315,8 @@ SPECTACULAR_SETTINGS = {
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=5),  # in commercial project it must be 5min
-    "REFRESH_TOKEN_LIFETIME": timedelta(days=30),  # in commercial project it must be 7days
+    "REFRESH_TOKEN_LIFETIME": timedelta(
+        days=30
+    ),  # in commercial project it must be 7days
     "ROTATE_REFRESH_TOKENS": False,
 }
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+from book_reading_service.celery import app
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # A view that runs more queries than its budget fails the test
+        settings.QUERY_BUDGET_STRICT = True
+        # The tasks run in the test process, there is no broker
+        app.conf.task_always_eager = True
+        # Its local memory cache is shared by every request
+        settings.SHARED_CACHE = True
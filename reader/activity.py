@@ -0,0 +1,62 @@
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+
+GRANULARITIES = ("day", "week", "month")
+
+# Periods returned when the request has no start date
+DEFAULT_PERIODS = {"day": 30, "week": 26, "month": 12}
+MAX_PERIODS = 400
+
+
+def split_by_day(start, end):
+    """
+    Split the time between start and end at the midnights of TIME_ZONE,
+    returns (local date, reading time) pairs.
+    """
+    if not start or not end or end <= start:
+        return []
+
+    tz = timezone.get_default_timezone()
+    day = timezone.localtime(start, tz).date()
+    parts = []
+    while start < end:
+        day_end = datetime.combine(day + timedelta(days=1), time(), tzinfo=tz)
+        # Aware datetimes of the same zone are subtracted without their
+        # offsets, UTC keeps the days around DST changes right
+        day_end = min(day_end.astimezone(dt_timezone.utc), end)
+        parts.append((day, day_end - start))
+        start = day_end
+        day += timedelta(days=1)
+    return parts
+
+
+def truncate(day, granularity):
+    # First day of the period, weeks start on Monday like TruncWeek
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_period(day, granularity):
+    if granularity == "week":
+        return day + timedelta(days=7)
+    if granularity == "month":
+        return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+    return day + timedelta(days=1)
+
+
+def periods(start, end, granularity):
+    period = truncate(start, granularity)
+    while period <= end:
+        yield period
+        period = next_period(period, granularity)
+
+
+def default_start(end, granularity):
+    start = truncate(end, granularity)
+    for _ in range(DEFAULT_PERIODS[granularity] - 1):
+        start = truncate(start - timedelta(days=1), granularity)
+    return start
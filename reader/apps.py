@@ -6,4 +6,5 @@ class ReaderConfig(AppConfig):
     name = "reader"
 
     def ready(self):
+        import reader.checks
         import reader.signals.signals
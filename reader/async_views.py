@@ -0,0 +1,108 @@
+import asyncio
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+from . import cache as book_cache
+from .models import ReadingSession
+from .serializers import ReadingSessionSerializer
+from .views import ReadingSessionViewSet, aconditional_response
+
+# The hot path of the reading sessions on the async ORM. The authentication,
+# permissions, throttles, validation, pagination and rendering are those of
+# ReadingSessionViewSet, only the queries of the handlers are async
+
+
+class AsyncReadingSessionViewSet(ReadingSessionViewSet):
+    """
+    Start, stop and list the reading sessions of the user with acreate,
+    aupdate, aget, acount and async iteration, served at
+    /api/reader/async/reading-sessions/.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+
+        # The view returns the coroutine of adispatch, Django only awaits
+        # views that are coroutine functions
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        return update_wrapper(async_view, view)
+
+    def dispatch(self, request, *args, **kwargs):
+        return self.adispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        # APIView.dispatch with the handler awaited, the checks of initial()
+        # are sync and run in a thread like the DRF views under ASGI
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            handler = self.http_method_not_allowed
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), handler)
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def list(self, request, *args, **kwargs):
+        versions = await sync_to_async(book_cache.user_versions)(request.user.id)
+        return await aconditional_response(request, versions, self.list_page)
+
+    async def list_page(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = None
+        if self.lists_values():
+            rows, queryset = self.get_values_queryset(queryset)
+
+        page = await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+        if rows is not None:
+            return self.get_paginated_response(rows.convert(page))
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    async def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        # The validation looks up the book
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        serializer.instance = await serializer.acreate(serializer.validated_data)
+
+        headers = self.get_success_headers(serializer.data)
+        return Response(
+            serializer.data, status=status.HTTP_201_CREATED, headers=headers
+        )
+
+    async def stop_reading(self, request, pk=None):
+        session_id = self.get_session_id(pk)
+        reading_session = await ReadingSession.objects.astop(
+            session_id, user_id=request.user.id
+        )
+
+        if reading_session is None:
+            if not await self.get_queryset().filter(pk=session_id).aexists():
+                raise NotFound()
+            return Response(
+                {"detail": "Reading session has already been completed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = ReadingSessionSerializer(reading_session)
+        return Response(serializer.data)
@@ -0,0 +1,340 @@
+import http.client
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from reader.models import ReadingSession
+from reader.renderers import FastJSONRenderer
+from reader.rows import ValuesSerializer
+from reader.views import BookViewSet, ReadingSessionViewSet
+
+DEFAULT_PAGE_SIZES = (10, 50, 100)
+# The benchmarks clear and fill a cache of their own, never the cache the
+# running service shares, e.g. Redis
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmark",
+    }
+}
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "min": timings[0],
+        "median": statistics.median(timings),
+        "p95": (
+            statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        ),
+        "max": timings[-1],
+        "mean": statistics.fmean(timings),
+    }
+
+
+class EndpointBenchmark:
+    """
+    Time and count the queries of the reader endpoints for one user.
+
+    Every measurement starts with an untimed warm-up request, the cache
+    is cleared before it so throttling never kicks in.
+    """
+
+    def __init__(self, client, user, books, page_sizes=DEFAULT_PAGE_SIZES, repeat=20):
+        self.client = client
+        self.user = user
+        self.books = books
+        self.page_sizes = page_sizes
+        self.repeat = repeat
+        self.results = []
+
+    def measure(self, name, request, prepare=None, expected_status=200, **labels):
+        cache.clear()
+        request(prepare() if prepare else None)
+
+        timings, queries, errors = [], [], 0
+        for _ in range(self.repeat):
+            argument = prepare() if prepare else None
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = request(argument)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+            errors += response.status_code != expected_status
+
+        self.results.append(
+            {
+                "name": name,
+                **labels,
+                "requests": self.repeat,
+                "errors": errors,
+                "queries": max(queries),
+                "queries_min": min(queries),
+                "ms": summarize(timings),
+            }
+        )
+
+    def run(self):
+        self.client.force_authenticate(user=self.user)
+        with override_settings(CACHES=BENCHMARK_CACHES):
+            self.benchmark_books()
+            self.benchmark_reading_sessions()
+            self.benchmark_profile()
+        return self.results
+
+    def get(self, url, **params):
+        return lambda argument: self.client.get(url, params)
+
+    def benchmark_books(self):
+        url = reverse("reader:book-list")
+        detail_url = reverse("reader:book-detail", args=[self.books[0].pk])
+
+        for page_size in self.page_sizes:
+            request = self.get(url, page_size=page_size)
+            self.measure("book-list", request, cache.clear, page_size=page_size)
+            self.measure("book-list-cached", request, page_size=page_size)
+            self.measure(
+                "book-list-cursor",
+                self.get(url, page_size=page_size, cursor=""),
+                cache.clear,
+                page_size=page_size,
+            )
+        self.measure(
+            "book-search",
+            self.get(url, search=self.books[0].title),
+            cache.clear,
+        )
+        self.measure("book-detail", self.get(detail_url), cache.clear)
+        self.measure("book-detail-cached", self.get(detail_url))
+        self.measure("book-top", self.get(reverse("reader:book-top")))
+        self.measure("reader-top", self.get(reverse("reader:reader-top")))
+        self.measure(
+            "book-activity",
+            self.get(reverse("reader:book-activity", args=[self.books[0].pk])),
+        )
+
+    def benchmark_reading_sessions(self):
+        url = reverse("reader:reading-session-list")
+        for page_size in self.page_sizes:
+            self.measure(
+                "reading-session-list",
+                self.get(url, page_size=page_size),
+                page_size=page_size,
+            )
+
+        books = cycle(self.books)
+        self.measure(
+            "reading-session-create",
+            lambda book: self.client.post(url, {"book": book.pk}),
+            prepare=lambda: next(books),
+            expected_status=201,
+        )
+
+        def start_session():
+            return ReadingSession.objects.start(self.user, self.books[0])
+
+        self.measure(
+            "reading-session-stop",
+            lambda session: self.client.post(
+                reverse("reader:reading-session-stop-reading", args=[session.pk])
+            ),
+            prepare=start_session,
+        )
+
+    def benchmark_profile(self):
+        profile = self.user.profile
+        self.measure(
+            "profile-retrieve",
+            self.get(reverse("reader:profile-detail", args=[profile.pk])),
+        )
+        url = reverse("reader:profile-books")
+        for page_size in self.page_sizes:
+            self.measure(
+                "profile-books", self.get(url, page_size=page_size), page_size=page_size
+            )
+        for granularity in ("day", "week", "month"):
+            self.measure(
+                f"profile-activity-{granularity}",
+                self.get(reverse("reader:profile-activity"), granularity=granularity),
+            )
+
+
+def compare(baseline, results):
+    """
+    Pair the results with a previous run, a change of the query count is
+    reported together with the change of the median time.
+    """
+
+    def key(result):
+        return result["name"], result.get("page_size")
+
+    previous = {key(result): result for result in baseline}
+    changes = []
+    for result in results:
+        before = previous.get(key(result))
+        if not before:
+            continue
+        changes.append(
+            {
+                "name": result["name"],
+                "page_size": result.get("page_size"),
+                "queries": result["queries"] - before["queries"],
+                "median_ms": result["ms"]["median"] - before["ms"]["median"],
+            }
+        )
+    return changes
+
+
+class RenderingBenchmark:
+    """
+    Rows per second of the book and reading session list pages, serialized
+    and rendered by DRF or read with .values() and rendered by the fast
+    path. The rows are fetched once, only the conversion to JSON is timed.
+    """
+
+    def __init__(self, user, page_size=100, repeat=20):
+        self.user = user
+        self.page_size = page_size
+        self.repeat = repeat
+
+    def run(self):
+        results = []
+        for name, viewset in (
+            ("book-list", BookViewSet),
+            ("reading-session-list", ReadingSessionViewSet),
+        ):
+            view = self.get_view(viewset)
+            queryset = view.filter_queryset(view.get_queryset())
+            serializer = view.get_serializer()
+            rows = ValuesSerializer(serializer, view.values_method_fields)
+
+            instances = list(queryset[: self.page_size])
+            values = list(rows.values(queryset)[: self.page_size])
+            renderers = {
+                "serializer": lambda: JSONRenderer().render(
+                    type(serializer)(
+                        instances, many=True, context=serializer.context
+                    ).data
+                ),
+                "values": lambda: FastJSONRenderer().render(rows.convert(values)),
+            }
+            outputs = {path: render() for path, render in renderers.items()}
+
+            for path, render in renderers.items():
+                started = time.perf_counter()
+                for _ in range(self.repeat):
+                    render()
+                seconds = time.perf_counter() - started
+                results.append(
+                    {
+                        "name": name,
+                        "path": path,
+                        "rows": len(instances),
+                        "repeat": self.repeat,
+                        "rows_per_second": len(instances) * self.repeat / seconds,
+                        "same_output": outputs[path] == outputs["serializer"],
+                    }
+                )
+        return results
+
+    def get_view(self, viewset):
+        request = Request(APIRequestFactory().get("/"))
+        request.user = self.user
+        view = viewset(request=request, action="list", format_kwarg=None, kwargs={})
+        view.request = request
+        return view
+
+
+class ConcurrentLoad:
+    """
+    Load a running server with one thread and connection per user, every
+    user starts a reading session, stops it and lists its sessions in a loop.
+    """
+
+    operations = ("start", "stop", "list")
+
+    def __init__(self, host, port, url, tokens, books, iterations=20):
+        self.host = host
+        self.port = port
+        self.url = url
+        self.tokens = tokens
+        self.books = books
+        self.iterations = iterations
+
+    def request(self, connection, token, method, path, data=None):
+        headers = {"Authorization": f"Bearer {token}"}
+        body = None
+        if data is not None:
+            body = json.dumps(data)
+            headers["Content-Type"] = "application/json"
+
+        started = time.perf_counter()
+        connection.request(method, path, body, headers)
+        response = connection.getresponse()
+        content = response.read()
+        return response.status, content, (time.perf_counter() - started) * 1000
+
+    def user(self, token, offset):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        timings = {operation: [] for operation in self.operations}
+        errors = 0
+        try:
+            for iteration in range(self.iterations):
+                book = self.books[(offset + iteration) % len(self.books)]
+                status, content, ms = self.request(
+                    connection, token, "POST", self.url, {"book": book}
+                )
+                timings["start"].append(ms)
+                if status != 201:
+                    errors += 1
+                    continue
+
+                session_id = json.loads(content)["id"]
+                status, _, ms = self.request(
+                    connection, token, "POST", f"{self.url}{session_id}/stop_reading/"
+                )
+                timings["stop"].append(ms)
+                errors += status != 200
+
+                status, _, ms = self.request(connection, token, "GET", self.url)
+                timings["list"].append(ms)
+                errors += status != 200
+        finally:
+            connection.close()
+        return timings, errors
+
+    def run(self):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(len(self.tokens)) as executor:
+            results = list(
+                executor.map(self.user, self.tokens, range(len(self.tokens)))
+            )
+        seconds = time.perf_counter() - started
+
+        timings = {operation: [] for operation in self.operations}
+        for user_timings, _ in results:
+            for operation, values in user_timings.items():
+                timings[operation].extend(values)
+        requests = sum(len(values) for values in timings.values())
+        return {
+            "concurrency": len(self.tokens),
+            "requests": requests,
+            "errors": sum(errors for _, errors in results),
+            "seconds": seconds,
+            "requests_per_second": requests / seconds,
+            "ms": {
+                operation: summarize(values)
+                for operation, values in timings.items()
+                if values
+            },
+        }
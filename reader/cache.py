@@ -0,0 +1,160 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Every change of the catalogue bumps its version, so cached list pages are
+# never deleted one by one, they just stop being looked up
+CATALOGUE_VERSION_KEY = "reader:books:version"
+# Only bumped when books are written, not by the reading stats
+CONTENT_VERSION_KEY = "reader:books:content:version"
+BOOK_VERSION_KEY = "reader:book:{book_id}:version"
+# The sessions, stats and profile of a user, and of every user
+USERS_VERSION_KEY = "reader:users:version"
+USER_VERSION_KEY = "reader:user:{user_id}:version"
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def get_counters():
+    with _counters_lock:
+        return {"hits": _counters["hits"], "misses": _counters["misses"]}
+
+
+def reset_counters():
+    with _counters_lock:
+        _counters.clear()
+
+
+def _new_version():
+    # Unique, the time of the change is the Last-Modified of the responses
+    return f"{time.time():.6f}:{uuid.uuid4().hex}"
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Lost or never set, any new value invalidates what was cached before
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def version_time(*versions):
+    """
+    Timestamp of the latest change of the versions, None if a version has
+    no time.
+    """
+    try:
+        return max(float(version.partition(":")[0]) for version in versions)
+    except ValueError:
+        return None
+
+
+def etag(*parts):
+    # Strong ETag of a representation, parts are e.g. the URL and versions
+    digest = hashlib.sha1(":".join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def catalogue_version():
+    return _get_version(CATALOGUE_VERSION_KEY)
+
+
+def content_version():
+    return _get_version(CONTENT_VERSION_KEY)
+
+
+def list_key(request, user_id=None):
+    """
+    Key of a cached page of the catalogue, shared by all users unless the
+    page depends on the given user.
+    """
+    url = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    if user_id is not None:
+        url = f"{user_id}:{url}"
+    return f"reader:books:list:{catalogue_version()}:{url}"
+
+
+def book_version(book_id):
+    return _get_version(BOOK_VERSION_KEY.format(book_id=book_id))
+
+
+def user_versions(user_id):
+    return [
+        _get_version(USERS_VERSION_KEY),
+        _get_version(USER_VERSION_KEY.format(user_id=user_id)),
+    ]
+
+
+def detail_key(book_id, fields=()):
+    # Sparse fieldsets of the book are cached apart from the full details
+    version = book_version(book_id)
+    fieldset = f":{','.join(fields)}" if fields else ""
+    return f"reader:book:{book_id}:{version}{fieldset}"
+
+
+def fetch(key):
+    data = cache.get(key)
+    _count("misses" if data is None else "hits")
+    return data
+
+
+def store(key, data):
+    cache.set(key, data, settings.BOOK_CACHE_TIMEOUT)
+
+
+def _bump_versions(keys):
+    cache.set_many({key: _new_version() for key in keys}, None)
+
+
+def _invalidate(keys):
+    _bump_versions(keys)
+
+    # A request that read the old rows before the commit could have cached
+    # them under the new version, invalidate again once the change is visible
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump_versions(keys))
+
+
+def invalidate_books(book_ids=()):
+    """
+    Invalidate the cached catalogue pages and the given books after the
+    books were written, without book ids only the catalogue pages.
+    """
+    _invalidate(
+        [CATALOGUE_VERSION_KEY, CONTENT_VERSION_KEY]
+        + [BOOK_VERSION_KEY.format(book_id=book_id) for book_id in book_ids]
+    )
+
+
+def invalidate_book_stats(book_ids=()):
+    """
+    Like invalidate_books, for changes of the reading stats of the books.
+    """
+    _invalidate(
+        [CATALOGUE_VERSION_KEY]
+        + [BOOK_VERSION_KEY.format(book_id=book_id) for book_id in book_ids]
+    )
+
+
+def invalidate_users(user_ids=None):
+    """
+    Invalidate the responses of the given users, of every user without
+    user ids.
+    """
+    if user_ids is None:
+        _invalidate([USERS_VERSION_KEY])
+    else:
+        _invalidate([USER_VERSION_KEY.format(user_id=user_id) for user_id in user_ids])
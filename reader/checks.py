@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    # Without a shared cache the book pages are served uncached and the
+    # responses have no ETags, see settings.SHARED_CACHE
+    if settings.SHARED_CACHE:
+        return []
+    return [
+        Warning(
+            "The cache is not shared by the processes of the service, the "
+            "book pages are not cached and the responses have no ETags.",
+            hint="Set REDIS_URL, or SINGLE_PROCESS=1 when a single process "
+            "serves the requests.",
+            id="reader.W001",
+        )
+    ]
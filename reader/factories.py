@@ -0,0 +1,310 @@
+import io
+import random
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import Max, OuterRef, Subquery
+from django.utils import timezone
+
+from reader import cache as book_cache
+from reader import leaderboards
+from reader.models import (
+    Book,
+    BookStats,
+    DailyReading,
+    Profile,
+    ReadingSession,
+    UserBookStats,
+)
+
+DEFAULT_PASSWORD = "benchmark-password"
+
+
+def batched(iterable, batch_size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def create_users(count, prefix="reader", password=DEFAULT_PASSWORD, batch_size=1000):
+    """
+    Insert the users and their profiles with bulk_create, the password is
+    hashed once for all of them.
+    """
+    User = get_user_model()
+    password = make_password(password)
+    users = []
+    for batch in batched(range(count), batch_size):
+        created = User.objects.bulk_create(
+            User(email=f"{prefix}{number}@example.com", password=password)
+            for number in batch
+        )
+        # bulk_create does not send the signal that creates the profiles
+        Profile.objects.bulk_create(Profile(user=user) for user in created)
+        users += created
+    return users
+
+
+def create_books(count, batch_size=1000):
+    books = []
+    for batch in batched(range(count), batch_size):
+        books += Book.objects.bulk_create(
+            Book(
+                title=f"Book {number}",
+                author=f"Author {number % 100}",
+                year_of_publishing=1900 + number % 125,
+                short_description=f"Short description of book {number}",
+            )
+            for number in batch
+        )
+    return books
+
+
+def generate_sessions(users, books, per_user, rng, now=None):
+    # Every user reads one book after another, going back in time from now
+    now = now or timezone.now()
+    for user in users:
+        end_time = now - timedelta(minutes=rng.randint(1, 60))
+        for _ in range(per_user):
+            start_time = end_time - timedelta(minutes=rng.randint(5, 120))
+            yield ReadingSession(
+                user=user,
+                book=rng.choice(books),
+                start_time=start_time,
+                end_time=end_time,
+            )
+            end_time = start_time - timedelta(minutes=rng.randint(1, 24 * 60))
+
+
+def create_sessions(users, books, per_user, seed=0, batch_size=1000):
+    rng = random.Random(seed)
+    created = 0
+    for batch in batched(generate_sessions(users, books, per_user, rng), batch_size):
+        ReadingSession.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def rebuild_denormalized(batch_size=1000):
+    """
+    Fill the stats tables, the daily reading rollup, the profiles,
+    Book.last_time_read and the leaderboards, which bulk_create leaves
+    untouched.
+    """
+    BookStats.rebuild(batch_size=batch_size)
+    UserBookStats.rebuild(batch_size=batch_size)
+    DailyReading.rebuild(batch_size=batch_size)
+    Profile.rebuild()
+    Book.objects.update(
+        last_time_read=Subquery(
+            ReadingSession.objects.filter(book=OuterRef("pk"))
+            .order_by()
+            .values("book")
+            .annotate(last=Max("end_time"))
+            .values("last")
+        )
+    )
+    book_cache.invalidate_books()
+    leaderboards.refresh()
+
+
+def seed(users=10, books=100, sessions=20, seed=0, batch_size=1000):
+    """
+    Create users with profiles, books and `sessions` finished reading
+    sessions per user, returns the created users and books.
+    """
+    with transaction.atomic():
+        created_users = create_users(users, batch_size=batch_size)
+        created_books = create_books(books, batch_size=batch_size)
+        if created_books:
+            create_sessions(
+                created_users,
+                created_books,
+                sessions,
+                seed=seed,
+                batch_size=batch_size,
+            )
+        rebuild_denormalized(batch_size=batch_size)
+    return created_users, created_books
+
+
+# Generators of realistic data for load testing, see seed_reading_data
+
+# Relative number of sessions started in every hour of the day
+HOUR_WEIGHTS = (1, 1, 1, 1, 1, 1, 2, 4, 5, 3, 2, 2, 4, 4, 3, 2, 2, 3, 4, 6, 8, 9, 8, 5)
+
+
+class ReadingDataGenerator:
+    """
+    Build unsaved users, books and finished reading sessions.
+
+    Every chunk gets its own random generator seeded from the seed and the
+    first id of the chunk, the data does not depend on how the chunks are
+    spread over processes.
+    """
+
+    def __init__(self, seed=0, days=365, sessions=20, book_ids=None, now=None):
+        self.seed = seed
+        self.days = days
+        self.sessions = sessions
+        self.book_ids = book_ids
+        self.now = now or timezone.now()
+
+    def random(self, kind, first_id):
+        return random.Random(f"{self.seed}:{kind}:{first_id}")
+
+    def faker(self, rng):
+        from faker import Faker
+
+        faker = Faker()
+        faker.seed_instance(rng.getrandbits(32))
+        return faker
+
+    def books(self, first_id, count):
+        rng = self.random("books", first_id)
+        faker = self.faker(rng)
+        authors = [faker.name() for _ in range(max(count // 20, 1))]
+        descriptions = [faker.paragraph(nb_sentences=5) for _ in range(100)]
+        for book_id in range(first_id, first_id + count):
+            yield Book(
+                id=book_id,
+                title=faker.catch_phrase(),
+                # A few authors wrote most of the books
+                author=authors[int(len(authors) * rng.random() ** 2)],
+                year_of_publishing=rng.randint(1850, self.now.year),
+                short_description=faker.sentence(),
+                long_description=rng.choice(descriptions),
+            )
+
+    def users(self, first_id, count, password, prefix="reader"):
+        rng = self.random("users", first_id)
+        faker = self.faker(rng)
+        first_names = [faker.first_name() for _ in range(200)]
+        last_names = [faker.last_name() for _ in range(200)]
+        User = get_user_model()
+        for user_id in range(first_id, first_id + count):
+            yield User(
+                id=user_id,
+                email=f"{prefix}{user_id}@example.com",
+                password=password,
+                first_name=rng.choice(first_names),
+                last_name=rng.choice(last_names),
+                date_joined=self.now - timedelta(days=rng.random() * self.days),
+            )
+
+    def reading_sessions(self, user):
+        rng = self.random("sessions", user.id)
+        # Most users read a little, a few read a lot
+        count = int(rng.expovariate(1 / self.sessions)) if self.sessions else 0
+        days = (self.now - user.date_joined).days + 1
+        # Reading hours follow the local time of the service
+        first_day = timezone.localtime(user.date_joined).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        starts = sorted(
+            first_day
+            + timedelta(
+                days=rng.randrange(days),
+                hours=rng.choices(range(24), HOUR_WEIGHTS)[0],
+                seconds=rng.randrange(3600),
+            )
+            for _ in range(count)
+        )
+
+        book_id = None
+        previous_end = user.date_joined
+        for start_time in starts:
+            start_time = max(start_time, previous_end + timedelta(minutes=1))
+            # Sessions last about half an hour, rarely more than a few hours
+            end_time = start_time + timedelta(
+                minutes=min(rng.lognormvariate(3.3, 0.7), 240)
+            )
+            if end_time >= self.now:
+                break
+            if book_id is None or rng.random() > 0.6:
+                book_id = self.book_ids[int(len(self.book_ids) * rng.random() ** 3)]
+            yield ReadingSession(
+                user_id=user.id,
+                book_id=book_id,
+                start_time=start_time,
+                end_time=end_time,
+            )
+            previous_end = end_time
+
+
+def copy_value(field, value, connection):
+    value = field.get_db_prep_save(value, connection)
+    if value is None:
+        return "\\N"
+    if isinstance(value, timedelta):
+        value = f"{value.total_seconds()} seconds"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_objects(model, objects, using="default"):
+    """
+    Insert the objects with a single PostgreSQL COPY, the primary key is only
+    copied when it is set on the objects.
+    """
+    objects = list(objects)
+    if not objects:
+        return 0
+
+    connection = connections[using]
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if not field.primary_key or objects[0].pk is not None
+    ]
+    buffer = io.StringIO()
+    for obj in objects:
+        buffer.write(
+            "\t".join(
+                copy_value(field, getattr(obj, field.attname), connection)
+                for field in fields
+            )
+            + "\n"
+        )
+
+    quote = connection.ops.quote_name
+    sql = (
+        f"COPY {quote(model._meta.db_table)} "
+        f"({', '.join(quote(field.column) for field in fields)}) FROM STDIN"
+    )
+    with connection.cursor() as cursor:
+        if hasattr(cursor, "copy"):
+            # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+    return len(objects)
+
+
+def save_objects(model, objects, use_copy=False, batch_size=1000):
+    if use_copy:
+        return copy_objects(model, objects)
+    created = 0
+    for batch in batched(objects, batch_size):
+        model.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def reset_sequences(*models, using="default"):
+    # Rows inserted with explicit ids do not advance the id sequences
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from django.db.models import DurationField, F, Value
+from django.db.models.functions import Coalesce
+from rest_framework.filters import BaseFilterBackend, OrderingFilter, SearchFilter
+
+from .search import search_books
+from .serializers import BookFilterSerializer
+
+
+class BookSearchFilter(SearchFilter):
+    """
+    Full text search of the books with ?search=, the whole term is passed to
+    the database which ranks the matches.
+    """
+
+    search_description = (
+        "Words of the title, author or descriptions, the best matches first."
+    )
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, "").strip()
+        if not term:
+            return queryset
+        return search_books(queryset, term)
+
+
+class BookFilter(BaseFilterBackend):
+    """
+    Filters of the books on their indexed fields.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = BookFilterSerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return queryset.filter(**query.validated_data)
+
+    def get_schema_operation_parameters(self, view):
+        types = {
+            "author": {"type": "string"},
+            "year_of_publishing__gte": {"type": "integer"},
+            "last_time_read__gte": {"type": "string", "format": "date-time"},
+        }
+        return [
+            {
+                "name": name,
+                "required": False,
+                "in": "query",
+                "description": str(field.help_text or ""),
+                "schema": types[name],
+            }
+            for name, field in BookFilterSerializer().fields.items()
+        ]
+
+
+# The stats are ordered by annotations, the serializer fields of the same
+# names are methods of the books
+STATS_ORDERING = {
+    "total_reading_time_for_user": "annotated_total_reading_time_for_user",
+    "total_reading_time_for_all_users": "annotated_total_reading_time_for_all_users",
+    "total_number_of_reading_sessions_for_all_users": (
+        "annotated_total_number_of_reading_sessions_for_all_users"
+    ),
+}
+# Books that were never read have no stats row
+STATS_ANNOTATIONS = {
+    "annotated_total_reading_time_for_all_users": Coalesce(
+        F("stats__total_reading_time"),
+        Value(timedelta(), output_field=DurationField()),
+    ),
+    "annotated_total_number_of_reading_sessions_for_all_users": Coalesce(
+        F("stats__number_of_reading_sessions"), 0
+    ),
+}
+
+
+class BookOrderingFilter(OrderingFilter):
+    """
+    Ordering of the books with ?ordering=, by their indexed fields or their
+    stats. The id breaks ties, so the keyset pagination uses this ordering
+    too, by id without the parameter.
+    """
+
+    ordering_fields = ("id", "title", "author", "year_of_publishing", *STATS_ORDERING)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = []
+        for term in super().get_ordering(request, queryset, view) or ():
+            field = term.lstrip("-")
+            ordering.append(term.replace(field, STATS_ORDERING.get(field, field)))
+        if not any(term.lstrip("-") == "id" for term in ordering):
+            # In the direction of the first field, indexes of (field, id)
+            # are scanned one way
+            descending = bool(ordering) and ordering[0].startswith("-")
+            ordering.append("-id" if descending else "id")
+        return ordering
+
+    def filter_queryset(self, request, queryset, view):
+        # Without the parameter the books stay in the order of the search
+        if not request.query_params.get(self.ordering_param):
+            return queryset
+
+        ordering = self.get_ordering(request, queryset, view)
+        fields = {term.lstrip("-") for term in ordering}
+        queryset = queryset.annotate(
+            **{
+                name: annotation
+                for name, annotation in STATS_ANNOTATIONS.items()
+                if name in fields and name not in queryset.query.annotations
+            }
+        )
+        return queryset.order_by(*ordering)
@@ -0,0 +1,103 @@
+import codecs
+import csv
+import json
+import os
+import time
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from reader import cache as book_cache
+from reader.models import Book
+from reader.serializers import BookSerializer
+
+FORMATS = ("csv", "jsonl")
+FORMAT_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+def guess_format(file_name):
+    return FORMAT_EXTENSIONS.get(os.path.splitext(file_name or "")[1].lower())
+
+
+def iter_rows(lines, file_format):
+    """
+    Lazily parse decoded text lines of a CSV file with a header row or of a
+    JSON Lines file, a line that can not be parsed is yielded as its error.
+    """
+    if file_format == "csv":
+        yield from csv.DictReader(lines)
+        return
+
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            row = ValidationError({"non_field_errors": [f"Invalid JSON: {error}"]})
+        if not isinstance(row, (dict, ValidationError)):
+            row = ValidationError({"non_field_errors": ["Expected a JSON object."]})
+        yield row
+
+
+def iter_file_rows(file, file_format, encoding="utf-8"):
+    # Binary files are decoded line by line, they are never read at once
+    try:
+        yield from iter_rows(codecs.iterdecode(file, encoding), file_format)
+    except (UnicodeDecodeError, csv.Error) as error:
+        raise ValidationError({"file": [f"The file is malformed: {error}"]})
+
+
+def import_books(rows, batch_size=1000, on_error=None, on_batch=None):
+    """
+    Validate the rows with BookSerializer and insert the valid ones with
+    bulk_create, batch_size rows at a time. The rows are imported in one
+    transaction, nothing is inserted when the file turns out malformed.
+
+    on_error(row_number, errors) is called for every invalid row and
+    on_batch(report) after every inserted batch.
+    """
+    # A single serializer validates every row, building one per row would
+    # copy all of its fields each time
+    serializer = BookSerializer()
+    report = {"rows": 0, "created": 0, "failed": 0}
+    started = time.monotonic()
+
+    def measure():
+        report["seconds"] = time.monotonic() - started
+        report["rows_per_second"] = (
+            report["rows"] / report["seconds"] if report["seconds"] else 0.0
+        )
+
+    def insert(books):
+        Book.objects.bulk_create(books)
+        report["created"] += len(books)
+        if on_batch:
+            measure()
+            on_batch(report)
+
+    with transaction.atomic():
+        books = []
+        for row_number, row in enumerate(rows, start=1):
+            report["rows"] += 1
+            try:
+                if isinstance(row, ValidationError):
+                    raise row
+                books.append(Book(**serializer.run_validation(row)))
+            except ValidationError as error:
+                report["failed"] += 1
+                if on_error:
+                    on_error(row_number, error.detail)
+                continue
+
+            if len(books) >= batch_size:
+                insert(books)
+                books = []
+        if books:
+            insert(books)
+
+        if report["created"]:
+            book_cache.invalidate_books()
+
+    measure()
+    return report
@@ -0,0 +1,25 @@
+from django.core.cache import cache
+from django.db.models import Max
+
+from reader.models import Leaderboard
+
+# Time of the last refresh, the version of every leaderboard response
+REFRESHED_AT_KEY = "reader:leaderboards:refreshed_at"
+
+
+def refresh():
+    refreshed_at = Leaderboard.refresh()
+    cache.set(REFRESHED_AT_KEY, refreshed_at, None)
+    return refreshed_at
+
+
+def refreshed_at():
+    # Read on every request, the table is only asked when the cache lost it
+    value = cache.get(REFRESHED_AT_KEY)
+    if value is None:
+        value = Leaderboard.objects.aggregate(refreshed_at=Max("refreshed_at"))[
+            "refreshed_at"
+        ]
+        if value is not None:
+            cache.set(REFRESHED_AT_KEY, value, None)
+    return value
@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reader.models import DailyReading
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily reading rollup from the completed reading sessions, "
+        "split at the midnights of TIME_ZONE"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=date.fromisoformat,
+            help="Only recompute the days from this date (YYYY-MM-DD) on",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rollup rows written per query",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Backfilling daily reading ...")
+        with transaction.atomic():
+            rows = DailyReading.rebuild(
+                since=options["since"], batch_size=options["batch_size"]
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully backfilled {rows} daily reading rows")
+        )
@@ -0,0 +1,133 @@
+import json
+import platform
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from rest_framework.test import APIClient
+
+from reader import factories
+from reader.benchmarks import (
+    BENCHMARK_CACHES,
+    DEFAULT_PAGE_SIZES,
+    EndpointBenchmark,
+    compare,
+)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def page_sizes(value):
+    return tuple(int(size) for size in value.split(","))
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and measure the query count and "
+        "latency of the reader endpoints"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--books", type=int, default=1000)
+        parser.add_argument(
+            "--sessions", type=int, default=100, help="Reading sessions per user"
+        )
+        parser.add_argument(
+            "--page-sizes",
+            type=page_sizes,
+            default=DEFAULT_PAGE_SIZES,
+            help="Comma separated page sizes of the list endpoints",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Timed requests per endpoint"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the results to this JSON file")
+        parser.add_argument(
+            "--compare", help="JSON file of a previous run to compare the results to"
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            # The seeding invalidates the cached pages too
+            with override_settings(CACHES=BENCHMARK_CACHES):
+                report = self.benchmark(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                baseline = json.load(file)["results"]
+            for change in compare(baseline, report["results"]):
+                self.stdout.write(
+                    f"{change['name']} page_size={change['page_size']}: "
+                    f"{change['queries']:+d} queries, "
+                    f"{change['median_ms']:+.2f} ms median"
+                )
+
+    def benchmark(self, options):
+        self.stderr.write("Seeding the benchmark database ...")
+        started = time.monotonic()
+        users, books = factories.seed(
+            users=options["users"],
+            books=options["books"],
+            sessions=options["sessions"],
+            seed=options["seed"],
+        )
+        seeded = time.monotonic() - started
+
+        self.stderr.write("Running the benchmarks ...")
+        results = EndpointBenchmark(
+            APIClient(),
+            users[0],
+            books,
+            page_sizes=options["page_sizes"],
+            repeat=options["repeat"],
+        ).run()
+
+        return {
+            "revision": git_revision(),
+            "database": connection.vendor,
+            "django": django.get_version(),
+            "python": platform.python_version(),
+            "cache": settings.CACHES["default"]["BACKEND"],
+            "dataset": {
+                "users": options["users"],
+                "books": options["books"],
+                "sessions_per_user": options["sessions"],
+                "seed": options["seed"],
+                "seconds": seeded,
+            },
+            "results": results,
+        }
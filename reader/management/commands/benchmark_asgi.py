@@ -0,0 +1,203 @@
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from importlib.util import find_spec
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reader import factories
+from reader.benchmarks import ConcurrentLoad
+from reader.management.commands.benchmark import git_revision
+
+ASGI_APPLICATION = "book_reading_service.asgi:application"
+WSGI_APPLICATION = "book_reading_service.wsgi:application"
+
+# The DRF views under WSGI, the same views under ASGI where every request
+# runs in a thread of sync_to_async, and the async views under ASGI
+TARGETS = (
+    ("wsgi", WSGI_APPLICATION, "wsgi", "reader:reading-session-list"),
+    ("asgi-sync-views", ASGI_APPLICATION, "asgi3", "reader:reading-session-list"),
+    ("asgi", ASGI_APPLICATION, "asgi3", "reader:async-reading-session-list"),
+)
+SERVER_START_TIMEOUT = 30
+
+
+def conn_max_ages(value):
+    return [int(age) for age in value.split(",")]
+
+
+def free_port(host):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database, serve it with uvicorn and compare the "
+        "reading session endpoints under WSGI and ASGI with concurrent users"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=16, help="Simultaneous users"
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Start, stop and list rounds of every user",
+        )
+        parser.add_argument("--books", type=int, default=100)
+        parser.add_argument(
+            "--sessions", type=int, default=20, help="Reading sessions per user"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=1, help="uvicorn worker processes"
+        )
+        parser.add_argument(
+            "--conn-max-age",
+            type=conn_max_ages,
+            default=[None],
+            help="Comma separated DB_CONN_MAX_AGE of the servers, every target "
+            "runs with each of them",
+        )
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the results to this JSON file")
+
+    def handle(self, *args, **options):
+        if find_spec("uvicorn") is None:
+            raise CommandError("uvicorn is required to serve the application.")
+        if connection.vendor == "sqlite":
+            raise CommandError(
+                "The servers need a database they can share, "
+                "SQLite is not supported."
+            )
+
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            report = self.benchmark(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    def benchmark(self, options):
+        self.stderr.write("Seeding the benchmark database ...")
+        # Every run gets its own users, none of them has an active session
+        # or a throttling history at the start
+        runs = [
+            (conn_max_age, target)
+            for conn_max_age in options["conn_max_age"]
+            for target in TARGETS
+        ]
+        users, books = factories.seed(
+            users=options["concurrency"] * len(runs),
+            books=options["books"],
+            sessions=options["sessions"],
+            seed=options["seed"],
+        )
+        book_ids = [book.pk for book in books]
+
+        results = []
+        for index, (conn_max_age, target) in enumerate(runs):
+            name, application, interface, url_name = target
+            target_users = users[
+                index * options["concurrency"] : (index + 1) * options["concurrency"]
+            ]
+            self.stderr.write(f"Benchmarking {name} ...")
+            port = free_port(options["host"])
+            with self.serve(application, interface, port, options, conn_max_age):
+                result = ConcurrentLoad(
+                    options["host"],
+                    port,
+                    reverse(url_name),
+                    [str(AccessToken.for_user(user)) for user in target_users],
+                    book_ids,
+                    iterations=options["iterations"],
+                ).run()
+            results.append(
+                {
+                    "name": name,
+                    "interface": interface,
+                    "conn_max_age": conn_max_age,
+                    **result,
+                }
+            )
+
+        return {
+            "revision": git_revision(),
+            "database": connection.vendor,
+            "django": django.get_version(),
+            "python": platform.python_version(),
+            "cache": settings.CACHES["default"]["BACKEND"],
+            "cpus": os.cpu_count(),
+            "workers": options["workers"],
+            "results": results,
+        }
+
+    @contextmanager
+    def serve(self, application, interface, port, options, conn_max_age=None):
+        env = {
+            **os.environ,
+            "DEBUG_TOOLBAR": "0",
+            # The servers use the test database seeded above
+            "POSTGRES_DB": connection.settings_dict["NAME"],
+        }
+        if conn_max_age is not None:
+            env["DB_CONN_MAX_AGE"] = str(conn_max_age)
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                application,
+                "--interface",
+                interface,
+                "--host",
+                options["host"],
+                "--port",
+                str(port),
+                "--workers",
+                str(options["workers"]),
+                "--no-access-log",
+                "--log-level",
+                "warning",
+            ],
+            env=env,
+        )
+        try:
+            self.wait_for_server(server, options["host"], port)
+            yield
+        finally:
+            server.terminate()
+            server.wait()
+
+    def wait_for_server(self, server, host, port):
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"uvicorn exited with code {server.returncode}.")
+            try:
+                socket.create_connection((host, port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"uvicorn did not start in {SERVER_START_TIMEOUT} seconds.")
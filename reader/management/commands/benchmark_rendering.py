@@ -0,0 +1,60 @@
+import json
+import platform
+
+import django
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_databases, teardown_databases
+
+from reader import factories
+from reader.benchmarks import RenderingBenchmark
+from reader.management.commands.benchmark import git_revision
+from reader.renderers import orjson
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and compare the rows per second of "
+        "the list pages rendered by the serializers and by the fast JSON path"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=1000)
+        parser.add_argument(
+            "--sessions", type=int, default=1000, help="Reading sessions of the user"
+        )
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument(
+            "--repeat", type=int, default=200, help="Renders of every page"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the results to this JSON file")
+
+    def handle(self, *args, **options):
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.stderr.write("Seeding the benchmark database ...")
+            users, _ = factories.seed(
+                users=1,
+                books=options["books"],
+                sessions=options["sessions"],
+                seed=options["seed"],
+            )
+            results = RenderingBenchmark(
+                users[0], page_size=options["page_size"], repeat=options["repeat"]
+            ).run()
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        report = {
+            "revision": git_revision(),
+            "django": django.get_version(),
+            "python": platform.python_version(),
+            "orjson": orjson.__version__ if orjson else None,
+            "results": results,
+        }
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,71 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from reader.importers import FORMATS, guess_format, import_books, iter_file_rows
+
+
+class Command(BaseCommand):
+    help = "Import books from a CSV or JSON Lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with a header row or JSON Lines")
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=FORMATS,
+            help="File format, guessed from the file extension by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of books inserted per query",
+        )
+        parser.add_argument(
+            "--errors",
+            help="Write the errors of the invalid rows to this JSON Lines file",
+        )
+
+    def handle(self, *args, **options):
+        file_format = options["file_format"] or guess_format(options["path"])
+        if not file_format:
+            raise CommandError("Can not guess the file format, use --format")
+
+        errors_file = open(options["errors"], "w") if options["errors"] else None
+
+        def on_error(row_number, errors):
+            line = json.dumps({"row": row_number, "errors": errors})
+            if errors_file:
+                errors_file.write(line + "\n")
+            else:
+                self.stderr.write(line)
+
+        def on_batch(report):
+            self.stdout.write(
+                f"Imported {report['created']} books "
+                f"({report['rows_per_second']:.0f} rows/sec)"
+            )
+
+        try:
+            with open(options["path"], "rb") as file:
+                report = import_books(
+                    iter_file_rows(file, file_format),
+                    batch_size=options["batch_size"],
+                    on_error=on_error,
+                    on_batch=on_batch,
+                )
+        except ValidationError as error:
+            raise CommandError(error.detail["file"][0])
+        finally:
+            if errors_file:
+                errors_file.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully imported {report['created']} of {report['rows']} "
+                f"books, {report['failed']} failed "
+                f"({report['rows_per_second']:.0f} rows/sec)"
+            )
+        )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reader import cache as book_cache
+from reader.models import BookStats, UserBookStats
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized book and user book stats from the sessions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of stats rows written per query",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding book stats ...")
+        with transaction.atomic():
+            books = BookStats.rebuild(batch_size=options["batch_size"])
+            user_books = UserBookStats.rebuild(batch_size=options["batch_size"])
+        book_cache.invalidate_book_stats()
+        book_cache.invalidate_users()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully rebuilt stats for {books} books "
+                f"and {user_books} user books"
+            )
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from reader import leaderboards
+
+
+class Command(BaseCommand):
+    help = "Recompute the top books and readers of every leaderboard window"
+
+    def handle(self, *args, **options):
+        self.stdout.write("Refreshing leaderboards ...")
+        refreshed_at = leaderboards.refresh()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully refreshed leaderboards at {refreshed_at}")
+        )
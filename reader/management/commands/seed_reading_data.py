@@ -0,0 +1,183 @@
+import multiprocessing
+import time
+from argparse import BooleanOptionalAction
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from reader.factories import (
+    DEFAULT_PASSWORD,
+    ReadingDataGenerator,
+    rebuild_denormalized,
+    reset_sequences,
+    save_objects,
+)
+from reader.models import Book, Profile, ReadingSession
+
+
+def seed_chunk(task):
+    """
+    Insert one chunk of books, or of users with their profiles and reading
+    sessions, in its own transaction.
+    """
+    kind, first_id, count, options = task
+    generator = ReadingDataGenerator(
+        seed=options["seed"],
+        days=options["days"],
+        sessions=options["sessions"],
+        book_ids=options["book_ids"],
+        now=options["now"],
+    )
+    save = {"use_copy": options["use_copy"], "batch_size": options["batch_size"]}
+
+    with transaction.atomic():
+        if kind == "books":
+            return "books", save_objects(Book, generator.books(first_id, count), **save)
+
+        users = list(
+            generator.users(first_id, count, options["password"], options["prefix"])
+        )
+        save_objects(get_user_model(), users, **save)
+        # bulk_create and COPY skip the signal that creates the profiles
+        save_objects(Profile, (Profile(user_id=user.id) for user in users), **save)
+        sessions = save_objects(
+            ReadingSession,
+            (session for user in users for session in generator.reading_sessions(user)),
+            **save,
+        )
+        return "reading sessions", sessions
+
+
+def next_id(model):
+    return (model.objects.aggregate(Max("id"))["id__max"] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = "Fill the database with users, books and reading sessions for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--books", type=int, default=10000)
+        parser.add_argument(
+            "--sessions",
+            type=int,
+            default=20,
+            help="Average number of reading sessions per user",
+        )
+        parser.add_argument(
+            "--days", type=int, default=365, help="Days of reading history"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10000,
+            help="Number of users or books generated and inserted per transaction",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows per bulk_create query",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes generating and inserting the chunks",
+        )
+        parser.add_argument(
+            "--copy",
+            action=BooleanOptionalAction,
+            help="Insert with COPY, the default on PostgreSQL",
+        )
+        parser.add_argument("--prefix", default="reader", help="Prefix of the emails")
+        parser.add_argument("--password", default=DEFAULT_PASSWORD)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        use_copy = options["copy"]
+        if use_copy is None:
+            use_copy = connection.vendor == "postgresql"
+        if use_copy and connection.vendor != "postgresql":
+            raise CommandError("COPY is only supported on PostgreSQL")
+        if options["workers"] > 1:
+            if connection.vendor == "sqlite":
+                raise CommandError("SQLite does not support concurrent writers")
+            if "fork" not in multiprocessing.get_all_start_methods():
+                raise CommandError("--workers needs a platform that can fork")
+
+        User = get_user_model()
+        first_book_id = next_id(Book)
+        first_user_id = next_id(User)
+        if options["books"]:
+            book_ids = range(first_book_id, first_book_id + options["books"])
+        else:
+            book_ids = list(Book.objects.values_list("id", flat=True))
+        if options["users"] and options["sessions"] and not book_ids:
+            raise CommandError("There are no books to read, use --books")
+
+        chunk_options = {
+            "seed": options["seed"],
+            "days": options["days"],
+            "sessions": options["sessions"],
+            "book_ids": book_ids,
+            "now": timezone.now(),
+            "use_copy": use_copy,
+            "batch_size": options["batch_size"],
+            "password": make_password(options["password"]),
+            "prefix": options["prefix"],
+        }
+        chunk_size = options["chunk_size"]
+
+        def chunks(kind, first_id, count):
+            for offset in range(0, count, chunk_size):
+                size = min(chunk_size, count - offset)
+                yield kind, first_id + offset, size, chunk_options
+
+        started = time.monotonic()
+        # Users read the books, so every book exists before the first session
+        self.run_chunks(chunks("books", first_book_id, options["books"]), options)
+        created = self.run_chunks(
+            chunks("users", first_user_id, options["users"]), options
+        )
+        reset_sequences(User, Book)
+
+        self.stdout.write("Rebuilding stats and profiles ...")
+        rebuild_denormalized(batch_size=options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully created {options['books']} books, "
+                f"{options['users']} users and {created['reading sessions']} reading "
+                f"sessions in {time.monotonic() - started:.1f}s"
+            )
+        )
+
+    def run_chunks(self, tasks, options):
+        created = {"books": 0, "reading sessions": 0}
+        started = time.monotonic()
+
+        def report(label, rows):
+            created[label] += rows
+            seconds = time.monotonic() - started
+            self.stdout.write(
+                f"Created {created[label]} {label} "
+                f"({created[label] / seconds if seconds else 0:.0f} rows/sec)"
+            )
+
+        if options["workers"] == 1:
+            for task in tasks:
+                report(*seed_chunk(task))
+            return created
+
+        # The forked workers open their own connections
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with context.Pool(options["workers"]) as pool:
+            for result in pool.imap_unordered(seed_chunk, tasks):
+                report(*result)
+        return created
@@ -1,18 +1,79 @@
 import time
 
-from django.core.management.base import BaseCommand
-from django.db import connections, OperationalError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, InterfaceError, OperationalError
+from django.db.migrations.executor import MigrationExecutor
 
 
 class Command(BaseCommand):
+    help = (
+        "Wait until the databases answer queries, with --once check a single "
+        "time and fail when they do not, e.g. as a readiness probe"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Check once and exit with an error when the database is not ready",
+        )
+        parser.add_argument(
+            "--migrated",
+            action="store_true",
+            help="Only ready when every migration is applied",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=0,
+            help="Seconds to wait before giving up, 0 waits forever",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=3, help="Seconds between two checks"
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("Waiting for database connection ...")
-        db_conn = False
-        while not db_conn:
-            try:
-                db_conn = connections["default"].cursor()
-            except OperationalError:
-                self.stdout.write("Database is unavailable, please wait ...")
-                time.sleep(3)
+        deadline = time.monotonic() + options["timeout"]
+        while True:
+            problem = self.check(options["migrated"])
+            if problem is None:
+                break
+            if options["once"] or (
+                options["timeout"] and time.monotonic() + options["interval"] > deadline
+            ):
+                raise CommandError(problem)
+            self.stdout.write(f"{problem}, please wait ...")
+            time.sleep(options["interval"])
 
         self.stdout.write(self.style.SUCCESS("Successfully connected"))
+
+    def check(self, migrated):
+        """
+        None when every database is ready, else what is wrong. The
+        connections stay open, the next check reuses them like the
+        persistent connections of the requests do.
+        """
+        for connection in connections.all():
+            try:
+                started = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            except (InterfaceError, OperationalError):
+                # Reconnects on the next check
+                connection.close()
+                return f"Database {connection.alias} is unavailable"
+            self.stdout.write(
+                f"Database {connection.alias} answered in "
+                f"{(time.perf_counter() - started) * 1000:.1f} ms"
+            )
+
+            if migrated:
+                executor = MigrationExecutor(connection)
+                plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+                if plan:
+                    return (
+                        f"Database {connection.alias} has {len(plan)} "
+                        f"unapplied migrations"
+                    )
+        return None
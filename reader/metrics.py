@@ -0,0 +1,134 @@
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# With PROMETHEUS_MULTIPROC_DIR set before the start, every process writes
+# its samples to memory mapped files in that directory and /metrics adds
+# them up, so any gunicorn worker can serve the scrape
+
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+REQUEST_LATENCY = Histogram(
+    "reader_request_duration_seconds",
+    "Time spent processing a request",
+    ["view", "method"],
+)
+REQUESTS = Counter(
+    "reader_requests",
+    "Number of requests by response status",
+    ["view", "method", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "reader_request_queries",
+    "Number of SQL queries run by a request",
+    ["view"],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, float("inf")),
+)
+SESSIONS_STARTED = Counter(
+    "reader_reading_sessions_started",
+    "Number of reading sessions started",
+)
+SESSIONS_STOPPED = Counter(
+    "reader_reading_sessions_stopped",
+    "Number of reading sessions stopped",
+)
+
+
+def count_sessions(started=0, stopped=0):
+    def inc():
+        SESSIONS_STARTED.inc(started)
+        SESSIONS_STOPPED.inc(stopped)
+
+    # Sessions of a transaction that is rolled back are not counted
+    transaction.on_commit(inc)
+
+
+class ReadingSessionCollector:
+    """
+    Read the number of open reading sessions from the database at scrape
+    time, the same in every process.
+    """
+
+    def collect(self):
+        from reader.models import ReadingSession
+
+        yield GaugeMetricFamily(
+            "reader_active_reading_sessions",
+            "Number of reading sessions that are not stopped yet",
+            value=ReadingSession.objects.filter(end_time=None).count(),
+        )
+
+
+database_registry = CollectorRegistry()
+database_registry.register(ReadingSessionCollector())
+
+
+class MetricsMiddleware:
+    """
+    Observe the latency, the status and the SQL query count of every
+    request, labelled with the view name of QueryInstrumentationMiddleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        return self.observe(request, response, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self.observe(request, response, started)
+
+    def observe(self, request, response, started):
+        duration = time.perf_counter() - started
+        recorder = getattr(request, "query_recorder", None)
+        view = (recorder and recorder.view) or "unmatched"
+        method = request.method if request.method in METHODS else "other"
+        REQUEST_LATENCY.labels(view, method).observe(duration)
+        REQUESTS.labels(view, method, response.status_code).inc()
+        if recorder:
+            REQUEST_QUERIES.labels(view).observe(recorder.count)
+        return response
+
+
+def metrics_view(request):
+    if settings.METRICS_TOKEN and (
+        request.headers.get("Authorization") != f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return HttpResponseForbidden()
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return HttpResponse(
+        generate_latest(registry) + generate_latest(database_registry),
+        content_type=CONTENT_TYPE_LATEST,
+    )
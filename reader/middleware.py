@@ -0,0 +1,164 @@
+import heapq
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger("reader.queries")
+
+SLOWEST_QUERIES = 3
+SQL_LOG_LENGTH = 200
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder:
+    """
+    execute_wrapper that counts and times every statement of a request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+        self.view = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            self.statements.append((duration, sql))
+
+    def slowest(self, number=SLOWEST_QUERIES):
+        return [
+            {"ms": round(duration * 1000, 2), "sql": sql[:SQL_LOG_LENGTH]}
+            for duration, sql in heapq.nlargest(
+                number, self.statements, key=lambda statement: statement[0]
+            )
+        ]
+
+
+# The recorder of the current request. Concurrent ASGI requests run their
+# queries on the connection of the same sync_to_async thread, sync_to_async
+# runs them in the context of their request
+current_recorder = ContextVar("query_recorder", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    # A connection that is opened again keeps its wrappers
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def recording(recorder):
+    token = current_recorder.set(recorder)
+    try:
+        yield
+    finally:
+        current_recorder.reset(token)
+
+
+def view_name(request):
+    # BookViewSet.list for the actions of viewsets, the class or function
+    # name for any other view
+    if request.resolver_match is None:
+        return None
+    view_func = request.resolver_match.func
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return getattr(view_func, "__name__", None)
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return f"{view_class.__name__}.{action}"
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record the number and the time of the SQL queries of every request.
+
+    The totals are sent in the Server-Timing header and logged as a JSON
+    line, a view that runs more queries than its budget in
+    settings.QUERY_BUDGETS raises QueryBudgetExceeded when
+    settings.QUERY_BUDGET_STRICT is set and logs a warning otherwise.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder = request.query_recorder = QueryRecorder()
+        started = time.perf_counter()
+        with recording(recorder):
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder = request.query_recorder = QueryRecorder()
+        started = time.perf_counter()
+        with recording(recorder):
+            response = await self.get_response(request)
+        return self.finish(request, response, recorder, started)
+
+    def finish(self, request, response, recorder, started):
+        total = time.perf_counter() - started
+        recorder.view = view_name(request)
+        response["Server-Timing"] = (
+            f'db;dur={recorder.duration * 1000:.2f};desc="{recorder.count} queries", '
+            f"total;dur={total * 1000:.2f}"
+        )
+        self.report(request, response, recorder, total)
+        return response
+
+    def report(self, request, response, recorder, total):
+        budget = settings.QUERY_BUDGETS.get(recorder.view)
+        exceeded = budget is not None and recorder.count > budget
+        if not exceeded and not logger.isEnabledFor(logging.INFO):
+            return
+
+        line = {
+            "method": request.method,
+            "path": request.path,
+            "view": recorder.view,
+            "status": response.status_code,
+            "queries": recorder.count,
+            "db_ms": round(recorder.duration * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+            "slowest": recorder.slowest(),
+        }
+        if not exceeded:
+            logger.info(json.dumps(line))
+            return
+
+        line["budget"] = budget
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(
+                f"{recorder.view} ran {recorder.count} queries, "
+                f"its budget is {budget}: {json.dumps(line['slowest'])}"
+            )
+        logger.warning(json.dumps(line))
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:14
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reader", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookStats",
+            fields=[
+                (
+                    "book",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="reader.book",
+                    ),
+                ),
+                ("number_of_reading_sessions", models.PositiveIntegerField(default=0)),
+                (
+                    "number_of_completed_sessions",
+                    models.PositiveIntegerField(default=0),
+                ),
+                (
+                    "total_reading_time",
+                    models.DurationField(default=datetime.timedelta),
+                ),
+                ("last_time_read", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "book stats",
+            },
+        ),
+    ]
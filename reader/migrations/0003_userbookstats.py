@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:15
+
+import datetime
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("reader", "0002_bookstats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserBookStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number_of_reading_sessions", models.PositiveIntegerField(default=0)),
+                (
+                    "total_reading_time",
+                    models.DurationField(default=datetime.timedelta),
+                ),
+                ("last_time_read", models.DateTimeField(blank=True, null=True)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_stats",
+                        to="reader.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="book_stats",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "user book stats",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="userbookstats",
+            constraint=models.UniqueConstraint(
+                fields=("user", "book"), name="unique_user_book_stats"
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:19
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def close_duplicate_active_sessions(apps, schema_editor):
+    # Keep only the latest active session of every user, the older ones are
+    # stopped when the latest one was started
+    ReadingSession = apps.get_model("reader", "ReadingSession")
+    active_sessions = ReadingSession.objects.filter(end_time__isnull=True)
+
+    users = (
+        active_sessions.order_by()
+        .values("user")
+        .annotate(active=Count("id"))
+        .filter(active__gt=1)
+        .values_list("user", flat=True)
+    )
+    for user_id in users.iterator():
+        latest = active_sessions.filter(user_id=user_id).latest("start_time")
+        active_sessions.filter(user_id=user_id).exclude(pk=latest.pk).update(
+            end_time=latest.start_time
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("reader", "0003_userbookstats"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="readingsession",
+            index=models.Index(
+                fields=["user", "end_time"], name="session_user_end_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="readingsession",
+            index=models.Index(
+                fields=["book", "end_time"], name="session_book_end_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="readingsession",
+            index=models.Index(
+                fields=["user", "-end_time"], name="session_user_recent_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="readingsession",
+            name="book",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="reader.book",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="readingsession",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(
+            close_duplicate_active_sessions, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="readingsession",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("end_time__isnull", True)),
+                fields=("user",),
+                name="one_active_session_per_user",
+            ),
+        ),
+    ]
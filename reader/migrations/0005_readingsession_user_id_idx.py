@@ -0,0 +1,16 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reader", "0004_readingsession_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="readingsession",
+            index=models.Index(fields=["user", "id"], name="session_user_id_idx"),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:27
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reader", "0005_readingsession_user_id_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="readingsession",
+            name="start_time",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+    ]
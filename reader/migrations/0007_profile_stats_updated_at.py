@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reader", "0006_readingsession_start_time_default"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="stats_updated_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
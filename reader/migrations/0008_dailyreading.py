@@ -0,0 +1,67 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:03
+
+import datetime
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("reader", "0007_profile_stats_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyReading",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("reading_time", models.DurationField(default=datetime.timedelta)),
+                (
+                    "book",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_reading",
+                        to="reader.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_reading",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "daily reading",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "day"], name="daily_reading_user_day_idx"
+                    ),
+                    models.Index(
+                        fields=["book", "day"], name="daily_reading_book_day_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailyreading",
+            constraint=models.UniqueConstraint(
+                fields=("user", "book", "day"), name="unique_user_book_day"
+            ),
+        ),
+    ]
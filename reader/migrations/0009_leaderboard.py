@@ -0,0 +1,75 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("reader", "0008_dailyreading"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Leaderboard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("board", models.CharField(max_length=16)),
+                ("window", models.CharField(max_length=8)),
+                ("ranking", models.CharField(max_length=16)),
+                ("rank", models.PositiveIntegerField()),
+                ("reading_time", models.DurationField()),
+                ("number_of_reading_sessions", models.PositiveIntegerField()),
+                ("refreshed_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["rank"],
+            },
+        ),
+        migrations.AddField(
+            model_name="dailyreading",
+            name="number_of_reading_sessions",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="dailyreading",
+            index=models.Index(fields=["day"], name="daily_reading_day_idx"),
+        ),
+        migrations.AddField(
+            model_name="leaderboard",
+            name="book",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="reader.book",
+            ),
+        ),
+        migrations.AddField(
+            model_name="leaderboard",
+            name="user",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="leaderboard",
+            constraint=models.UniqueConstraint(
+                fields=("board", "window", "ranking", "rank"),
+                name="unique_leaderboard_rank",
+            ),
+        ),
+    ]
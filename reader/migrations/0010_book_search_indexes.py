@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# The expression of reader.search.search_vector(), PostgreSQL only uses the
+# index for queries with exactly the same expression
+SEARCH_VECTOR = """(
+    ((setweight(to_tsvector('english'::regconfig, COALESCE("title", '')), 'A')
+    || setweight(to_tsvector('english'::regconfig, COALESCE("author", '')), 'B'))
+    || setweight(to_tsvector('english'::regconfig, COALESCE("short_description", '')), 'C'))
+    || setweight(to_tsvector('english'::regconfig, COALESCE("long_description", '')), 'D')
+)"""
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS book_search_idx "
+        f"ON reader_book USING gin (({SEARCH_VECTOR}))"
+    )
+    # The trigram index of the fuzzy author search needs the pg_trgm contrib
+    # extension, the search works without it
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS book_author_trgm_idx "
+        "ON reader_book USING gin (author gin_trgm_ops)"
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS book_author_trgm_idx")
+    schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS book_search_idx")
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently, without locking the books for writes
+    atomic = False
+
+    dependencies = [
+        ("reader", "0009_leaderboard"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reader", "0010_book_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(fields=["author", "id"], name="book_author_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(fields=["title", "id"], name="book_title_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["year_of_publishing", "id"], name="book_year_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["last_time_read"], name="book_last_time_read_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:02
+
+import datetime
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reader", "0011_book_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userbookstats",
+            index=models.Index(
+                models.F("user"),
+                models.OrderBy(
+                    django.db.models.functions.comparison.Coalesce(
+                        "last_time_read",
+                        models.Value(
+                            datetime.datetime(
+                                1970, 1, 1, 0, 0, tzinfo=datetime.timezone.utc
+                            )
+                        ),
+                    ),
+                    descending=True,
+                ),
+                models.OrderBy(models.F("id"), descending=True),
+                name="user_book_stats_history_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:25
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_completed_sessions(apps, schema_editor):
+    Profile = apps.get_model("reader", "Profile")
+    ReadingSession = apps.get_model("reader", "ReadingSession")
+    completed = (
+        ReadingSession.objects.filter(user=OuterRef("user"), end_time__isnull=False)
+        .order_by()
+        .values("user")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    Profile.objects.update(
+        number_of_completed_sessions=Coalesce(Subquery(completed), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reader", "0012_user_book_stats_history_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="number_of_completed_sessions",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_completed_sessions, migrations.RunPython.noop),
+    ]
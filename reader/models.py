@@ -1,10 +1,33 @@
-from datetime import timedelta
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from functools import partial, reduce
+from operator import or_
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import models
-from django.db.models import ExpressionWrapper, Sum, F, fields
+from django.db import IntegrityError, connections, models, transaction
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    ExpressionWrapper,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    F,
+    Value,
+    When,
+    fields,
+)
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 
+from reader import cache as book_cache
+from reader import metrics
+from reader.activity import split_by_day
+
 
 class Book(models.Model):
     title = models.CharField(max_length=255, blank=False, null=False)
@@ -16,10 +39,25 @@ class Book(models.Model):
 
     class Meta:
         ordering = ["id"]
+        # Filters and orderings of the catalogue, the id is the tie breaker
+        # of the orderings
+        indexes = [
+            models.Index(fields=["author", "id"], name="book_author_id_idx"),
+            models.Index(fields=["title", "id"], name="book_title_id_idx"),
+            models.Index(fields=["year_of_publishing", "id"], name="book_year_id_idx"),
+            models.Index(fields=["last_time_read"], name="book_last_time_read_idx"),
+        ]
 
     def __str__(self):
         return f"{self.id}"
 
+    def get_stats(self):
+        # Books that were never read have no stats row yet
+        try:
+            return self.stats
+        except ObjectDoesNotExist:
+            return BookStats(book=self)
+
     def total_reading_time_for_user(self, user):
         total_duration = (
             ReadingSession.objects.filter(
@@ -54,89 +92,847 @@ class Book(models.Model):
         return total_duration
 
 
+class ReadingStats(models.Model):
+    """
+    Denormalized reading stats, updated incrementally whenever a reading
+    session is started or stopped. Subclasses define which session fields
+    the stats are grouped by.
+    """
+
+    group_fields = ()
+
+    number_of_reading_sessions = models.PositiveIntegerField(default=0)
+    total_reading_time = models.DurationField(default=timezone.timedelta)
+    last_time_read = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def session_changes(cls, sessions, started, completed):
+        changes = {}
+        if started:
+            changes["number_of_reading_sessions"] = F(
+                "number_of_reading_sessions"
+            ) + len(sessions)
+        if completed:
+            end_time = Value(
+                max(session.end_time for session in sessions),
+                output_field=fields.DateTimeField(),
+            )
+            changes["total_reading_time"] = F("total_reading_time") + sum(
+                (session.calculate_duration() for session in sessions), timedelta()
+            )
+            changes["last_time_read"] = Greatest(
+                Coalesce("last_time_read", end_time), end_time
+            )
+        return changes
+
+    @classmethod
+    def session_lookup(cls, session):
+        return {
+            f"{field}_id": getattr(session, f"{field}_id") for field in cls.group_fields
+        }
+
+    @classmethod
+    def record_session(cls, session, started=False, completed=False):
+        changes = cls.session_changes([session], started, completed)
+        if not changes:
+            return
+
+        lookup = cls.session_lookup(session)
+        stats = cls.objects.filter(**lookup)
+        if not stats.update(**changes):
+            # First session of the group, create the row and apply the changes.
+            # A row inserted concurrently is kept, like in record_sessions
+            cls.objects.bulk_create([cls(**lookup)], ignore_conflicts=True)
+            stats.update(**changes)
+
+    @classmethod
+    def record_sessions(cls, sessions, started=False, completed=False):
+        """
+        Apply a batch of sessions with one INSERT for the missing rows and
+        one UPDATE for all of the rows.
+        """
+        groups = {}
+        for session in sessions:
+            key = tuple(cls.session_lookup(session).items())
+            groups.setdefault(key, []).append(session)
+        if not groups:
+            return
+
+        cls.objects.bulk_create(
+            [cls(**dict(key)) for key in groups], ignore_conflicts=True
+        )
+
+        cases = {}
+        for key, group in groups.items():
+            for field, change in cls.session_changes(group, started, completed).items():
+                cases.setdefault(field, []).append(When(Q(*key), then=change))
+
+        cls.objects.filter(reduce(or_, (Q(*key) for key in groups))).update(
+            **{
+                field: Case(
+                    *whens,
+                    default=F(field),
+                    output_field=cls._meta.get_field(field),
+                )
+                for field, whens in cases.items()
+            }
+        )
+
+    @classmethod
+    def rebuild_annotations(cls):
+        completed = Q(end_time__isnull=False)
+        return {
+            "number_of_reading_sessions": Count("id"),
+            "total_reading_time": ExpressionWrapper(
+                Sum(F("end_time") - F("start_time"), filter=completed),
+                output_field=fields.DurationField(),
+            ),
+            "last_time_read": models.Max("end_time"),
+        }
+
+    @classmethod
+    def rebuild(cls, batch_size=1000):
+        # Recompute every stats row from the reading sessions
+        annotations = cls.rebuild_annotations()
+        rows = (
+            ReadingSession.objects.order_by()
+            .values(*cls.group_fields)
+            .annotate(**annotations)
+        )
+
+        batch = []
+        rebuilt = 0
+        for row in rows.iterator(chunk_size=batch_size):
+            for field in cls.group_fields:
+                row[f"{field}_id"] = row.pop(field)
+            row["total_reading_time"] = row["total_reading_time"] or timedelta()
+            batch.append(cls(**row))
+            if len(batch) >= batch_size:
+                rebuilt += cls._upsert(batch, list(annotations))
+                batch = []
+        rebuilt += cls._upsert(batch, list(annotations))
+
+        # Rows without any sessions left only need to be reset
+        sessions = ReadingSession.objects.filter(
+            **{field: OuterRef(field) for field in cls.group_fields}
+        )
+        cls.objects.filter(~Exists(sessions)).update(
+            **{
+                field.name: field.get_default()
+                for field in cls._meta.concrete_fields
+                if field.name in annotations
+            }
+        )
+
+        return rebuilt
+
+    @classmethod
+    def _upsert(cls, batch, update_fields):
+        cls.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=list(cls.group_fields),
+            update_fields=update_fields,
+        )
+        return len(batch)
+
+
+class BookStats(ReadingStats):
+    """
+    Global reading stats of a book.
+    """
+
+    group_fields = ("book",)
+
+    book = models.OneToOneField(
+        Book, primary_key=True, on_delete=models.CASCADE, related_name="stats"
+    )
+    number_of_completed_sessions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "book stats"
+
+    def __str__(self):
+        return f"{self.book_id}"
+
+    @classmethod
+    def session_changes(cls, sessions, started, completed):
+        changes = super().session_changes(sessions, started, completed)
+        if completed:
+            changes["number_of_completed_sessions"] = F(
+                "number_of_completed_sessions"
+            ) + len(sessions)
+        return changes
+
+    @classmethod
+    def rebuild_annotations(cls):
+        annotations = super().rebuild_annotations()
+        annotations["number_of_completed_sessions"] = Count(
+            "id", filter=Q(end_time__isnull=False)
+        )
+        return annotations
+
+
+def last_read():
+    # Recency of the reading history, books without a completed session last
+    return Coalesce(
+        "last_time_read", Value(datetime(1970, 1, 1, tzinfo=dt_timezone.utc))
+    )
+
+
+class UserBookStats(ReadingStats):
+    """
+    Reading stats of a book for a single user.
+    """
+
+    group_fields = ("user", "book")
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="book_stats"
+    )
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="user_stats")
+
+    class Meta:
+        verbose_name_plural = "user book stats"
+        indexes = [
+            # The reading history pages, most recently read first
+            models.Index(
+                F("user"),
+                last_read().desc(),
+                F("id").desc(),
+                name="user_book_stats_history_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "book"], name="unique_user_book_stats"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.book_id}"
+
+
+class DailyReading(models.Model):
+    """
+    Reading time of a user and a book per day of TIME_ZONE, completed
+    sessions that cross midnight are split between the days and counted on
+    the day they ended.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="daily_reading",
+        db_index=False,
+    )
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="daily_reading", db_index=False
+    )
+    day = models.DateField()
+    reading_time = models.DurationField(default=timezone.timedelta)
+    number_of_reading_sessions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "daily reading"
+        indexes = [
+            # The leaderboard windows of all users and books
+            models.Index(fields=["day"], name="daily_reading_day_idx"),
+            models.Index(fields=["user", "day"], name="daily_reading_user_day_idx"),
+            models.Index(fields=["book", "day"], name="daily_reading_book_day_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "book", "day"], name="unique_user_book_day"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.book_id} {self.day}"
+
+    @staticmethod
+    def add_session(days, user_id, book_id, start_time, end_time, since=None):
+        parts = split_by_day(start_time, end_time)
+        for index, (day, reading_time) in enumerate(parts):
+            if since and day < since:
+                continue
+            key = (user_id, book_id, day)
+            total, sessions = days.get(key, (timedelta(), 0))
+            days[key] = (total + reading_time, sessions + (index == len(parts) - 1))
+
+    @classmethod
+    def record_sessions(cls, sessions):
+        """
+        Add the reading time of completed sessions with a single upsert that
+        increments the rows which already exist.
+        """
+        days = {}
+        for session in sessions:
+            cls.add_session(
+                days,
+                session.user_id,
+                session.book_id,
+                session.start_time,
+                session.end_time,
+            )
+        if not days:
+            return
+
+        connection = connections[cls.objects.db]
+        table = connection.ops.quote_name(cls._meta.db_table)
+        model_fields = [
+            cls._meta.get_field(name)
+            for name in (
+                "user",
+                "book",
+                "day",
+                "reading_time",
+                "number_of_reading_sessions",
+            )
+        ]
+        columns = ", ".join(
+            connection.ops.quote_name(field.column) for field in model_fields
+        )
+        params = []
+        for key, values in days.items():
+            params += [
+                field.get_db_prep_value(value, connection)
+                for field, value in zip(model_fields, (*key, *values))
+            ]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) "
+                f"VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(days))} "
+                f"ON CONFLICT (user_id, book_id, day) DO UPDATE "
+                f"SET reading_time = {table}.reading_time + EXCLUDED.reading_time, "
+                f"number_of_reading_sessions = {table}.number_of_reading_sessions "
+                f"+ EXCLUDED.number_of_reading_sessions",
+                params,
+            )
+
+    @classmethod
+    def rebuild(cls, since=None, batch_size=1000):
+        """
+        Recompute the rows from the completed sessions, only the days from
+        since on when it is given.
+        """
+        sessions = ReadingSession.objects.filter(end_time__isnull=False)
+        rows = cls.objects.all()
+        if since:
+            midnight = datetime.combine(
+                since, time(), tzinfo=timezone.get_default_timezone()
+            )
+            sessions = sessions.filter(end_time__gt=midnight)
+            rows = rows.filter(day__gte=since)
+        rows.delete()
+
+        days = {}
+        user_id = None
+        rebuilt = 0
+        for session in (
+            sessions.order_by("user_id", "id")
+            .values_list("user_id", "book_id", "start_time", "end_time")
+            .iterator(chunk_size=batch_size)
+        ):
+            # The days of a user are complete once the next user starts
+            if session[0] != user_id and len(days) >= batch_size:
+                rebuilt += cls._insert(days, batch_size)
+                days = {}
+            user_id = session[0]
+            cls.add_session(days, *session, since=since)
+        rebuilt += cls._insert(days, batch_size)
+
+        return rebuilt
+
+    @classmethod
+    def _insert(cls, days, batch_size):
+        cls.objects.bulk_create(
+            [
+                cls(
+                    user_id=user_id,
+                    book_id=book_id,
+                    day=day,
+                    reading_time=reading_time,
+                    number_of_reading_sessions=sessions,
+                )
+                for (user_id, book_id, day), (reading_time, sessions) in days.items()
+            ],
+            batch_size=batch_size,
+        )
+        return len(days)
+
+
+class ReadingSessionManager(models.Manager):
+    # How many times a start is retried when a concurrent start of the same
+    # user wins the one active session constraint
+    start_attempts = 3
+
+    def start(self, user, book):
+        """
+        Stop the active session of the user and start a new one in a single
+        transaction.
+        """
+        for attempt in range(self.start_attempts):
+            try:
+                with transaction.atomic(using=self.db):
+                    return self.create(user=user, book=book)
+            except IntegrityError:
+                if attempt == self.start_attempts - 1:
+                    raise
+
+    async def astart(self, user, book):
+        """
+        Async start, acreate saves the session in a worker thread where
+        ReadingSession.save stops the active session in the same transaction.
+        """
+        for attempt in range(self.start_attempts):
+            try:
+                return await self.acreate(user=user, book=book)
+            except IntegrityError:
+                if attempt == self.start_attempts - 1:
+                    raise
+
+    def ingest(self, user_id, sessions):
+        """
+        Insert completed sessions of a user, e.g. synced from an offline
+        device, and apply them to the books and the stats once per batch
+        instead of once per session.
+        """
+        with transaction.atomic(using=self.db):
+            sessions = self.bulk_create(sessions)
+            if not sessions:
+                return sessions
+
+            last_times_read = {}
+            for session in sessions:
+                last_times_read[session.book_id] = max(
+                    session.end_time,
+                    last_times_read.get(session.book_id, session.end_time),
+                )
+            Book.objects.filter(pk__in=last_times_read).update(
+                last_time_read=Case(
+                    *[
+                        When(
+                            pk=book_id,
+                            then=Greatest(
+                                Coalesce("last_time_read", Value(end_time)),
+                                Value(end_time),
+                            ),
+                        )
+                        for book_id, end_time in last_times_read.items()
+                    ],
+                    output_field=fields.DateTimeField(),
+                )
+            )
+
+            BookStats.record_sessions(sessions, started=True, completed=True)
+            UserBookStats.record_sessions(sessions, started=True, completed=True)
+            DailyReading.record_sessions(sessions)
+            Profile.record_sessions(user_id, sessions, started=True, completed=True)
+
+        Profile.schedule_rebuild(user_id)
+        book_cache.invalidate_book_stats(list(last_times_read))
+        book_cache.invalidate_users([user_id])
+        metrics.count_sessions(started=len(sessions), stopped=len(sessions))
+        return sessions
+
+    def stop(self, session_id, user_id, end_time=None):
+        """
+        Stop a session of the user with a single conditional UPDATE, returns
+        None if there is no such active session.
+        """
+        stopped_sessions = self._stop(
+            "id = %s AND user_id = %s AND end_time IS NULL",
+            [session_id, user_id],
+            end_time,
+        )
+        return stopped_sessions[0] if stopped_sessions else None
+
+    async def astop(self, session_id, user_id, end_time=None):
+        """
+        Async stop with a conditional aupdate, returns None if there is no
+        such active session. The async ORM has no transactions, the stopped
+        session is recorded in a transaction of its own after the UPDATE, the
+        stats missed by a failure in between are restored by
+        rebuild_book_stats, backfill_daily_reading and the profile rebuild.
+        """
+        end_time = end_time or timezone.now()
+        stopped = await self.filter(
+            pk=session_id, user_id=user_id, end_time=None
+        ).aupdate(end_time=end_time)
+        if not stopped:
+            return None
+
+        session = await self.aget(pk=session_id)
+
+        def record_lifecycle():
+            with transaction.atomic(using=self.db, savepoint=False):
+                session.record_lifecycle(completed=True)
+
+        await sync_to_async(record_lifecycle)()
+        return session
+
+    def close_active(self, user_id, end_time=None):
+        """
+        Stop the active session of the user with a single UPDATE.
+        """
+        return self._stop("user_id = %s AND end_time IS NULL", [user_id], end_time)
+
+    def _stop(self, condition, params, end_time):
+        # UPDATE ... RETURNING gives the stopped rows without loading them
+        # first, so a concurrent stop can never be applied twice
+        end_time = end_time or timezone.now()
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            stopped_sessions = list(
+                self.raw(
+                    f"UPDATE {table} SET end_time = %s WHERE {condition} "
+                    f"RETURNING id, user_id, book_id, start_time, end_time",
+                    [connection.ops.adapt_datetimefield_value(end_time), *params],
+                )
+            )
+            for session in stopped_sessions:
+                session.record_lifecycle(completed=True)
+
+        return stopped_sessions
+
+
 class ReadingSession(models.Model):
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    book = models.ForeignKey(Book, on_delete=models.CASCADE)
-    start_time = models.DateTimeField(auto_now_add=True)
+    # Both foreign keys are covered by the composite indexes below
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False
+    )
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, db_index=False)
+    # Not auto_now_add, so that completed sessions synced from offline
+    # devices keep their own start time
+    start_time = models.DateTimeField(default=timezone.now, editable=False)
     end_time = models.DateTimeField(null=True, blank=True)
 
+    objects = ReadingSessionManager()
+
     class Meta:
         ordering = ["id"]
+        indexes = [
+            models.Index(fields=["user", "end_time"], name="session_user_end_time_idx"),
+            models.Index(fields=["book", "end_time"], name="session_book_end_time_idx"),
+            models.Index(fields=["user", "-end_time"], name="session_user_recent_idx"),
+            # Keyset pagination of the sessions of a user
+            models.Index(fields=["user", "id"], name="session_user_id_idx"),
+        ]
+        constraints = [
+            # A user can only read one book at a time
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=Q(end_time__isnull=True),
+                name="one_active_session_per_user",
+            ),
+        ]
 
     def calculate_duration(self):
         if self.start_time and self.end_time:
             return self.end_time - self.start_time
         return None
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored end time to detect when a session gets stopped
+        instance._loaded_end_time = instance.__dict__.get("end_time")
+        return instance
+
     def update_last_time_read(self):
-        if self.end_time and (
+        if not self.end_time:
+            return
+
+        Book.objects.filter(
+            Q(last_time_read__isnull=True) | Q(last_time_read__lt=self.end_time),
+            pk=self.book_id,
+        ).update(last_time_read=self.end_time)
+
+        # Keep an already loaded book in sync without fetching it
+        if self._meta.get_field("book").is_cached(self) and (
             not self.book.last_time_read or self.book.last_time_read < self.end_time
         ):
             self.book.last_time_read = self.end_time
-            self.book.save()
+
+    def record_lifecycle(self, started=False, completed=False):
+        """
+        Apply a started and/or stopped session to the profile, the book and
+        the stats tables with one conditional UPDATE each, the profile is
+        reconciled with the sessions in the background.
+        """
+        if not started and not completed:
+            return
+
+        if completed:
+            self.update_last_time_read()
+            DailyReading.record_sessions([self])
+        BookStats.record_session(self, started=started, completed=completed)
+        UserBookStats.record_session(self, started=started, completed=completed)
+        Profile.record_sessions(
+            self.user_id, [self], started=started, completed=completed
+        )
+        Profile.schedule_rebuild(self.user_id)
+
+        # The cached global stats of the book are stale now
+        book_cache.invalidate_book_stats([self.book_id])
+        book_cache.invalidate_users([self.user_id])
+        metrics.count_sessions(started=int(started), stopped=int(completed))
 
     def stop_reading(self):
-        if not self.end_time:
-            self.end_time = timezone.now()
-            self.save()
+        if self.end_time:
+            return
 
-    def save(self, *args, **kwargs):
-        if not self.pk:
-            # Check if the user already has an active session for this book
-            active_sessions = ReadingSession.objects.filter(
-                user=self.user, book=self.book, end_time=None
+        end_time = timezone.now()
+        with transaction.atomic(savepoint=False):
+            # Only the request that actually stops the session records it
+            stopped = ReadingSession.objects.filter(pk=self.pk, end_time=None).update(
+                end_time=end_time
             )
-            if active_sessions.exists():
+            if stopped:
+                self.end_time = self._loaded_end_time = end_time
+                self.record_lifecycle(completed=True)
+
+        if not stopped:
+            self.refresh_from_db(fields=["end_time"])
+
+    def save(self, *args, **kwargs):
+        # Read by the post_save lifecycle handler
+        self.completed_on_save = (
+            self.end_time is not None
+            and getattr(self, "_loaded_end_time", None) is None
+        )
+
+        with transaction.atomic(savepoint=False):
+            if not self.pk and self.end_time is None:
                 # If there is an active session, stop it before starting a new one
-                active_sessions.first().stop_reading()
+                ReadingSession.objects.close_active(self.user_id)
+
+            super().save(*args, **kwargs)
 
-        super().save(*args, **kwargs)
+        self._loaded_end_time = self.end_time
 
 
 class Profile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     last_activity = models.DateTimeField(null=True, blank=True)
     number_of_reading_sessions = models.PositiveIntegerField(default=0)
+    number_of_completed_sessions = models.PositiveIntegerField(default=0)
     total_reading_time = models.DurationField(default=timezone.timedelta)
     last_book_read = models.ForeignKey(
         "Book", null=True, blank=True, on_delete=models.SET_NULL
     )
+    # When the counters above last changed, by a session or by a rebuild
+    stats_updated_at = models.DateTimeField(null=True, blank=True)
 
-    def update_reading_sessions_count(self):
-        # Count the number of reading sessions for the user
-        count = ReadingSession.objects.filter(user=self.user).count()
-        self.number_of_reading_sessions = count
+    @classmethod
+    def rebuild(cls, user_ids=None):
+        """
+        Recompute the counters of the profiles from the reading sessions,
+        all profiles are updated with a single query.
+        """
+        sessions = ReadingSession.objects.filter(user=OuterRef("user")).order_by()
+        completed = sessions.filter(end_time__isnull=False)
 
-        self.save()
+        def aggregate(queryset, expression):
+            return Subquery(
+                queryset.values("user").annotate(value=expression).values("value")
+            )
 
-    def calculate_total_reading_time_for_user(self):
-        total_duration = (
-            ReadingSession.objects.filter(
-                user=self.user, end_time__isnull=False
-            ).aggregate(
-                total_duration=ExpressionWrapper(
-                    Sum(F("end_time") - F("start_time")),
-                    output_field=fields.DurationField(),
-                )
-            )[
-                "total_duration"
-            ]
-            or timedelta()
+        profiles = cls.objects.all()
+        if user_ids is not None:
+            profiles = profiles.filter(user_id__in=user_ids)
+        updated = profiles.update(
+            number_of_reading_sessions=Coalesce(
+                aggregate(sessions, Count("id")), Value(0)
+            ),
+            number_of_completed_sessions=Coalesce(
+                aggregate(completed, Count("id")), Value(0)
+            ),
+            total_reading_time=Coalesce(
+                aggregate(
+                    completed,
+                    ExpressionWrapper(
+                        Sum(F("end_time") - F("start_time")),
+                        output_field=fields.DurationField(),
+                    ),
+                ),
+                Value(timedelta()),
+            ),
+            last_activity=aggregate(sessions, models.Max("start_time")),
+            last_book_read=Subquery(completed.order_by("-end_time").values("book")[:1]),
+            stats_updated_at=timezone.now(),
         )
+        book_cache.invalidate_users(user_ids)
+        return updated
+
+    @classmethod
+    def record_sessions(cls, user_id, sessions, started=False, completed=False):
+        """
+        Apply started and/or completed sessions of the user to the counters
+        of the profile with a single UPDATE.
+        """
+        changes = {}
+        if started:
+            start_time = Value(
+                max(session.start_time for session in sessions),
+                output_field=fields.DateTimeField(),
+            )
+            changes["number_of_reading_sessions"] = F(
+                "number_of_reading_sessions"
+            ) + len(sessions)
+            changes["last_activity"] = Greatest(
+                Coalesce("last_activity", start_time), start_time
+            )
+        if completed:
+            latest = max(sessions, key=lambda session: session.end_time)
+            changes["number_of_completed_sessions"] = F(
+                "number_of_completed_sessions"
+            ) + len(sessions)
+            changes["total_reading_time"] = F("total_reading_time") + sum(
+                (session.calculate_duration() for session in sessions), timedelta()
+            )
+            # Older sessions, e.g. synced from another device, keep the book
+            # that was read last
+            read_later = UserBookStats.objects.filter(
+                user_id=user_id, last_time_read__gt=latest.end_time
+            )
+            changes["last_book_read"] = Case(
+                When(~Exists(read_later), then=Value(latest.book_id)),
+                default=F("last_book_read"),
+                output_field=fields.BigIntegerField(),
+            )
+        if changes:
+            cls.objects.filter(user_id=user_id).update(
+                **changes, stats_updated_at=timezone.now()
+            )
+
+    @classmethod
+    def schedule_rebuild(cls, user_id):
+        """
+        Reconcile the profile of the user with the sessions in a background
+        task once the transaction commits. Every event until the task starts
+        is coalesced into that single rebuild.
+        """
+        from reader.tasks import schedule_profile_rebuild
+
+        transaction.on_commit(partial(schedule_profile_rebuild, user_id))
+
+
+class Leaderboard(models.Model):
+    """
+    Materialized top books and readers, refreshed periodically instead of
+    grouping the sessions on every request. The windows are summed from the
+    daily reading rollup, the all time rankings are read from the book stats
+    and the profiles.
+    """
+
+    BOOKS = "books"
+    READERS = "readers"
+    BOARDS = (BOOKS, READERS)
+    # Ranked total of every ranking and its value for no reading, sessions
+    # are the completed ones on every board and window
+    RANKINGS = {
+        "reading_time": ("total_reading_time", timedelta()),
+        "sessions": ("sessions", 0),
+    }
+    # Days of every window, including today
+    WINDOWS = {"7d": 7, "30d": 30, "all": None}
+
+    board = models.CharField(max_length=16)
+    window = models.CharField(max_length=8)
+    ranking = models.CharField(max_length=16)
+    rank = models.PositiveIntegerField()
+    book = models.ForeignKey(
+        Book, null=True, on_delete=models.CASCADE, related_name="+"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    reading_time = models.DurationField()
+    number_of_reading_sessions = models.PositiveIntegerField()
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["board", "window", "ranking", "rank"],
+                name="unique_leaderboard_rank",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.board} {self.window} {self.ranking}: {self.rank}"
 
-        self.total_reading_time = total_duration
-        self.save()
+    @classmethod
+    def board_key(cls, board):
+        return "book" if board == cls.BOOKS else "user"
 
-    def get_last_book_read(self):
-        last_reading_session = (
-            ReadingSession.objects.filter(user=self.user, end_time__isnull=False)
-            .order_by("-end_time")
-            .first()
+    @classmethod
+    def totals(cls, board, since):
+        key = cls.board_key(board)
+        if since:
+            return (
+                DailyReading.objects.filter(day__gte=since)
+                .values(key)
+                .annotate(
+                    total_reading_time=Sum("reading_time"),
+                    sessions=Sum("number_of_reading_sessions"),
+                )
+            )
+        if board == cls.BOOKS:
+            return BookStats.objects.values(
+                key, "total_reading_time", sessions=F("number_of_completed_sessions")
+            )
+        return Profile.objects.values(
+            key, "total_reading_time", sessions=F("number_of_completed_sessions")
         )
 
-        if last_reading_session:
-            self.last_book_read = last_reading_session.book
-        else:
-            self.last_book_read = None
+    @classmethod
+    def refresh(cls, size=None):
+        """
+        Recompute the top rows of every board, window and ranking, the old
+        rows are replaced in one transaction.
+        """
+        size = size or settings.LEADERBOARD_SIZE
+        today = timezone.localdate()
+        refreshed_at = timezone.now()
+
+        rows = []
+        for window, days in cls.WINDOWS.items():
+            since = days and today - timedelta(days=days - 1)
+            for board in cls.BOARDS:
+                key = cls.board_key(board)
+                totals = cls.totals(board, since)
+                for ranking, (field, zero) in cls.RANKINGS.items():
+                    top = totals.filter(**{f"{field}__gt": zero}).order_by(
+                        f"-{field}", key
+                    )[:size]
+                    rows += [
+                        cls(
+                            board=board,
+                            window=window,
+                            ranking=ranking,
+                            rank=rank,
+                            reading_time=row["total_reading_time"],
+                            number_of_reading_sessions=row["sessions"],
+                            refreshed_at=refreshed_at,
+                            **{f"{key}_id": row[key]},
+                        )
+                        for rank, row in enumerate(top, 1)
+                    ]
 
-        self.save()
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows)
+        return refreshed_at
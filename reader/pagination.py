@@ -0,0 +1,120 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor based pagination, every page costs the same single query because
+    it seeks on the indexed ordering instead of counting and skipping rows.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "id"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.queryset = queryset
+        return super().paginate_queryset(queryset, request, view)
+
+    def decode_cursor(self, request):
+        # An empty cursor requests the first page
+        if not request.query_params.get(self.cursor_query_param):
+            return None
+        cursor = super().decode_cursor(request)
+        if cursor.position is None:
+            return cursor
+
+        # Positions are encoded as text, the rows are compared with the value
+        # of the ordering field, e.g. a duration of annotated stats
+        try:
+            position = self.get_position_field().to_python(cursor.position)
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(position=position)
+
+    def get_position_field(self):
+        name = self.ordering[0].lstrip("-")
+        annotations = self.queryset.query.annotations
+        if name in annotations:
+            return annotations[name].output_field
+        opts = self.queryset.model._meta
+        return opts.pk if name == "pk" else opts.get_field(name)
+
+
+class Pagination(PageNumberPagination):
+    """
+    Page number pagination that switches to keyset pagination when the
+    request has a ?cursor= parameter, the response has no count then.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_pagination_class = KeysetPagination
+
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor_query_param = self.cursor_pagination_class.cursor_query_param
+        if cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset on the async ORM, the page number pagination counts
+        and reads the rows with acount and async iteration.
+        """
+        cursor_query_param = self.cursor_pagination_class.cursor_query_param
+        if cursor_query_param in request.query_params:
+            return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Read by the paginator instead of its sync count query
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+        self.page.object_list = [row async for row in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.request = request
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        cursor_parameters = (
+            self.cursor_pagination_class().get_schema_operation_parameters(view)
+        )
+        return parameters + [
+            parameter
+            for parameter in cursor_parameters
+            if parameter["name"] == self.cursor_pagination_class.cursor_query_param
+        ]
+
+
+class ReadingHistoryPagination(KeysetPagination):
+    # The last_read annotation of the reading history, see UserBookStats
+    ordering = ("-last_read", "-id")
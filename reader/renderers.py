@@ -0,0 +1,124 @@
+try:
+    import orjson
+except ImportError:
+    orjson = None
+import csv
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed, the output
+    is the same bytes as the stdlib encoder gives.
+    """
+
+    # Datetimes and dataclasses are encoded like the DRF encoder does
+    orjson_options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if orjson
+        else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=self.orjson_options,
+            )
+        except TypeError:
+            # E.g. keys that are not strings, the stdlib encoder converts them
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped like JSONRenderer does, JSON stays a subset of javascript
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class Echo:
+    # File-like object that returns what is written, for csv.writer
+    def write(self, value):
+        return value
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Renderer of exports streamed row by row, the lines are joined into
+    chunks so the server does not write every line on its own. Other data,
+    e.g. error responses, is rendered as a single row.
+    """
+
+    charset = "utf-8"
+    lines_per_chunk = 1000
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return b"".join(self.stream([data]))
+
+    def stream(self, rows):
+        render_row = self.get_row_renderer()
+        lines = []
+        for row in rows:
+            lines.append(render_row(row))
+            if len(lines) >= self.lines_per_chunk:
+                yield b"".join(lines)
+                lines = []
+        if lines:
+            yield b"".join(lines)
+
+    def get_row_renderer(self):
+        """
+        A function that renders a row dict as the bytes of its line(s).
+        """
+        raise NotImplementedError(
+            "Renderer class requires .get_row_renderer() to be implemented"
+        )
+
+
+class CSVRenderer(StreamingRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def get_row_renderer(self):
+        writer = csv.writer(Echo())
+        default = JSONEncoder().default
+        header = []
+
+        def to_cell(value):
+            # Strings and numbers as they are, e.g. durations like in the JSON
+            if value is None or isinstance(value, (str, int, float)):
+                return value
+            return default(value)
+
+        def render_row(row):
+            line = ""
+            if not header:
+                # Written with the first row, the columns are its keys
+                header.extend(row)
+                line = writer.writerow(header)
+            line += writer.writerow([to_cell(row.get(name)) for name in header])
+            return line.encode(self.charset)
+
+        return render_row
+
+
+class JSONLinesRenderer(StreamingRenderer):
+    media_type = "application/x-ndjson"
+    format = "jsonl"
+
+    def get_row_renderer(self):
+        renderer = FastJSONRenderer()
+        return lambda row: renderer.render(row) + b"\n"
@@ -0,0 +1,109 @@
+from django.db import connections
+from rest_framework import serializers
+from rest_framework.settings import ISO_8601, api_settings
+
+# Rows of the list endpoints read with .values() and converted the way the
+# serializer fields and the JSON encoder of DRF would, without a serializer
+# and field lookups per row
+
+
+def identity(value):
+    return value
+
+
+def datetime_converter(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    tz = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    if tz is None or output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+
+    # DateTimeField.to_representation with the time zone looked up once
+    def convert(value):
+        value = value.astimezone(tz).isoformat()
+        if value.endswith("+00:00"):
+            return value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+class ValuesSerializer:
+    """
+    Convert .values() rows to the representation of a serializer.
+
+    Model fields are read from their columns, method fields from the
+    annotations given as name: (annotation, expression) with the value the
+    method returns. The expression is added unless it is None, then the
+    queryset has the annotation already.
+    """
+
+    def __init__(self, serializer, method_fields):
+        model = serializer.Meta.model
+        self.columns = []
+        self.annotations = {}
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                source, expression = method_fields[name]
+                converter = identity
+                if expression is not None:
+                    self.annotations[source] = expression
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                source = model._meta.get_field(field.source).attname
+                converter = identity
+            elif isinstance(field, serializers.DateTimeField):
+                source, converter = field.source, datetime_converter(field)
+            elif isinstance(field, (serializers.CharField, serializers.IntegerField)):
+                # The columns already are strings and integers
+                source, converter = field.source, identity
+            else:
+                source, converter = field.source, field.to_representation
+            self.columns.append((name, source, converter))
+
+    def values(self, queryset, *extra):
+        """
+        The values queryset of the columns, extra columns are e.g. read by
+        the keyset pagination.
+        """
+        queryset = queryset.annotate(
+            **{
+                name: expression
+                for name, expression in self.annotations.items()
+                if name not in queryset.query.annotations
+            }
+        )
+        sources = {source for _, source, _ in self.columns}
+        return queryset.values(*sources, *(name for name in extra if name))
+
+    def convert(self, rows):
+        return list(self.iterate(rows))
+
+    def iterate(self, rows):
+        # Lazy, e.g. for the rows of a queryset .iterator() that are streamed
+        columns = self.columns
+        for row in rows:
+            yield {
+                name: None if row[source] is None else converter(row[source])
+                for name, source, converter in columns
+            }
+
+
+def iterate_chunks(queryset, chunk_size):
+    """
+    Iterate over the rows of a .values() queryset ordered by id, fetched
+    chunk_size rows at a time. The chunks come from a server side cursor,
+    when they are disabled, e.g. behind pgbouncer, every chunk is a query of
+    the rows after the last id.
+    """
+    connection = connections[queryset.db]
+    if not connection.settings_dict.get("DISABLE_SERVER_SIDE_CURSORS"):
+        yield from queryset.iterator(chunk_size=chunk_size)
+        return
+
+    rows = list(queryset[:chunk_size])
+    while rows:
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        rows = list(queryset.filter(id__gt=rows[-1]["id"])[:chunk_size])
@@ -0,0 +1,184 @@
+import re
+from collections import defaultdict
+
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+
+from . import cache as book_cache
+from .models import Book
+
+# Full text search of the catalogue. PostgreSQL matches the weighted search
+# vector against the book_search_idx GIN index and misspelled authors against
+# the trigram index when pg_trgm is installed, see migration 0010. Other
+# databases search an inverted index that is built in memory.
+
+SEARCH_CONFIG = "english"
+# The weights of the fields must stay the same as in the index expression
+SEARCH_FIELDS = {
+    "title": "A",
+    "author": "B",
+    "short_description": "C",
+    "long_description": "D",
+}
+# Default weights of ts_rank
+RANK_WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+# Default pg_trgm.word_similarity_threshold of the %> operator
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+WORD_RE = re.compile(r"\w+")
+
+_trigram_installed = {}
+_inverted_index = None
+
+
+def search_books(queryset, term):
+    """
+    Filter the books to those matching the search term, the best matches
+    first.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        return search_postgresql(queryset, term, connection)
+    return search_inverted_index(queryset, term)
+
+
+def search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    vectors = [
+        SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        for field, weight in SEARCH_FIELDS.items()
+    ]
+    vector = vectors[0]
+    for other in vectors[1:]:
+        vector = vector + other
+    return vector
+
+
+def trigram_installed(connection):
+    # pg_trgm is a contrib extension that is not always available
+    if connection.alias not in _trigram_installed:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_installed[connection.alias] = cursor.fetchone() is not None
+    return _trigram_installed[connection.alias]
+
+
+def search_postgresql(queryset, term, connection):
+    from django.contrib.postgres.search import (
+        SearchQuery,
+        SearchRank,
+        TrigramWordSimilarity,
+    )
+
+    query = SearchQuery(term, search_type="websearch", config=SEARCH_CONFIG)
+    queryset = queryset.annotate(
+        search_vector=search_vector(),
+        search_rank=SearchRank(F("search_vector"), query),
+    )
+    if not trigram_installed(connection):
+        return queryset.filter(search_vector=query).order_by("-search_rank", "id")
+
+    # Authors that are misspelled in the term have no lexeme in common with
+    # it, they are found by the trigram index instead
+    return (
+        queryset.annotate(author_similarity=TrigramWordSimilarity(term, "author"))
+        .filter(Q(search_vector=query) | Q(author__trigram_word_similar=term))
+        .order_by("-search_rank", "-author_similarity", "id")
+    )
+
+
+def words(text):
+    return WORD_RE.findall(text.lower()) if text else []
+
+
+def trigrams(text):
+    # Every word is padded like pg_trgm does, two spaces before and one after
+    result = set()
+    for word in words(text):
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def word_similarity(term, text):
+    """
+    Share of the trigrams of the term found in the text, close to the
+    word_similarity() of pg_trgm.
+    """
+    term_trigrams = trigrams(term)
+    if not term_trigrams:
+        return 0.0
+    return len(term_trigrams & trigrams(text)) / len(term_trigrams)
+
+
+class InvertedIndex:
+    """
+    Words of the searched fields mapped to the books containing them with the
+    weighted number of occurrences, a stand in for the search vector where
+    there is no full text search.
+    """
+
+    def __init__(self, rows):
+        self.postings = defaultdict(lambda: defaultdict(float))
+        self.authors = {}
+        for book_id, *values in rows:
+            for value, weight in zip(values, SEARCH_FIELDS.values()):
+                for word in words(value):
+                    self.postings[word][book_id] += RANK_WEIGHTS[weight]
+            self.authors[book_id] = values[1]
+
+    @classmethod
+    def for_books(cls, books):
+        return cls(books.values_list("id", *SEARCH_FIELDS).iterator())
+
+    def search(self, term):
+        """
+        Return the ids of the books with every word of the term and of the
+        books with a similar author, mapped to (rank, author similarity).
+        """
+        ranks = {}
+        postings = [self.postings.get(word, {}) for word in words(term)]
+        if postings:
+            matches = set(postings[0]).intersection(*postings[1:])
+            ranks = {
+                book_id: sum(posting[book_id] for posting in postings)
+                for book_id in matches
+            }
+
+        results = {}
+        for book_id, author in self.authors.items():
+            similarity = word_similarity(term, author)
+            if book_id in ranks or similarity > WORD_SIMILARITY_THRESHOLD:
+                results[book_id] = (ranks.get(book_id, 0.0), similarity)
+        return results
+
+
+def get_inverted_index(using):
+    # Rebuilt when books are written, the reading stats are not indexed
+    global _inverted_index
+    version = (using, book_cache.content_version())
+    if _inverted_index is None or _inverted_index[0] != version:
+        _inverted_index = (version, InvertedIndex.for_books(Book.objects.using(using)))
+    return _inverted_index[1]
+
+
+def search_inverted_index(queryset, term):
+    results = get_inverted_index(queryset.db).search(term)
+    if not results:
+        return queryset.none()
+
+    def ranked(position):
+        return Case(
+            *(
+                When(pk=book_id, then=Value(values[position]))
+                for book_id, values in results.items()
+            ),
+            output_field=FloatField(),
+        )
+
+    return (
+        queryset.filter(pk__in=results)
+        .annotate(search_rank=ranked(0), author_similarity=ranked(1))
+        .order_by("-search_rank", "-author_similarity", "id")
+    )
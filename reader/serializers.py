@@ -1,8 +1,54 @@
-from rest_framework import serializers
-from .models import Book, ReadingSession, Profile
+from itertools import islice
 
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from .activity import GRANULARITIES, MAX_PERIODS, default_start, periods
+from .models import Book, Leaderboard, ReadingSession, Profile, UserBookStats
+
+
+def sparse_fieldset(query_params, names):
+    """
+    Names of the fields listed in ?fields= without those listed in ?omit=,
+    both comma separated. The id is always included.
+    """
+    fields = query_params.get("fields")
+    omit = query_params.get("omit")
+    if fields:
+        requested = {"id", *fields.split(",")}
+        names = [name for name in names if name in requested]
+    if omit:
+        omitted = set(omit.split(",")) - {"id"}
+        names = [name for name in names if name not in omitted]
+    return names
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer of only the fields requested with ?fields= or ?omit=, the
+    others are neither read nor computed. Writes keep every field.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method not in ("GET", "HEAD"):
+            return
+        # request.GET of Django and DRF requests
+        requested = set(sparse_fieldset(request.GET, list(self.fields)))
+        for name in list(self.fields):
+            if name not in requested:
+                self.fields.pop(name)
+
+
+class BookSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Fields that depend on the requesting user and are never cached
+    user_fields = ("total_reading_time_for_user",)
 
-class BookSerializer(serializers.ModelSerializer):
     total_reading_time_for_user = serializers.SerializerMethodField()
     total_number_of_reading_sessions_for_all_users = serializers.SerializerMethodField()
     total_reading_time_for_all_users = serializers.SerializerMethodField()
@@ -27,19 +73,42 @@ class BookSerializer(serializers.ModelSerializer):
             "total_number_of_reading_sessions_for_all_users",
             "total_reading_time_for_all_users",
         )
-        extra_kwargs = {"long_description": {"write_only": True}}
+        extra_kwargs = {
+            "long_description": {"write_only": True},
+            "year_of_publishing": {"required": True},
+        }
 
+    # The user stats are joined by BookViewSet.get_queryset, the model
+    # method is only used for instances that were not loaded through it
     def get_total_reading_time_for_user(self, obj):
+        if hasattr(obj, "annotated_total_reading_time_for_user"):
+            return obj.annotated_total_reading_time_for_user
         user = self.context["request"].user
         return obj.total_reading_time_for_user(user)
 
     @staticmethod
     def get_total_number_of_reading_sessions_for_all_users(obj):
-        return obj.total_number_of_reading_sessions_for_all_users()
+        return obj.get_stats().number_of_reading_sessions
 
     @staticmethod
     def get_total_reading_time_for_all_users(obj):
-        return obj.total_reading_time_for_all_users()
+        return obj.get_stats().total_reading_time
+
+
+class BookImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(
+        choices=("csv", "jsonl"),
+        required=False,
+        help_text="Guessed from the file extension by default",
+    )
+    batch_size = serializers.IntegerField(min_value=1, max_value=10000, default=1000)
+
+
+class BookFilterSerializer(serializers.Serializer):
+    author = serializers.CharField(required=False, help_text="Exact author name")
+    year_of_publishing__gte = serializers.IntegerField(required=False, min_value=0)
+    last_time_read__gte = serializers.DateTimeField(required=False)
 
 
 class BookDetailSerializer(BookSerializer):
@@ -58,7 +127,13 @@ class BookDetailSerializer(BookSerializer):
         )
 
 
-class ReadingSessionSerializer(serializers.ModelSerializer):
+class ReadingSessionConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Another reading session was started at the same time."
+    default_code = "conflict"
+
+
+class ReadingSessionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     duration = serializers.SerializerMethodField()
 
     class Meta:
@@ -75,18 +150,123 @@ class ReadingSessionSerializer(serializers.ModelSerializer):
         user = self.context["request"].user
         validated_data["user"] = user
 
-        # Create the reading session instance
-        reading_session = super().create(validated_data)
+        # The associated Profile is updated by the session lifecycle handler
+        try:
+            return ReadingSession.objects.start(**validated_data)
+        except IntegrityError:
+            raise ReadingSessionConflict()
+
+    async def acreate(self, validated_data):
+        # create() on the async ORM, see AsyncReadingSessionViewSet
+        validated_data["user"] = self.context["request"].user
+
+        try:
+            return await ReadingSession.objects.astart(**validated_data)
+        except IntegrityError:
+            raise ReadingSessionConflict()
 
-        # Update the number_of_reading_sessions and last_activity in the associated Profile
-        profile = user.profile
-        profile.update_reading_sessions_count()
-        profile.calculate_total_reading_time_for_user()
-        profile.get_last_book_read()
-        profile.last_activity = reading_session.start_time
-        profile.save()
 
-        return reading_session
+class ReadingSessionBulkListSerializer(serializers.ListSerializer):
+    max_sessions = 1000
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and len(data) > self.max_sessions:
+            raise serializers.ValidationError(
+                {
+                    "non_field_errors": [
+                        f"Ensure there are no more than {self.max_sessions} sessions."
+                    ]
+                }
+            )
+
+        # The checks across sessions run once every session is valid on its
+        # own and report their errors per session like the field errors
+        attrs = super().to_internal_value(data)
+        errors = self.validate_sessions(attrs)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def validate_sessions(self, attrs):
+        user = self.context["request"].user
+        errors = [{} for _ in attrs]
+
+        # All books are checked with one query instead of one per session
+        book_ids = {session["book"] for session in attrs}
+        existing_book_ids = set(
+            Book.objects.filter(pk__in=book_ids).values_list("pk", flat=True)
+        )
+        for index, session in enumerate(attrs):
+            if session["book"] not in existing_book_ids:
+                errors[index]["book"] = [
+                    f'Invalid pk "{session["book"]}" - object does not exist.'
+                ]
+
+        # Sessions must overlap neither each other nor the stored sessions
+        stored_sessions = ReadingSession.objects.filter(
+            Q(end_time__gt=min(session["start_time"] for session in attrs))
+            | Q(end_time__isnull=True),
+            user=user,
+            start_time__lt=max(session["end_time"] for session in attrs),
+        ).values_list("start_time", "end_time")
+        intervals = sorted(
+            [
+                (start_time, end_time or timezone.now(), None)
+                for start_time, end_time in stored_sessions
+            ]
+            + [
+                (session["start_time"], session["end_time"], index)
+                for index, session in enumerate(attrs)
+            ],
+            key=lambda interval: interval[:2],
+        )
+        latest = None
+        for interval in intervals:
+            if latest and interval[0] < latest[1]:
+                for index in (latest[2], interval[2]):
+                    if index is not None and not errors[index].get("start_time"):
+                        errors[index]["start_time"] = [
+                            "Overlaps another reading session."
+                        ]
+            if not latest or interval[1] > latest[1]:
+                latest = interval
+
+        return errors
+
+    def create(self, validated_data):
+        user = self.context["request"].user
+        return ReadingSession.objects.ingest(
+            user.id,
+            [
+                ReadingSession(
+                    user=user,
+                    book_id=session["book"],
+                    start_time=session["start_time"],
+                    end_time=session["end_time"],
+                )
+                for session in validated_data
+            ],
+        )
+
+
+class ReadingSessionBulkSerializer(serializers.Serializer):
+    book = serializers.IntegerField()
+    start_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+
+    class Meta:
+        list_serializer_class = ReadingSessionBulkListSerializer
+
+    def validate(self, attrs):
+        if attrs["end_time"] <= attrs["start_time"]:
+            raise serializers.ValidationError(
+                {"end_time": ["Must be later than start_time."]}
+            )
+        if attrs["end_time"] > timezone.now():
+            raise serializers.ValidationError(
+                {"end_time": ["Can not be in the future."]}
+            )
+        return attrs
 
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -95,15 +275,99 @@ class ProfileSerializer(serializers.ModelSerializer):
         fields = (
             "user",
             "number_of_reading_sessions",
+            "number_of_completed_sessions",
             "last_activity",
             "total_reading_time",
             "last_book_read",
+            "stats_updated_at",
         )
         read_only_fields = (
             "user",
             "number_of_reading_sessions",
+            "number_of_completed_sessions",
             "last_activity",
             "total_reading_time",
             "last_book_read",
+            "stats_updated_at",
         )
 
+
+class UserBookStatsSerializer(serializers.ModelSerializer):
+    title = serializers.CharField(source="book.title", read_only=True)
+    author = serializers.CharField(source="book.author", read_only=True)
+
+    class Meta:
+        model = UserBookStats
+        fields = (
+            "book",
+            "title",
+            "author",
+            "number_of_reading_sessions",
+            "total_reading_time",
+            "last_time_read",
+        )
+        read_only_fields = fields
+
+
+class ActivityQuerySerializer(serializers.Serializer):
+    granularity = serializers.ChoiceField(choices=GRANULARITIES, default="day")
+    start = serializers.DateField(
+        required=False, help_text="The last 30 days, 26 weeks or 12 months by default"
+    )
+    end = serializers.DateField(required=False, help_text="Today by default")
+
+    def validate(self, attrs):
+        attrs.setdefault("end", timezone.localdate())
+        attrs.setdefault("start", default_start(attrs["end"], attrs["granularity"]))
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError({"start": ["Must not be after end."]})
+        if len(list(islice(periods(**attrs), MAX_PERIODS + 1))) > MAX_PERIODS:
+            raise serializers.ValidationError(
+                {"start": [f"Ensure there are no more than {MAX_PERIODS} periods."]}
+            )
+        return attrs
+
+
+class ActivitySerializer(serializers.Serializer):
+    period = serializers.DateField(help_text="First day of the period")
+    reading_time = serializers.DurationField()
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    by = serializers.ChoiceField(
+        choices=list(Leaderboard.RANKINGS), default="reading_time"
+    )
+    window = serializers.ChoiceField(choices=list(Leaderboard.WINDOWS), default="7d")
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.LEADERBOARD_SIZE, default=10
+    )
+
+
+class TopBookSerializer(serializers.ModelSerializer):
+    title = serializers.CharField(source="book.title", read_only=True)
+    author = serializers.CharField(source="book.author", read_only=True)
+    sessions = serializers.IntegerField(
+        source="number_of_reading_sessions", read_only=True
+    )
+
+    class Meta:
+        model = Leaderboard
+        fields = ("rank", "book", "title", "author", "reading_time", "sessions")
+        read_only_fields = fields
+
+
+class TopReaderSerializer(serializers.ModelSerializer):
+    name = serializers.SerializerMethodField()
+    sessions = serializers.IntegerField(
+        source="number_of_reading_sessions", read_only=True
+    )
+
+    class Meta:
+        model = Leaderboard
+        fields = ("rank", "user", "name", "reading_time", "sessions")
+        read_only_fields = fields
+
+    @staticmethod
+    def get_name(obj):
+        # Only the name is public, never the email address
+        return obj.user.full_name.strip()
@@ -1,21 +1,33 @@
-from django.db.models.signals import post_save, pre_delete
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from reader.models import ReadingSession
+from reader import cache as book_cache
+from reader.middleware import install_query_recorder
+from reader.models import Book, ReadingSession
 
+# Every connection counts the queries of the request that runs them, see
+# QueryInstrumentationMiddleware
+connection_created.connect(install_query_recorder)
 
+
+# Single handler for every change of a reading session: the profile, the book
+# and the stats are updated with one UPDATE each when a session is started
+# and when it is stopped
 @receiver(post_save, sender=ReadingSession)
-def update_book_last_time_read(sender, instance, **kwargs):
-    instance.update_last_time_read()
+def handle_reading_session_lifecycle(sender, instance, created, **kwargs):
+    instance.record_lifecycle(
+        started=created,
+        completed=getattr(instance, "completed_on_save", False),
+    )
 
 
-@receiver(post_save, sender=ReadingSession)
-def update_profile_last_activity(sender, instance, **kwargs):
-    instance.user.profile.last_activity = instance.start_time
-    instance.user.profile.save()
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_book_cache(sender, instance, **kwargs):
+    book_cache.invalidate_books([instance.pk])
 
 
-# Signal to update the last_book_read when a ReadingSession is saved
-@receiver(post_save, sender=ReadingSession)
-def update_profile_last_book_read(sender, instance, **kwargs):
-    profile = instance.user.profile
-    profile.update_reading_sessions_count()
+@receiver(post_delete, sender=Book)
+def invalidate_user_responses(sender, instance, **kwargs):
+    # The sessions and stats of the book are deleted with it
+    book_cache.invalidate_users()
@@ -0,0 +1,34 @@
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+
+from reader import leaderboards
+from reader.models import Profile
+
+PROFILE_REBUILD_KEY = "reader:profile:{user_id}:rebuild"
+
+
+def schedule_profile_rebuild(user_id):
+    # The counters are already updated incrementally, the rebuild only
+    # reconciles them and is skipped without a worker to run it
+    if not (settings.CELERY_BROKER_URL or rebuild_profile.app.conf.task_always_eager):
+        return
+
+    # Only the first event of a burst schedules the task, the key expires in
+    # case the task is lost
+    key = PROFILE_REBUILD_KEY.format(user_id=user_id)
+    delay = settings.PROFILE_REBUILD_DELAY
+    if cache.add(key, True, delay + settings.PROFILE_REBUILD_TIMEOUT):
+        rebuild_profile.apply_async((user_id,), countdown=delay)
+
+
+@shared_task(ignore_result=True)
+def rebuild_profile(user_id):
+    # Events from now on schedule the next rebuild
+    cache.delete(PROFILE_REBUILD_KEY.format(user_id=user_id))
+    Profile.rebuild(user_ids=[user_id])
+
+
+@shared_task(ignore_result=True)
+def refresh_leaderboards():
+    leaderboards.refresh()
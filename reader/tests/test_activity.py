@@ -0,0 +1,204 @@
+from datetime import date, datetime, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from reader.activity import split_by_day
+from reader.models import Book, DailyReading, ReadingSession
+
+PROFILE_ACTIVITY_URL = reverse("reader:profile-activity")
+
+
+def book_activity_url(book_id: int):
+    return reverse("reader:book-activity", args=[book_id])
+
+
+def local(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class SplitByDayTests(TestCase):
+    def test_session_is_split_at_local_midnight(self):
+        self.assertEqual(
+            split_by_day(local(2023, 1, 1, 23, 30), local(2023, 1, 2, 1, 0)),
+            [
+                (date(2023, 1, 1), timedelta(minutes=30)),
+                (date(2023, 1, 2), timedelta(hours=1)),
+            ],
+        )
+
+    def test_days_with_a_dst_change(self):
+        # The clocks of TIME_ZONE go forward on 2023-03-26, the day is 23 hours
+        self.assertEqual(
+            split_by_day(local(2023, 3, 26), local(2023, 3, 27)),
+            [(date(2023, 3, 26), timedelta(hours=23))],
+        )
+
+    def test_active_sessions_have_no_reading_time(self):
+        self.assertEqual(split_by_day(local(2023, 1, 1), None), [])
+
+
+class DailyReadingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.book = Book.objects.create(title="Book", year_of_publishing=2000)
+
+    def rows(self):
+        return list(
+            DailyReading.objects.order_by("day").values_list("day", "reading_time")
+        )
+
+    def test_stopped_sessions_are_added_to_the_rollup(self):
+        for start, end in (
+            (local(2023, 1, 1, 23), local(2023, 1, 2, 1)),
+            (local(2023, 1, 2, 10), local(2023, 1, 2, 11)),
+        ):
+            session = ReadingSession.objects.create(
+                user=self.user, book=self.book, start_time=start
+            )
+            ReadingSession.objects.stop(session.id, self.user.id, end_time=end)
+
+        self.assertEqual(
+            self.rows(),
+            [
+                (date(2023, 1, 1), timedelta(hours=1)),
+                (date(2023, 1, 2), timedelta(hours=2)),
+            ],
+        )
+        # Sessions are counted on the day they ended
+        self.assertEqual(
+            list(
+                DailyReading.objects.order_by("day").values_list(
+                    "number_of_reading_sessions", flat=True
+                )
+            ),
+            [0, 2],
+        )
+
+    def test_ingested_sessions_are_added_to_the_rollup(self):
+        ReadingSession.objects.ingest(
+            self.user.id,
+            [
+                ReadingSession(
+                    user=self.user,
+                    book=self.book,
+                    start_time=local(2023, 1, 1, hour),
+                    end_time=local(2023, 1, 1, hour, 30),
+                )
+                for hour in range(3)
+            ],
+        )
+
+        self.assertEqual(self.rows(), [(date(2023, 1, 1), timedelta(minutes=90))])
+
+    def test_backfill_matches_the_incremental_rollup(self):
+        session = ReadingSession.objects.create(
+            user=self.user, book=self.book, start_time=local(2023, 1, 1, 22)
+        )
+        ReadingSession.objects.stop(
+            session.id, self.user.id, end_time=local(2023, 1, 3, 2)
+        )
+        expected = self.rows()
+
+        DailyReading.objects.all().delete()
+        call_command("backfill_daily_reading", stdout=StringIO())
+        self.assertEqual(self.rows(), expected)
+
+        DailyReading.objects.update(reading_time=timedelta())
+        call_command(
+            "backfill_daily_reading", "--since", "2023-01-02", stdout=StringIO()
+        )
+        self.assertEqual(
+            self.rows(),
+            [
+                (date(2023, 1, 1), timedelta()),
+                (date(2023, 1, 2), timedelta(hours=24)),
+                (date(2023, 1, 3), timedelta(hours=2)),
+            ],
+        )
+
+
+class ActivityApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.book = Book.objects.create(title="Book", year_of_publishing=2000)
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword",
+        )
+        for user, day, hours in (
+            (self.user, date(2023, 1, 2), 1),
+            (self.user, date(2023, 1, 4), 2),
+            (self.user, date(2023, 1, 10), 3),
+            (other_user, date(2023, 1, 4), 4),
+        ):
+            DailyReading.objects.create(
+                user=user, book=self.book, day=day, reading_time=timedelta(hours=hours)
+            )
+
+    def test_profile_activity_by_week(self):
+        response = self.client.get(
+            PROFILE_ACTIVITY_URL,
+            {"granularity": "week", "start": "2023-01-01", "end": "2023-01-20"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [
+                {"period": "2022-12-26", "reading_time": "00:00:00"},
+                {"period": "2023-01-02", "reading_time": "03:00:00"},
+                {"period": "2023-01-09", "reading_time": "03:00:00"},
+                {"period": "2023-01-16", "reading_time": "00:00:00"},
+            ],
+        )
+
+    def test_book_activity_by_day_includes_every_user(self):
+        response = self.client.get(
+            book_activity_url(self.book.id),
+            {"start": "2023-01-03", "end": "2023-01-04"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["granularity"], "day")
+        self.assertEqual(
+            response.data["results"],
+            [
+                {"period": "2023-01-03", "reading_time": "00:00:00"},
+                {"period": "2023-01-04", "reading_time": "06:00:00"},
+            ],
+        )
+
+    def test_activity_by_month_defaults_to_the_last_year(self):
+        response = self.client.get(PROFILE_ACTIVITY_URL, {"granularity": "month"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 12)
+        self.assertEqual(response.data["end"], timezone.localdate())
+
+    def test_invalid_ranges(self):
+        for params in (
+            {"granularity": "year"},
+            {"start": "2023-02-01", "end": "2023-01-01"},
+            {"start": "2000-01-01", "end": "2023-01-01"},
+        ):
+            response = self.client.get(PROFILE_ACTIVITY_URL, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_activity_of_a_missing_book(self):
+        response = self.client.get(book_activity_url(0))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
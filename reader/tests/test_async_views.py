@@ -0,0 +1,174 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reader.models import Book, Profile, ReadingSession
+
+ASYNC_READING_SESSION_URL = reverse("reader:async-reading-session-list")
+READING_SESSION_URL = reverse("reader:reading-session-list")
+
+
+def async_stop_reading_url(reading_session_id: int):
+    return reverse(
+        "reader:async-reading-session-stop-reading", args=[reading_session_id]
+    )
+
+
+class AsyncReadingSessionTests(TestCase):
+    def setUp(self):
+        self.client = AsyncClient(enforce_csrf_checks=True)
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.token = str(AccessToken.for_user(self.user))
+        self.book = Book.objects.create(title="Book", year_of_publishing=2000)
+
+    def request(self, method, url, data=None, token=None):
+        headers = {"Authorization": f"Bearer {token or self.token}"}
+        if method == "post":
+            response = self.client.post(
+                url, data, content_type="application/json", headers=headers
+            )
+        else:
+            response = self.client.get(url, data, headers=headers)
+        return self.wait(response)
+
+    @staticmethod
+    def wait(response):
+        # The async views run in the event loop of async_to_sync, their ORM
+        # calls come back to this thread and its test transaction
+        async def get_response():
+            return await response
+
+        return async_to_sync(get_response)()
+
+    def test_start_and_stop_reading(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.request(
+                "post", ASYNC_READING_SESSION_URL, {"book": self.book.id}
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["book"], self.book.id)
+        self.assertIsNone(response.json()["end_time"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.request(
+                "post", async_stop_reading_url(response.json()["id"])
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(response.json()["end_time"])
+
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.number_of_reading_sessions, 1)
+        self.assertEqual(profile.last_book_read, self.book)
+
+    def test_starting_stops_the_active_session(self):
+        active = ReadingSession.objects.create(user=self.user, book=self.book)
+
+        response = self.request(
+            "post", ASYNC_READING_SESSION_URL, {"book": self.book.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        active.refresh_from_db()
+        self.assertIsNotNone(active.end_time)
+
+    def test_list_matches_the_drf_view(self):
+        for _ in range(3):
+            ReadingSession.objects.create(user=self.user, book=self.book)
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = self.request("get", ASYNC_READING_SESSION_URL, {"page_size": 2})
+        expected = client.get(READING_SESSION_URL, {"page_size": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(
+            data["next"], expected.data["next"].replace("/reader/", "/reader/async/")
+        )
+        data["next"] = expected.data["next"]
+        self.assertEqual(data, expected.json())
+
+    def test_errors_match_the_drf_view(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        for data in ({}, {"book": "abc"}, {"book": 0}):
+            response = self.request("post", ASYNC_READING_SESSION_URL, data)
+            expected = client.post(READING_SESSION_URL, data, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.json(), expected.json())
+
+    def test_stopping_a_completed_session(self):
+        reading_session = ReadingSession.objects.create(user=self.user, book=self.book)
+        ReadingSession.objects.stop(reading_session.id, self.user.id)
+
+        response = self.request("post", async_stop_reading_url(reading_session.id))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sessions_of_other_users_are_not_found(self):
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword",
+        )
+        reading_session = ReadingSession.objects.create(user=other_user, book=self.book)
+
+        response = self.request("post", async_stop_reading_url(reading_session.id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_ids_are_not_found(self):
+        reading_session = ReadingSession.objects.create(user=self.user, book=self.book)
+
+        for pk in ("abc", "\u00b2", str(2**63)):
+            response = self.request("post", async_stop_reading_url(pk))
+
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, pk)
+        reading_session.refresh_from_db()
+        self.assertIsNone(reading_session.end_time)
+
+    def test_list_pages_match_the_drf_view(self):
+        for _ in range(3):
+            ReadingSession.objects.create(user=self.user, book=self.book)
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        for params in ({"page": 2, "page_size": 2}, {"cursor": ""}, {"page": 3}):
+            response = self.request("get", ASYNC_READING_SESSION_URL, params)
+            expected = client.get(READING_SESSION_URL, params)
+
+            self.assertEqual(response.status_code, expected.status_code, params)
+            self.assertEqual(
+                response.content.replace(b"/reader/async/", b"/reader/"),
+                expected.content,
+                params,
+            )
+
+    def test_list_is_conditional(self):
+        response = self.request("get", ASYNC_READING_SESSION_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.wait(
+            self.client.get(
+                ASYNC_READING_SESSION_URL,
+                headers={
+                    "Authorization": f"Bearer {self.token}",
+                    "If-None-Match": response["ETag"],
+                },
+            )
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_authentication_is_required(self):
+        response = self.wait(self.client.get(ASYNC_READING_SESSION_URL))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.request("get", ASYNC_READING_SESSION_URL, token="invalid")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,151 @@
+from unittest import skipUnless
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import LiveServerTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reader import factories
+from reader.benchmarks import (
+    ConcurrentLoad,
+    EndpointBenchmark,
+    RenderingBenchmark,
+    compare,
+)
+from reader.models import Book, BookStats, Profile, ReadingSession, UserBookStats
+
+
+class SeedFactoryTests(TestCase):
+    def test_seed_creates_consistent_dataset(self):
+        users, books = factories.seed(users=3, books=5, sessions=4)
+
+        self.assertEqual(Profile.objects.count(), 3)
+        self.assertEqual(Book.objects.count(), 5)
+        self.assertEqual(ReadingSession.objects.count(), 12)
+        self.assertFalse(ReadingSession.objects.filter(end_time=None).exists())
+
+        for user in users:
+            profile = Profile.objects.get(user=user)
+            self.assertEqual(profile.number_of_reading_sessions, 4)
+            last_session = user.readingsession_set.order_by("-end_time").first()
+            self.assertEqual(profile.last_book_read_id, last_session.book_id)
+            total = profile.total_reading_time
+            Profile.rebuild(user_ids=[user.id])
+            profile.refresh_from_db()
+            self.assertEqual(total, profile.total_reading_time)
+
+        for book in Book.objects.all():
+            stats = book.get_stats()
+            self.assertEqual(
+                stats.number_of_reading_sessions,
+                book.total_number_of_reading_sessions_for_all_users(),
+            )
+            self.assertEqual(
+                stats.total_reading_time, book.total_reading_time_for_all_users()
+            )
+        self.assertEqual(
+            sum(
+                UserBookStats.objects.values_list(
+                    "number_of_reading_sessions", flat=True
+                )
+            ),
+            12,
+        )
+        self.assertLessEqual(BookStats.objects.count(), 5)
+
+    def test_sessions_are_reproducible(self):
+        users, books = factories.seed(users=2, books=10, sessions=5, seed=42)
+        first = list(ReadingSession.objects.values_list("user", "book").order_by("id"))
+
+        ReadingSession.objects.all().delete()
+        factories.create_sessions(users, books, 5, seed=42)
+        second = list(ReadingSession.objects.values_list("user", "book").order_by("id"))
+
+        self.assertEqual(first, second)
+
+
+class EndpointBenchmarkTests(TestCase):
+    def test_every_endpoint_is_measured_without_errors(self):
+        users, books = factories.seed(users=2, books=15, sessions=5)
+        cache.set("service-key", "value")
+
+        results = EndpointBenchmark(
+            APIClient(), users[0], books, page_sizes=(5, 10), repeat=2
+        ).run()
+
+        # The cache of the service is never cleared
+        self.assertEqual(cache.get("service-key"), "value")
+
+        names = {result["name"] for result in results}
+        self.assertTrue(
+            {
+                "book-list",
+                "book-detail",
+                "reading-session-list",
+                "reading-session-create",
+                "reading-session-stop",
+                "profile-retrieve",
+                "profile-books",
+            }
+            <= names
+        )
+        for result in results:
+            self.assertEqual(result["errors"], 0, result["name"])
+            self.assertEqual(result["requests"], 2)
+            self.assertGreater(result["ms"]["median"], 0)
+
+        changes = compare(results, results)
+        self.assertEqual(len(changes), len(results))
+        self.assertTrue(all(change["queries"] == 0 for change in changes))
+
+
+class RenderingBenchmarkTests(TestCase):
+    def test_both_paths_render_the_same_rows(self):
+        users, _ = factories.seed(users=1, books=10, sessions=5)
+
+        results = RenderingBenchmark(users[0], page_size=5, repeat=2).run()
+
+        self.assertEqual(
+            {(result["name"], result["path"]) for result in results},
+            {
+                ("book-list", "serializer"),
+                ("book-list", "values"),
+                ("reading-session-list", "serializer"),
+                ("reading-session-list", "values"),
+            },
+        )
+        for result in results:
+            self.assertTrue(result["same_output"], result)
+            self.assertEqual(result["rows"], 5)
+            self.assertGreater(result["rows_per_second"], 0)
+
+
+@skipUnless(
+    connection.vendor == "postgresql", "Needs a database with concurrent writers"
+)
+class ConcurrentLoadTests(LiveServerTestCase):
+    def test_users_start_stop_and_list_sessions(self):
+        users, books = factories.seed(users=2, books=3, sessions=1)
+        url = urlsplit(self.live_server_url)
+
+        for url_name in (
+            "reader:reading-session-list",
+            "reader:async-reading-session-list",
+        ):
+            result = ConcurrentLoad(
+                url.hostname,
+                url.port,
+                reverse(url_name),
+                [str(AccessToken.for_user(user)) for user in users],
+                [book.pk for book in books],
+                iterations=2,
+            ).run()
+
+            self.assertEqual(result["errors"], 0, url_name)
+            self.assertEqual(result["requests"], 12)
+            self.assertEqual(set(result["ms"]), {"start", "stop", "list"})
+
+        self.assertEqual(ReadingSession.objects.filter(end_time=None).count(), 0)
@@ -1,9 +1,12 @@
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
-from reader.models import Book
+from reader.models import Book, ReadingSession
 
 BOOK_URL = reverse("reader:book-list")
 
@@ -207,3 +210,55 @@ class AuthenticatedBookApiTests(TestCase):
 
         res = self.client.delete(url)
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BookListQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            "other@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        now = timezone.now()
+        for i in range(30):
+            book = sample_book(title=f"Book {i}")
+            for user in (self.user, self.other_user):
+                ReadingSession.objects.create(
+                    user=user,
+                    book=book,
+                    start_time=now,
+                    end_time=now + timedelta(hours=1),
+                )
+
+    def test_number_of_queries_does_not_depend_on_page_size(self):
+        # One query for the page count and one for the annotated page
+        for page_size in (1, 10, 30):
+            with self.assertNumQueries(2):
+                res = self.client.get(BOOK_URL, {"page_size": page_size})
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(res.data["results"]), page_size)
+
+    def test_list_stats_match_model_methods(self):
+        res = self.client.get(BOOK_URL, {"page_size": 30})
+
+        for item in res.data["results"]:
+            book = Book.objects.get(id=item["id"])
+            self.assertEqual(
+                item["total_reading_time_for_user"],
+                book.total_reading_time_for_user(self.user),
+            )
+            self.assertEqual(
+                item["total_number_of_reading_sessions_for_all_users"],
+                book.total_number_of_reading_sessions_for_all_users(),
+            )
+            self.assertEqual(
+                item["total_reading_time_for_all_users"],
+                book.total_reading_time_for_all_users(),
+            )
@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from reader.models import Book, BookStats, UserBookStats
+
+BOOK_URL = reverse("reader:book-list")
+
+
+class BookFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        # Reading times of 0 to 3 hours, books 4 and 5 were never read
+        self.books = []
+        for i, (author, year) in enumerate(
+            (
+                ("George Orwell", 1945),
+                ("George Orwell", 1949),
+                ("Aldous Huxley", 1932),
+                ("Ray Bradbury", 1953),
+                ("Ray Bradbury", 1962),
+                ("Aldous Huxley", 1962),
+            )
+        ):
+            book = Book.objects.create(
+                title=f"Book {i}",
+                author=author,
+                year_of_publishing=year,
+                last_time_read=now - timedelta(days=i) if i < 4 else None,
+            )
+            self.books.append(book)
+        for i, hours in enumerate((2, 3, 0, 2)):
+            BookStats.objects.create(
+                book=self.books[i],
+                total_reading_time=timedelta(hours=hours),
+                number_of_reading_sessions=4 - i,
+            )
+        UserBookStats.objects.create(
+            user=self.user,
+            book=self.books[2],
+            total_reading_time=timedelta(minutes=5),
+        )
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book["id"] for book in response.data["results"]]
+
+    def book_ids(self, *indexes):
+        return [self.books[i].id for i in indexes]
+
+    def test_filters(self):
+        response = self.client.get(BOOK_URL, {"author": "Ray Bradbury"})
+        self.assertEqual(self.ids(response), self.book_ids(3, 4))
+
+        response = self.client.get(
+            BOOK_URL, {"author": "Aldous Huxley", "year_of_publishing__gte": 1950}
+        )
+        self.assertEqual(self.ids(response), self.book_ids(5))
+
+        response = self.client.get(
+            BOOK_URL,
+            {"last_time_read__gte": timezone.now() - timedelta(days=1, hours=1)},
+        )
+        self.assertEqual(self.ids(response), self.book_ids(0, 1))
+
+    def test_invalid_filters(self):
+        for params in (
+            {"year_of_publishing__gte": "abc"},
+            {"last_time_read__gte": "yesterday"},
+        ):
+            response = self.client.get(BOOK_URL, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ordering_by_stats(self):
+        response = self.client.get(
+            BOOK_URL, {"ordering": "-total_reading_time_for_all_users"}
+        )
+        # Ties are broken by the id in the same direction
+        self.assertEqual(self.ids(response), self.book_ids(1, 3, 0, 5, 4, 2))
+
+        response = self.client.get(
+            BOOK_URL, {"ordering": "total_number_of_reading_sessions_for_all_users"}
+        )
+        self.assertEqual(self.ids(response), self.book_ids(4, 5, 3, 2, 1, 0))
+
+        response = self.client.get(
+            BOOK_URL, {"ordering": "-total_reading_time_for_user"}
+        )
+        self.assertEqual(self.ids(response)[0], self.books[2].id)
+
+    def test_unknown_orderings_are_ignored(self):
+        response = self.client.get(BOOK_URL, {"ordering": "long_description"})
+        self.assertEqual(self.ids(response), self.book_ids(0, 1, 2, 3, 4, 5))
+
+    def collect_pages(self, params):
+        ids = []
+        response = self.client.get(BOOK_URL, {**params, "cursor": "", "page_size": 2})
+        while True:
+            ids += self.ids(response)
+            if not response.data["next"]:
+                return ids
+            # Every sorted page is a single query
+            with self.assertNumQueries(1):
+                response = self.client.get(response.data["next"])
+
+    def test_sorted_cursor_pages(self):
+        for ordering, expected in (
+            ("-total_reading_time_for_all_users", self.book_ids(1, 3, 0, 5, 4, 2)),
+            ("author", self.book_ids(2, 5, 0, 1, 3, 4)),
+            ("-year_of_publishing", self.book_ids(5, 4, 3, 1, 0, 2)),
+        ):
+            with self.subTest(ordering=ordering):
+                self.assertEqual(self.collect_pages({"ordering": ordering}), expected)
+
+    def test_filtered_and_sorted_cursor_page_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                BOOK_URL,
+                {
+                    "author": "George Orwell",
+                    "ordering": "-total_reading_time_for_all_users",
+                    "cursor": "",
+                },
+            )
+        self.assertEqual(self.ids(response), self.book_ids(1, 0))
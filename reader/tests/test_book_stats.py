@@ -0,0 +1,107 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from reader.models import Book, BookStats, ReadingSession
+
+BOOK_URL = reverse("reader:book-list")
+READING_SESSION_URL = reverse("reader:reading-session-list")
+
+
+def stop_reading_url(reading_session_id: int):
+    return reverse("reader:reading-session-stop-reading", args=[reading_session_id])
+
+
+class BookStatsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.book = Book.objects.create(
+            title="Sample Book",
+            author="Sample Author",
+            year_of_publishing=2022,
+            short_description="Sample Short Description",
+            long_description="Sample Long Description",
+        )
+
+    def test_book_without_sessions_has_empty_stats(self):
+        stats = self.book.get_stats()
+
+        self.assertEqual(stats.number_of_reading_sessions, 0)
+        self.assertEqual(stats.total_reading_time, timedelta())
+        self.assertFalse(BookStats.objects.filter(book=self.book).exists())
+
+    def test_stats_updated_on_start_and_stop(self):
+        response = self.client.post(READING_SESSION_URL, {"book": self.book.id})
+        stats = BookStats.objects.get(book=self.book)
+        self.assertEqual(stats.number_of_reading_sessions, 1)
+        self.assertEqual(stats.number_of_completed_sessions, 0)
+
+        self.client.post(stop_reading_url(response.data["id"]))
+        session = ReadingSession.objects.get(id=response.data["id"])
+        stats.refresh_from_db()
+
+        self.assertEqual(stats.number_of_reading_sessions, 1)
+        self.assertEqual(stats.number_of_completed_sessions, 1)
+        self.assertEqual(stats.total_reading_time, session.calculate_duration())
+        self.assertEqual(stats.last_time_read, session.end_time)
+
+    def test_stats_updated_by_model_stop_reading(self):
+        session = ReadingSession.objects.create(user=self.user, book=self.book)
+        session.stop_reading()
+        session.stop_reading()
+
+        stats = BookStats.objects.get(book=self.book)
+        self.assertEqual(stats.number_of_completed_sessions, 1)
+        self.assertEqual(stats.total_reading_time, session.calculate_duration())
+
+    def test_book_list_reads_stats(self):
+        BookStats.objects.create(
+            book=self.book,
+            number_of_reading_sessions=7,
+            total_reading_time=timedelta(hours=3),
+        )
+
+        response = self.client.get(BOOK_URL)
+        book = response.data["results"][0]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(book["total_number_of_reading_sessions_for_all_users"], 7)
+        self.assertEqual(book["total_reading_time_for_all_users"], timedelta(hours=3))
+
+    def test_rebuild_book_stats_command(self):
+        now = timezone.now()
+        ReadingSession.objects.create(
+            user=self.user,
+            book=self.book,
+            end_time=now + timedelta(hours=1),
+        )
+        ReadingSession.objects.create(user=self.user, book=self.book)
+        unread_book = Book.objects.create(title="Unread", year_of_publishing=2000)
+        BookStats.objects.filter(book=self.book).update(number_of_reading_sessions=42)
+        BookStats.objects.create(book=unread_book, number_of_reading_sessions=3)
+
+        call_command("rebuild_book_stats", stdout=StringIO())
+
+        stats = BookStats.objects.get(book=self.book)
+        self.assertEqual(
+            stats.number_of_reading_sessions,
+            self.book.total_number_of_reading_sessions_for_all_users(),
+        )
+        self.assertEqual(stats.number_of_completed_sessions, 1)
+        self.assertEqual(
+            stats.total_reading_time, self.book.total_reading_time_for_all_users()
+        )
+        self.assertEqual(
+            BookStats.objects.get(book=unread_book).number_of_reading_sessions, 0
+        )
@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from reader.models import Book, BookStats, Profile, ReadingSession, UserBookStats
+
+READING_SESSION_BULK_URL = reverse("reader:reading-session-bulk")
+
+
+class BulkReadingSessionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.books = [
+            Book.objects.create(title=f"Book {i}", year_of_publishing=2022)
+            for i in range(3)
+        ]
+        self.now = timezone.now().replace(microsecond=0)
+
+    def session(self, book, hours_ago, hours):
+        start_time = self.now - timedelta(hours=hours_ago)
+        return {
+            "book": book.id,
+            "start_time": start_time.isoformat(),
+            "end_time": (start_time + timedelta(hours=hours)).isoformat(),
+        }
+
+    def test_bulk_create_sessions(self):
+        payload = [
+            self.session(self.books[i % len(self.books)], hours_ago=2 * i + 2, hours=1)
+            for i in range(30)
+        ]
+
+        # The batch costs the same number of queries no matter its size, the
+        # profile is reconciled after the commit
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(12):
+                response = self.client.post(
+                    READING_SESSION_BULK_URL, payload, format="json"
+                )
+
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 30)
+        self.assertEqual(profile.number_of_reading_sessions, 30)
+        self.assertEqual(profile.total_reading_time, timedelta(hours=30))
+        self.assertEqual(profile.last_book_read, self.books[0])
+        self.assertEqual(profile.last_activity, self.now - timedelta(hours=2))
+
+        for book in self.books:
+            book.refresh_from_db()
+            stats = BookStats.objects.get(book=book)
+            self.assertEqual(stats.number_of_reading_sessions, 10)
+            self.assertEqual(stats.number_of_completed_sessions, 10)
+            self.assertEqual(stats.total_reading_time, timedelta(hours=10))
+            self.assertEqual(book.last_time_read, stats.last_time_read)
+            self.assertEqual(
+                UserBookStats.objects.get(user=self.user, book=book).total_reading_time,
+                book.total_reading_time_for_user(self.user),
+            )
+
+    def test_older_sessions_keep_last_book_read(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                READING_SESSION_BULK_URL,
+                [self.session(self.books[0], hours_ago=2, hours=1)],
+                format="json",
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                READING_SESSION_BULK_URL,
+                [self.session(self.books[1], hours_ago=10, hours=1)],
+                format="json",
+            )
+
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.last_book_read, self.books[0])
+        self.assertEqual(profile.last_activity, self.now - timedelta(hours=2))
+
+    def test_overlapping_sessions_are_rejected(self):
+        ReadingSession.objects.create(
+            user=self.user,
+            book=self.books[0],
+            start_time=self.now - timedelta(hours=10),
+            end_time=self.now - timedelta(hours=9),
+        )
+        payload = [
+            self.session(self.books[0], hours_ago=6, hours=2),
+            self.session(self.books[1], hours_ago=5, hours=2),
+            self.session(self.books[2], hours_ago=9.5, hours=1),
+            self.session(self.books[2], hours_ago=2, hours=1),
+        ]
+
+        response = self.client.post(READING_SESSION_BULK_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            ["start_time" in errors for errors in response.data],
+            [True, True, True, False],
+        )
+        self.assertEqual(ReadingSession.objects.count(), 1)
+
+    def test_invalid_sessions_are_rejected(self):
+        future = self.session(self.books[0], hours_ago=1, hours=2)
+        reversed_times = self.session(self.books[0], hours_ago=5, hours=-1)
+
+        response = self.client.post(
+            READING_SESSION_BULK_URL, [future, reversed_times], format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("end_time", response.data[0])
+        self.assertIn("end_time", response.data[1])
+        self.assertEqual(ReadingSession.objects.count(), 0)
+
+    def test_sessions_of_missing_books_are_rejected(self):
+        missing_book = self.session(self.books[0], hours_ago=8, hours=1)
+        missing_book["book"] = 0
+
+        response = self.client.post(
+            READING_SESSION_BULK_URL,
+            [self.session(self.books[0], hours_ago=2, hours=1), missing_book],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("book", response.data[1])
+        self.assertEqual(ReadingSession.objects.count(), 0)
+
+    def test_empty_batch_is_rejected(self):
+        response = self.client.post(READING_SESSION_BULK_URL, [], format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reader import cache as book_cache
+from reader.checks import check_shared_cache
+from reader.models import Book, ReadingSession
+
+BOOK_URL = reverse("reader:book-list")
+
+
+def detail_url(book_id: int):
+    return reverse("reader:book-detail", args=[book_id])
+
+
+class BookCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.book = Book.objects.create(
+            title="Sample Book",
+            author="Sample Author",
+            year_of_publishing=2022,
+        )
+        book_cache.reset_counters()
+
+    def test_book_list_is_cached(self):
+        first = self.client.get(BOOK_URL)
+        with self.assertNumQueries(1):
+            # Only the fields of the current user are queried
+            second = self.client.get(BOOK_URL)
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(book_cache.get_counters(), {"hits": 1, "misses": 1})
+
+    @override_settings(SHARED_CACHE=False)
+    def test_unshared_cache_is_not_used(self):
+        self.client.get(BOOK_URL)
+        # Like a change made by another process, the cache is not invalidated
+        Book.objects.filter(pk=self.book.pk).update(title="Updated Title")
+
+        response = self.client.get(BOOK_URL)
+        self.assertNotIn("X-Cache", response)
+        self.assertEqual(response.data["results"][0]["title"], "Updated Title")
+
+    def test_unshared_cache_is_reported(self):
+        self.assertEqual(check_shared_cache(None), [])
+        with override_settings(SHARED_CACHE=False):
+            self.assertEqual(
+                [warning.id for warning in check_shared_cache(None)], ["reader.W001"]
+            )
+
+    def test_book_detail_is_cached(self):
+        first = self.client.get(detail_url(self.book.id))
+        second = self.client.get(detail_url(self.book.id))
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+
+    def test_user_fields_are_not_shared(self):
+        now = timezone.now()
+        ReadingSession.objects.create(
+            user=self.other_user,
+            book=self.book,
+            start_time=now,
+            end_time=now + timedelta(hours=1),
+        )
+        self.client.force_authenticate(user=self.other_user)
+        other_user_book = self.client.get(BOOK_URL).data["results"][0]
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(BOOK_URL)
+        book = response.data["results"][0]
+
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(book["total_reading_time_for_user"], timedelta())
+        self.assertEqual(
+            other_user_book["total_reading_time_for_user"],
+            self.book.total_reading_time_for_user(self.other_user),
+        )
+        self.assertEqual(list(book), list(other_user_book))
+
+    def test_ordering_by_user_fields_is_not_shared(self):
+        other_book = Book.objects.create(
+            title="Other Book", author="Other Author", year_of_publishing=2023
+        )
+        now = timezone.now()
+        for user, book in ((self.user, self.book), (self.other_user, other_book)):
+            ReadingSession.objects.create(
+                user=user, book=book, start_time=now, end_time=now + timedelta(hours=1)
+            )
+        params = {"ordering": "-total_reading_time_for_user", "page_size": 1}
+
+        pages = {}
+        for user in (self.user, self.other_user, self.user):
+            self.client.force_authenticate(user=user)
+            response = self.client.get(BOOK_URL, params)
+            pages[user] = response.data["results"]
+
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual([book["id"] for book in pages[self.user]], [self.book.id])
+        self.assertEqual(
+            [book["id"] for book in pages[self.other_user]], [other_book.id]
+        )
+        self.assertEqual(
+            pages[self.user][0]["total_reading_time_for_user"], timedelta(hours=1)
+        )
+        self.assertEqual(
+            pages[self.other_user][0]["total_reading_time_for_user"],
+            timedelta(hours=1),
+        )
+
+    def test_book_update_invalidates_cache(self):
+        self.client.get(detail_url(self.book.id))
+        self.client.get(BOOK_URL)
+
+        self.book.title = "Updated Title"
+        self.book.save()
+
+        detail = self.client.get(detail_url(self.book.id))
+        books = self.client.get(BOOK_URL)
+        self.assertEqual(detail["X-Cache"], "MISS")
+        self.assertEqual(detail.data["title"], "Updated Title")
+        self.assertEqual(books.data["results"][0]["title"], "Updated Title")
+
+    def test_book_delete_invalidates_cache(self):
+        self.client.get(BOOK_URL)
+
+        self.book.delete()
+
+        self.assertEqual(self.client.get(BOOK_URL).data["count"], 0)
+
+    def test_session_stop_invalidates_cache(self):
+        session = ReadingSession.objects.start(user=self.user, book=self.book)
+        self.client.get(BOOK_URL)
+
+        session.stop_reading()
+        response = self.client.get(BOOK_URL)
+        book = response.data["results"][0]
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(book["total_number_of_reading_sessions_for_all_users"], 1)
+        self.assertEqual(
+            book["total_reading_time_for_all_users"], session.calculate_duration()
+        )
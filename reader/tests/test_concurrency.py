@@ -0,0 +1,98 @@
+import threading
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
+from django.test import TransactionTestCase
+from reader.models import Book, BookStats, Profile, ReadingSession, UserBookStats
+
+CONCURRENT_STARTS = 50
+
+
+@skipUnless(
+    connection.vendor == "postgresql", "Needs a database with concurrent writers"
+)
+class ConcurrentReadingSessionTests(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.books = [
+            Book.objects.create(title=f"Book {i}", year_of_publishing=2022)
+            for i in range(5)
+        ]
+
+    def run_concurrently(self, target, count):
+        barrier = threading.Barrier(count)
+        results = []
+
+        def worker(index):
+            barrier.wait()
+            try:
+                results.append(target(index))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def start(self, index):
+        try:
+            return ReadingSession.objects.start(
+                user=self.user, book=self.books[index % len(self.books)]
+            )
+        except IntegrityError:
+            return None
+
+    def test_concurrent_starts_keep_invariants(self):
+        started = [
+            session
+            for session in self.run_concurrently(self.start, CONCURRENT_STARTS)
+            if session
+        ]
+        sessions = ReadingSession.objects.filter(user=self.user)
+        completed = sessions.filter(end_time__isnull=False)
+        profile = Profile.objects.get(user=self.user)
+
+        self.assertTrue(started)
+        self.assertEqual(sessions.count(), len(started))
+        self.assertEqual(sessions.filter(end_time__isnull=True).count(), 1)
+
+        # Every started and every stopped session was recorded exactly once
+        total_reading_time = sum(
+            (session.calculate_duration() for session in completed), timedelta()
+        )
+        self.assertEqual(profile.number_of_reading_sessions, len(started))
+        self.assertEqual(profile.total_reading_time, total_reading_time)
+        self.assertEqual(
+            sum(stats.number_of_reading_sessions for stats in BookStats.objects.all()),
+            len(started),
+        )
+        self.assertEqual(
+            sum(
+                (stats.total_reading_time for stats in UserBookStats.objects.all()),
+                timedelta(),
+            ),
+            total_reading_time,
+        )
+
+    def test_concurrent_stops_are_recorded_once(self):
+        session = ReadingSession.objects.start(user=self.user, book=self.books[0])
+
+        results = self.run_concurrently(
+            lambda index: ReadingSession.objects.stop(session.id, self.user.id),
+            CONCURRENT_STARTS,
+        )
+        session.refresh_from_db()
+        stats = BookStats.objects.get(book=self.books[0])
+
+        self.assertEqual(len([result for result in results if result]), 1)
+        self.assertEqual(stats.number_of_completed_sessions, 1)
+        self.assertEqual(stats.total_reading_time, session.calculate_duration())
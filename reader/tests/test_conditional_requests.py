@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from reader.models import Book, ReadingSession
+
+BOOK_URL = reverse("reader:book-list")
+READING_SESSION_URL = reverse("reader:reading-session-list")
+PROFILE_URL = reverse("reader:profile-list")
+PROFILE_BOOKS_URL = reverse("reader:profile-books")
+
+
+def detail_url(book_id: int):
+    return reverse("reader:book-detail", args=[book_id])
+
+
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.book = Book.objects.create(title="Book", year_of_publishing=2000)
+
+    def assertNotModified(self, url, headers):
+        # Revalidated from the versions alone, nothing is queried
+        with self.assertNumQueries(0):
+            response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_unchanged_responses_are_not_modified(self):
+        for url in (
+            BOOK_URL,
+            detail_url(self.book.id),
+            READING_SESSION_URL,
+            PROFILE_URL,
+            PROFILE_BOOKS_URL,
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertIn("private", response["Cache-Control"])
+
+                self.assertNotModified(url, {"If-None-Match": response["ETag"]})
+                self.assertNotModified(
+                    url, {"If-Modified-Since": response["Last-Modified"]}
+                )
+
+    @override_settings(SHARED_CACHE=False)
+    def test_no_validators_without_a_shared_cache(self):
+        # Another process could have changed the data without this one
+        # seeing the new versions
+        for url in (BOOK_URL, READING_SESSION_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                response = self.client.get(url, headers={"If-None-Match": "*"})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotIn("ETag", response)
+                self.assertNotIn("Last-Modified", response)
+
+    def test_reading_changes_the_etags_of_the_user(self):
+        etags = {
+            url: self.client.get(url)["ETag"]
+            for url in (BOOK_URL, READING_SESSION_URL, PROFILE_URL)
+        }
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ReadingSession.objects.create(user=self.user, book=self.book)
+
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, headers={"If-None-Match": etag})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotEqual(response["ETag"], etag)
+
+    def test_book_changes_change_the_etag(self):
+        url = detail_url(self.book.id)
+        etag = self.client.get(url)["ETag"]
+
+        self.book.title = "New title"
+        self.book.save()
+
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "New title")
+
+    def test_representations_have_their_own_etags(self):
+        etag = self.client.get(BOOK_URL)["ETag"]
+
+        response = self.client.get(
+            BOOK_URL, {"fields": "title"}, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
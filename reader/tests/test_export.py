@@ -0,0 +1,139 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reader.models import Book, ReadingSession
+
+READING_SESSION_URL = reverse("reader:reading-session-list")
+EXPORT_URL = reverse("reader:reading-session-export")
+EXPORT_ALL_URL = reverse("reader:reading-session-export-all")
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="otheruser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        book = Book.objects.create(
+            title="Test Book", author="Test Author", year_of_publishing=2022
+        )
+        start = timezone.now() - timedelta(days=1)
+        for i in range(5):
+            session = ReadingSession.objects.create(
+                user=self.user, book=book, start_time=start + timedelta(hours=i)
+            )
+            if i < 4:
+                ReadingSession.objects.stop(
+                    session.id,
+                    self.user.id,
+                    end_time=session.start_time + timedelta(minutes=i * 7),
+                )
+        ReadingSession.objects.create(user=self.other_user, book=book)
+
+    def export(self, url, params):
+        # The sessions are only read once the response is consumed
+        with self.assertNumQueries(0):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def expected_rows(self):
+        response = self.client.get(
+            READING_SESSION_URL, {"page_size": 100}, HTTP_ACCEPT="application/json"
+        )
+        return sorted(response.json()["results"], key=lambda row: row["id"])
+
+    def test_jsonl_export(self):
+        with override_settings(EXPORT_CHUNK_SIZE=2):
+            content = self.export(EXPORT_URL, {"format": "jsonl"})
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(rows, self.expected_rows())
+        self.assertTrue(content.endswith("\n"))
+
+    def test_export_without_server_side_cursors(self):
+        # Behind pgbouncer every chunk is a query of the rows after the last
+        with override_settings(EXPORT_CHUNK_SIZE=2), mock.patch.dict(
+            connection.settings_dict, {"DISABLE_SERVER_SIDE_CURSORS": True}
+        ):
+            response = self.client.get(EXPORT_URL, {"format": "jsonl"})
+            with self.assertNumQueries(3):
+                content = b"".join(response.streaming_content).decode()
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(rows, self.expected_rows())
+
+    def test_csv_export(self):
+        response = self.client.get(EXPORT_URL, {"format": "csv"})
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(
+            response["Content-Disposition"],
+            'attachment; filename="reading-sessions.csv"',
+        )
+
+        content = self.export(EXPORT_URL, {"format": "csv"})
+        rows = list(csv.DictReader(io.StringIO(content)))
+        expected = [
+            {name: "" if value is None else str(value) for name, value in row.items()}
+            for row in self.expected_rows()
+        ]
+        self.assertEqual(rows, expected)
+
+    def test_export_fields(self):
+        content = self.export(EXPORT_URL, {"format": "csv", "fields": "book,duration"})
+        self.assertEqual(content.splitlines()[0], "id,duration,book")
+
+    def test_export_all_users(self):
+        response = self.client.get(EXPORT_ALL_URL, {"format": "jsonl"})
+        self.assertEqual(response.status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        content = self.export(EXPORT_ALL_URL, {"format": "jsonl"})
+        users = [json.loads(line)["user"] for line in content.splitlines()]
+        self.assertEqual(users, [self.user.id] * 5 + [self.other_user.id])
+
+    def test_unknown_format(self):
+        response = self.client.get(EXPORT_URL, {"format": "xml"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_unauthenticated(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(EXPORT_URL, {"format": "jsonl"})
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("detail", json.loads(response.content))
+
+    def test_asgi_export(self):
+        # Streamed without buffering the sync iterator
+        @async_to_sync
+        async def export():
+            response = await AsyncClient().get(
+                EXPORT_URL,
+                {"format": "jsonl"},
+                headers={"Authorization": f"Bearer {AccessToken.for_user(self.user)}"},
+            )
+            self.assertTrue(response.is_async)
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        content = export().decode()
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(rows, self.expected_rows())
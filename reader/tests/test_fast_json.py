@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from reader.models import Book, ReadingSession
+from reader.renderers import FastJSONRenderer
+
+BOOK_URL = reverse("reader:book-list")
+READING_SESSION_URL = reverse("reader:reading-session-list")
+
+
+class FastJSONRendererTests(TestCase):
+    def test_same_bytes_as_json_renderer(self):
+        @dataclass
+        class Point:
+            x: int
+
+        for data in (
+            None,
+            {"title": "Ünïcode   line   separators", "id": 1},
+            [timezone.now(), timezone.now().date(), timedelta(hours=1, seconds=0.5)],
+            {1: "integer keys"},
+            {"nested": [{"float": 1.5, "none": None, "bool": True}]},
+        ):
+            with self.subTest(data=data):
+                self.assertEqual(
+                    FastJSONRenderer().render(data), JSONRenderer().render(data)
+                )
+
+        with self.assertRaises(TypeError):
+            FastJSONRenderer().render(Point(1))
+
+    def test_indented_output(self):
+        data = {"id": 1}
+        self.assertEqual(
+            FastJSONRenderer().render(data, "application/json; indent=2"),
+            JSONRenderer().render(data, "application/json; indent=2"),
+        )
+
+
+class ValuesListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.books = [
+            Book.objects.create(
+                title=f"Böök {i}  ",
+                author=f"Author {i % 2}",
+                year_of_publishing=2000 + i,
+                short_description="Short" if i % 2 else None,
+            )
+            for i in range(5)
+        ]
+        start = timezone.now() - timedelta(days=1)
+        for i, book in enumerate(self.books):
+            session = ReadingSession.objects.create(
+                user=self.user, book=book, start_time=start + timedelta(hours=i)
+            )
+            if i < 4:
+                ReadingSession.objects.stop(
+                    session.id,
+                    self.user.id,
+                    end_time=session.start_time
+                    + timedelta(minutes=i * 7, microseconds=i * 1001),
+                )
+
+    def get(self, url, params, fast):
+        cache.clear()
+        with override_settings(FAST_JSON_LISTS=fast):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def assertSameJSON(self, url, params):
+        fast = self.get(url, params, fast=True)
+        self.assertEqual(fast, self.get(url, params, fast=False))
+        return fast
+
+    def test_book_list(self):
+        for params in (
+            {},
+            {"page_size": 2, "page": 2},
+            {"fields": "title,total_reading_time_for_all_users"},
+            {"omit": "short_description"},
+            {"ordering": "-total_reading_time_for_all_users", "cursor": ""},
+            {"ordering": "author", "cursor": "", "page_size": 2},
+            {"search": "author"},
+            {"author": "Author 1"},
+        ):
+            with self.subTest(params=params):
+                self.assertSameJSON(BOOK_URL, params)
+
+    def test_next_cursor_page(self):
+        params = {"ordering": "-total_reading_time_for_user", "page_size": 2}
+        self.client.get(BOOK_URL, {**params, "cursor": ""})
+        next_url = self.client.get(BOOK_URL, {**params, "cursor": ""}).data["next"]
+
+        self.assertSameJSON(next_url, {})
+
+    @override_settings(TIME_ZONE="America/New_York")
+    def test_reading_session_list(self):
+        for params in ({}, {"cursor": "", "page_size": 3}, {"fields": "duration"}):
+            with self.subTest(params=params):
+                self.assertSameJSON(READING_SESSION_URL, params)
+
+        # Datetimes are in the current time zone
+        self.assertRegex(self.get(READING_SESSION_URL, {}, fast=True), rb"-0[45]:00")
+
+    def test_cached_pages(self):
+        with override_settings(FAST_JSON_LISTS=True):
+            self.client.get(BOOK_URL)
+            cached = self.client.get(BOOK_URL)
+
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(cached.content, self.get(BOOK_URL, {}, fast=False))
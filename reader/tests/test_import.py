@@ -0,0 +1,163 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from reader.models import Book
+from reader.views import BookViewSet
+
+BOOK_BULK_URL = reverse("reader:book-bulk")
+
+CSV_BOOKS = (
+    "title,author,year_of_publishing,short_description\n"
+    "First Book,First Author,2001,First description\n"
+    "Second Book,Second Author,2002,\n"
+    ",No Title,2003,\n"
+    "Third Book,Third Author,not a year,\n"
+)
+
+JSONL_BOOKS = "\n".join(
+    [
+        json.dumps({"title": "First Book", "year_of_publishing": 2001}),
+        json.dumps({"title": "Second Book", "year_of_publishing": 2002}),
+        "{not json",
+        json.dumps(["not", "an", "object"]),
+        json.dumps({"title": "No Year"}),
+    ]
+)
+
+
+class ImportBooksCommandTests(TestCase):
+    def import_file(self, content, suffix, *args):
+        with tempfile.NamedTemporaryFile("w", suffix=suffix, delete=False) as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_books", file.name, *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_csv(self):
+        stdout, stderr = self.import_file(CSV_BOOKS, ".csv", "--batch-size", "1")
+
+        self.assertEqual(
+            list(Book.objects.values_list("title", "year_of_publishing")),
+            [("First Book", 2001), ("Second Book", 2002)],
+        )
+        self.assertIn("Successfully imported 2 of 4 books, 2 failed", stdout)
+        self.assertEqual(
+            [json.loads(line)["row"] for line in stderr.splitlines()], [3, 4]
+        )
+
+    def test_import_malformed_file(self):
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv", delete=False) as file:
+            file.write(b"title\n\xff\xfe\n")
+        self.addCleanup(os.remove, file.name)
+
+        with self.assertRaisesMessage(CommandError, "The file is malformed"):
+            call_command("import_books", file.name, stdout=StringIO())
+
+    def test_import_json_lines(self):
+        stdout, stderr = self.import_file(JSONL_BOOKS, ".txt", "--format", "jsonl")
+
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertIn("Successfully imported 2 of 5 books, 3 failed", stdout)
+        self.assertEqual(len(stderr.splitlines()), 3)
+
+
+class ImportBooksApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@admin.com",
+            "testpass",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+
+    def upload(self, name, content, **data):
+        return self.client.post(
+            BOOK_BULK_URL,
+            {"file": SimpleUploadedFile(name, content.encode()), **data},
+            format="multipart",
+        )
+
+    def test_bulk_import_csv(self):
+        response = self.upload("books.csv", CSV_BOOKS, batch_size=1)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["failed"], 2)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [3, 4])
+        self.assertIn("title", response.data["errors"][0]["errors"])
+        self.assertIn("rows_per_second", response.data)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_bulk_import_json_lines(self):
+        response = self.upload("books.jsonl", JSONL_BOOKS)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+
+    def test_bulk_import_reports_first_errors(self):
+        with mock.patch.object(BookViewSet, "max_import_errors", 1):
+            response = self.upload("books.csv", CSV_BOOKS)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["failed"], 2)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [3])
+        self.assertEqual(response.data["errors_omitted"], 1)
+
+    def test_bulk_import_without_created_books(self):
+        for content in (
+            "title,year_of_publishing\n",
+            "title,year_of_publishing\n,2001\n",
+        ):
+            with self.subTest(content=content):
+                response = self.upload("books.csv", content)
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.data["created"], 0)
+                self.assertEqual(len(response.data["errors"]), response.data["failed"])
+
+    def test_bulk_import_malformed_file(self):
+        # The batches inserted before the malformed line are rolled back
+        content = "title,year_of_publishing\n" + "".join(
+            f"Book {i},2000\n" for i in range(5)
+        )
+        response = self.client.post(
+            BOOK_BULK_URL,
+            {
+                "file": SimpleUploadedFile("books.csv", content.encode() + b"\xff\n"),
+                "batch_size": 2,
+            },
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file", response.data)
+        self.assertEqual(Book.objects.count(), 0)
+
+    def test_bulk_import_unknown_format(self):
+        response = self.upload("books.txt", CSV_BOOKS)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Book.objects.count(), 0)
+
+    def test_bulk_import_not_allowed_for_users(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+
+        response = self.upload("books.csv", CSV_BOOKS)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Book.objects.count(), 0)
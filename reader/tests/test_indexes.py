@@ -0,0 +1,134 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.utils import timezone
+from reader.models import (
+    Book,
+    BookStats,
+    Profile,
+    ReadingSession,
+    UserBookStats,
+    last_read,
+)
+
+
+class ActiveSessionConstraintTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.books = [
+            Book.objects.create(title=f"Book {i}", year_of_publishing=2022)
+            for i in range(2)
+        ]
+
+    def test_only_one_active_session_per_user(self):
+        ReadingSession.objects.create(user=self.user, book=self.books[0])
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ReadingSession.objects.bulk_create(
+                [ReadingSession(user=self.user, book=self.books[1])]
+            )
+
+    def test_starting_session_stops_active_session_of_any_book(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = ReadingSession.objects.create(user=self.user, book=self.books[0])
+            second = ReadingSession.objects.create(user=self.user, book=self.books[1])
+        first.refresh_from_db()
+
+        self.assertIsNotNone(first.end_time)
+        self.assertIsNone(second.end_time)
+        self.assertEqual(
+            BookStats.objects.get(book=self.books[0]).total_reading_time,
+            first.calculate_duration(),
+        )
+        self.assertEqual(
+            Profile.objects.get(user=self.user).last_book_read, self.books[0]
+        )
+
+    def test_close_active_is_a_single_update_without_active_session(self):
+        with self.assertNumQueries(1):
+            closed = ReadingSession.objects.close_active(self.user.id)
+
+        self.assertEqual(closed, [])
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN output is PostgreSQL specific")
+class ReadingSessionIndexesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"reader{i}@example.com") for i in range(50)
+        )
+        books = Book.objects.bulk_create(
+            Book(title=f"Book {i}", year_of_publishing=2000) for i in range(50)
+        )
+        now = timezone.now()
+        ReadingSession.objects.bulk_create(
+            ReadingSession(
+                user=users[i % len(users)],
+                book=books[i % len(books)],
+                end_time=now,
+            )
+            for i in range(5000)
+        )
+        UserBookStats.objects.bulk_create(
+            UserBookStats(user=user, book=book, last_time_read=now)
+            for user in users
+            for book in books
+        )
+        cls.user = users[0]
+        cls.book = books[0]
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {ReadingSession._meta.db_table}")
+            cursor.execute(f"ANALYZE {UserBookStats._meta.db_table}")
+
+    def assertUsesIndex(self, queryset, *index_names):
+        with connection.cursor() as cursor:
+            # Force the planner to show which index it would pick on a table
+            # that is too small to prefer an index on its own
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            f"None of {index_names} used by:\n{plan}",
+        )
+
+    def test_active_session_lookup_uses_index(self):
+        self.assertUsesIndex(
+            ReadingSession.objects.filter(user=self.user, end_time=None),
+            "session_user_end_time_idx",
+            "one_active_session_per_user",
+        )
+
+    def test_book_sessions_lookup_uses_index(self):
+        self.assertUsesIndex(
+            ReadingSession.objects.filter(book=self.book, end_time__isnull=False),
+            "session_book_end_time_idx",
+        )
+
+    def test_last_session_lookup_uses_index(self):
+        self.assertUsesIndex(
+            ReadingSession.objects.filter(
+                user=self.user, end_time__isnull=False
+            ).order_by("-end_time")[:1],
+            "session_user_recent_idx",
+            "session_user_end_time_idx",
+        )
+
+    def test_reading_history_uses_index(self):
+        with connection.cursor() as cursor:
+            # A user with few books is sorted cheaper, the pages are read
+            # from the index when the history is long
+            cursor.execute("SET LOCAL enable_sort = off")
+        self.assertUsesIndex(
+            UserBookStats.objects.filter(user=self.user)
+            .annotate(last_read=last_read())
+            .order_by("-last_read", "-id")[:10],
+            "user_book_stats_history_idx",
+        )
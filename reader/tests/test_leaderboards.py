@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from reader import leaderboards
+from reader.models import Book, BookStats, DailyReading, Leaderboard, Profile
+
+TOP_BOOKS_URL = reverse("reader:book-top")
+TOP_READERS_URL = reverse("reader:reader-top")
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+            first_name="Test",
+            last_name="User",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.books = [
+            Book.objects.create(title=f"Book {i}", year_of_publishing=2000)
+            for i in range(3)
+        ]
+        # The refresh time is remembered in the cache
+        self.addCleanup(cache.clear)
+
+        today = timezone.localdate()
+        for user, book, days_ago, hours, sessions in (
+            (self.user, self.books[0], 0, 1, 3),
+            (self.other_user, self.books[1], 1, 2, 1),
+            (self.user, self.books[2], 20, 5, 1),
+        ):
+            DailyReading.objects.create(
+                user=user,
+                book=book,
+                day=today - timedelta(days=days_ago),
+                reading_time=timedelta(hours=hours),
+                number_of_reading_sessions=sessions,
+            )
+        BookStats.objects.create(
+            book=self.books[2],
+            total_reading_time=timedelta(hours=50),
+            number_of_completed_sessions=10,
+        )
+
+    def top(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_books_are_ranked_in_their_window(self):
+        leaderboards.refresh()
+
+        results = self.top(TOP_BOOKS_URL, window="7d").data["results"]
+        self.assertEqual(
+            [(row["rank"], row["book"]) for row in results],
+            [(1, self.books[1].id), (2, self.books[0].id)],
+        )
+        self.assertEqual(results[0]["reading_time"], "02:00:00")
+
+        results = self.top(TOP_BOOKS_URL, window="30d", by="sessions").data["results"]
+        self.assertEqual(
+            [row["book"] for row in results],
+            [self.books[0].id, self.books[1].id, self.books[2].id],
+        )
+
+        # All time is ranked from the book stats
+        results = self.top(TOP_BOOKS_URL, window="all").data["results"]
+        self.assertEqual([row["book"] for row in results], [self.books[2].id])
+        self.assertEqual(results[0]["sessions"], 10)
+
+    def test_readers_are_ranked_by_name(self):
+        leaderboards.refresh()
+
+        results = self.top(TOP_READERS_URL, window="30d", limit=1).data["results"]
+
+        self.assertEqual(
+            results,
+            [
+                {
+                    "rank": 1,
+                    "user": self.user.id,
+                    "name": "Test User",
+                    "reading_time": "06:00:00",
+                    "sessions": 4,
+                }
+            ],
+        )
+
+    def test_all_time_sessions_are_completed_sessions(self):
+        # Like the books and the windows, open sessions are not counted
+        Profile.objects.filter(user=self.user).update(
+            number_of_reading_sessions=5, number_of_completed_sessions=2
+        )
+        Profile.objects.filter(user=self.other_user).update(
+            number_of_reading_sessions=3, number_of_completed_sessions=3
+        )
+        leaderboards.refresh()
+
+        results = self.top(TOP_READERS_URL, window="all", by="sessions").data["results"]
+
+        self.assertEqual(
+            [(row["user"], row["sessions"]) for row in results],
+            [(self.other_user.id, 3), (self.user.id, 2)],
+        )
+
+    def test_refresh_replaces_the_rows(self):
+        leaderboards.refresh()
+        rows = Leaderboard.objects.count()
+
+        leaderboards.refresh()
+
+        self.assertEqual(Leaderboard.objects.count(), rows)
+
+    def test_responses_are_revalidated_with_the_etag(self):
+        leaderboards.refresh()
+        response = self.top(TOP_BOOKS_URL)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        # Answered from the refresh time in the cache
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(
+                TOP_BOOKS_URL, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Other parameters and every refresh have their own version
+        self.assertNotEqual(
+            self.top(TOP_BOOKS_URL, by="sessions")["ETag"], response["ETag"]
+        )
+        cache.clear()
+        leaderboards.refresh()
+        response = self.client.get(TOP_BOOKS_URL, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_parameters(self):
+        for params in ({"by": "pages"}, {"window": "1y"}, {"limit": 1000}):
+            response = self.client.get(TOP_BOOKS_URL, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,97 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from reader.models import Book, ReadingSession
+
+METRICS_URL = reverse("metrics")
+BOOK_URL = reverse("reader:book-list")
+READING_SESSION_URL = reverse("reader:reading-session-list")
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.book = Book.objects.create(title="Book", year_of_publishing=2000)
+
+    def test_requests_are_counted_by_view_and_status(self):
+        labels = {"view": "BookViewSet.list", "method": "GET"}
+        requests = sample("reader_requests_total", status="200", **labels)
+        observed = sample("reader_request_duration_seconds_count", **labels)
+
+        self.client.get(BOOK_URL)
+
+        self.assertEqual(
+            sample("reader_requests_total", status="200", **labels), requests + 1
+        )
+        self.assertEqual(
+            sample("reader_request_duration_seconds_count", **labels), observed + 1
+        )
+        self.assertGreater(
+            sample("reader_request_queries_sum", view="BookViewSet.list"), 0
+        )
+
+    def test_reading_sessions_are_counted(self):
+        started = sample("reader_reading_sessions_started_total")
+        stopped = sample("reader_reading_sessions_stopped_total")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(READING_SESSION_URL, {"book": self.book.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse(
+                    "reader:reading-session-stop-reading", args=[response.data["id"]]
+                )
+            )
+
+        self.assertEqual(sample("reader_reading_sessions_started_total"), started + 1)
+        self.assertEqual(sample("reader_reading_sessions_stopped_total"), stopped + 1)
+
+    def test_metrics_endpoint(self):
+        ReadingSession.objects.create(user=self.user, book=self.book)
+        self.client.get(BOOK_URL)
+
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        content = response.content.decode()
+        self.assertIn("reader_active_reading_sessions 1.0", content)
+        self.assertIn('reader_requests_total{method="GET",status="200"', content)
+        self.assertIn("reader_request_duration_seconds_bucket", content)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_token(self):
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code, status.HTTP_403_FORBIDDEN
+        )
+        response = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_multiprocess_mode_reads_the_shared_directory(self):
+        with tempfile.TemporaryDirectory() as directory, mock.patch.dict(
+            os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}
+        ):
+            response = self.client.get(METRICS_URL)
+
+        # Nothing was written to the empty directory, only the database
+        # metrics are left
+        content = response.content.decode()
+        self.assertIn("reader_active_reading_sessions 0.0", content)
+        self.assertNotIn("reader_requests_total", content)
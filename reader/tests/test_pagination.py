@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from reader import cache as book_cache
+from reader.models import Book, ReadingSession
+
+BOOK_URL = reverse("reader:book-list")
+READING_SESSION_URL = reverse("reader:reading-session-list")
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.books = Book.objects.bulk_create(
+            Book(title=f"Book {i}", year_of_publishing=2000) for i in range(25)
+        )
+        ReadingSession.objects.bulk_create(
+            ReadingSession(user=self.user, book=book, end_time="2023-01-01T12:00Z")
+            for book in self.books
+        )
+        # bulk_create does not send the signals that invalidate the cache
+        book_cache.invalidate_books()
+
+    def collect_pages(self, url):
+        ids = []
+        response = self.client.get(url, {"cursor": "", "page_size": 10})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            ids += [item["id"] for item in response.data["results"]]
+            if not response.data["next"]:
+                return ids
+            response = self.client.get(response.data["next"])
+
+    def test_cursor_pagination_of_books(self):
+        self.assertEqual(self.collect_pages(BOOK_URL), [book.id for book in self.books])
+
+    def test_cursor_pagination_of_reading_sessions(self):
+        self.assertEqual(
+            self.collect_pages(READING_SESSION_URL),
+            list(
+                ReadingSession.objects.filter(user=self.user).values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+
+    def test_deep_page_costs_the_same_as_first_page(self):
+        first_page = self.client.get(READING_SESSION_URL, {"cursor": ""})
+        second_page_url = first_page.data["next"]
+
+        # No COUNT query, only the seek on the indexed id
+        with self.assertNumQueries(1):
+            self.client.get(READING_SESSION_URL, {"cursor": ""})
+        with self.assertNumQueries(1):
+            self.client.get(second_page_url)
+
+    def test_page_number_pagination_is_default(self):
+        response = self.client.get(BOOK_URL, {"page": 2})
+
+        self.assertEqual(response.data["count"], len(self.books))
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(BOOK_URL, {"cursor": "invalid"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
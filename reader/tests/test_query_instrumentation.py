@@ -0,0 +1,160 @@
+import asyncio
+import json
+import re
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reader.middleware import QueryBudgetExceeded
+from reader.models import Book, ReadingSession
+
+BOOK_URL = reverse("reader:book-list")
+READING_SESSION_URL = reverse("reader:reading-session-list")
+PROFILE_URL = reverse("reader:profile-list")
+
+
+def server_timing_queries(response):
+    return int(re.search(r'desc="(\d+) queries"', response["Server-Timing"])[1])
+
+
+class QueryInstrumentationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user=self.user)
+        Book.objects.create(title="Book", year_of_publishing=2000)
+
+    def test_server_timing_header(self):
+        response = self.client.get(BOOK_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="\d+ queries", total;dur=[\d.]+$',
+        )
+
+    def test_request_is_logged_as_json(self):
+        with self.assertLogs("reader.queries", "INFO") as logs:
+            self.client.get(BOOK_URL)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["view"], "BookViewSet.list")
+        self.assertEqual(line["status"], status.HTTP_200_OK)
+        self.assertGreater(line["queries"], 0)
+        self.assertLessEqual(len(line["slowest"]), line["queries"])
+
+    @override_settings(QUERY_BUDGETS={"BookViewSet.list": 0})
+    def test_exceeded_budget_raises_when_strict(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(BOOK_URL)
+
+    @override_settings(QUERY_BUDGETS={"BookViewSet.list": 0}, QUERY_BUDGET_STRICT=False)
+    def test_exceeded_budget_is_logged(self):
+        with self.assertLogs("reader.queries", "WARNING") as logs:
+            response = self.client.get(BOOK_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["budget"], 0)
+        self.assertEqual(line["view"], "BookViewSet.list")
+
+    def assertQueriesWithinBudget(self, response, view):
+        # Budgets leave a margin of one query over the measured cost
+        request = getattr(response, "asgi_request", None) or response.wsgi_request
+        queries = request.query_recorder.count
+        self.assertLessEqual(queries, settings.QUERY_BUDGETS[view])
+        self.assertGreaterEqual(queries, settings.QUERY_BUDGETS[view] - 1)
+
+    def test_reading_session_budgets_match_their_cost(self):
+        # The costliest start, the first session of a book while another
+        # session is active, authenticated like the clients
+        ReadingSession.objects.start(
+            user=self.user,
+            book=Book.objects.create(title="Other Book", year_of_publishing=2001),
+        )
+        self.client.force_authenticate(None)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+        response = self.client.post(
+            READING_SESSION_URL, {"book": Book.objects.get(title="Book").id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertQueriesWithinBudget(response, "ReadingSessionViewSet.create")
+
+        response = self.client.post(
+            reverse("reader:reading-session-stop-reading", args=[response.data["id"]])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertQueriesWithinBudget(response, "ReadingSessionViewSet.stop_reading")
+
+    def test_async_reading_session_budgets_match_their_cost(self):
+        ReadingSession.objects.start(
+            user=self.user,
+            book=Book.objects.create(title="Other Book", year_of_publishing=2001),
+        )
+        client = AsyncClient()
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        book_id = Book.objects.get(title="Book").id
+
+        response = async_to_sync(client.post)(
+            reverse("reader:async-reading-session-list"),
+            {"book": book_id},
+            content_type="application/json",
+            headers=headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertQueriesWithinBudget(response, "AsyncReadingSessionViewSet.create")
+
+        response = async_to_sync(client.post)(
+            reverse(
+                "reader:async-reading-session-stop-reading",
+                args=[response.json()["id"]],
+            ),
+            headers=headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertQueriesWithinBudget(
+            response, "AsyncReadingSessionViewSet.stop_reading"
+        )
+
+        response = async_to_sync(client.get)(
+            reverse("reader:async-reading-session-list"), headers=headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertQueriesWithinBudget(response, "AsyncReadingSessionViewSet.list")
+
+    @override_settings(
+        # The toolbar is sync only, the middleware runs async without it
+        MIDDLEWARE=[
+            middleware
+            for middleware in settings.MIDDLEWARE
+            if not middleware.startswith("debug_toolbar.")
+        ]
+    )
+    def test_concurrent_asgi_requests_count_their_own_queries(self):
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+        @async_to_sync
+        async def get_profiles(number):
+            client = AsyncClient()
+            return await asyncio.gather(
+                *(client.get(PROFILE_URL, headers=headers) for _ in range(number))
+            )
+
+        queries = server_timing_queries(get_profiles(1)[0])
+        self.assertGreater(queries, 0)
+        self.assertEqual(
+            [server_timing_queries(response) for response in get_profiles(6)],
+            [queries] * 6,
+        )
@@ -1,7 +1,9 @@
 from datetime import timedelta
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
@@ -15,6 +17,10 @@ def detail_url(reading_session_id: int):
     return reverse("reader:reading-session-detail", args=[reading_session_id])
 
 
+def stop_reading_url(reading_session_id: int):
+    return reverse("reader:reading-session-stop-reading", args=[reading_session_id])
+
+
 class ReadingSessionTestsAuthenticated(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -136,3 +142,109 @@ class ReadingSessionMethodsTests(TestCase):
         self.assertEqual(updated_end_time, initial_end_time)
 
 
+class ReadingSessionLifecycleTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.book = Book.objects.create(
+            title="Sample Book",
+            author="Sample Author",
+            year_of_publishing=2022,
+        )
+
+        # Reading history must not make starting or stopping more expensive
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(20):
+                ReadingSession.objects.create(
+                    user=self.user,
+                    book=self.book,
+                    start_time=now,
+                    end_time=now + timedelta(minutes=30),
+                )
+
+    def start_and_stop(self):
+        # The profile is rebuilt after the commit, outside of the request
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as start_queries:
+                response = self.client.post(READING_SESSION_URL, {"book": self.book.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as stop_queries:
+                self.client.post(stop_reading_url(response.data["id"]))
+
+        return response.data["id"], len(start_queries), len(stop_queries)
+
+    def test_start_and_stop_cost_bounded_number_of_queries(self):
+        _, start_queries, stop_queries = self.start_and_stop()
+
+        # Starting includes the savepoint queries of the start transaction
+        self.assertLessEqual(start_queries, 8)
+        # Stopping also adds the reading time to the daily rollup
+        self.assertLessEqual(stop_queries, 6)
+
+        # The cost stays the same no matter how long the history is
+        self.assertEqual(self.start_and_stop()[1:], (start_queries, stop_queries))
+
+    def test_profile_updated_by_lifecycle_handler(self):
+        session_id, _, _ = self.start_and_stop()
+        session = ReadingSession.objects.get(id=session_id)
+        profile = Profile.objects.get(user=self.user)
+        self.book.refresh_from_db()
+
+        self.assertEqual(
+            profile.number_of_reading_sessions,
+            ReadingSession.objects.filter(user=self.user).count(),
+        )
+        self.assertEqual(profile.last_activity, session.start_time)
+        self.assertEqual(profile.last_book_read, self.book)
+        self.assertEqual(
+            profile.total_reading_time,
+            sum(
+                (
+                    session.calculate_duration()
+                    for session in ReadingSession.objects.filter(user=self.user)
+                ),
+                timedelta(),
+            ),
+        )
+        self.assertEqual(
+            self.book.last_time_read,
+            max(session.end_time for session in ReadingSession.objects.all()),
+        )
+
+    def test_stop_completed_session(self):
+        session = ReadingSession.objects.filter(user=self.user).first()
+
+        response = self.client.post(stop_reading_url(session.id))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            Profile.objects.get(user=self.user).number_of_reading_sessions, 20
+        )
+
+    def test_stop_session_of_other_user(self):
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword",
+        )
+        session = ReadingSession.objects.start(user=other_user, book=self.book)
+
+        response = self.client.post(stop_reading_url(session.id))
+        session.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNone(session.end_time)
+
+    def test_stop_session_with_invalid_id(self):
+        session = ReadingSession.objects.start(user=self.user, book=self.book)
+
+        for pk in ("abc", "\u00b2", "\u0660\u0660", str(2**63)):
+            response = self.client.post(stop_reading_url(pk))
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, pk)
+
+        session.refresh_from_db()
+        self.assertIsNone(session.end_time)
@@ -0,0 +1,107 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from reader.models import Book, ReadingSession
+from reader.search import (
+    get_inverted_index,
+    search_books,
+    trigram_installed,
+    word_similarity,
+)
+
+BOOK_URL = reverse("reader:book-list")
+
+
+class BookSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.hobbit = Book.objects.create(
+            title="The Hobbit",
+            author="J. R. R. Tolkien",
+            year_of_publishing=1937,
+            short_description="A hobbit leaves home for an adventure",
+        )
+        self.animal_farm = Book.objects.create(
+            title="Animal Farm",
+            author="George Orwell",
+            year_of_publishing=1945,
+            short_description="The animals take over the farm",
+            long_description="No hobbit in sight",
+        )
+        self.nineteen_eighty_four = Book.objects.create(
+            title="Nineteen Eighty-Four",
+            author="George Orwell",
+            year_of_publishing=1949,
+        )
+
+    def search(self, term):
+        response = self.client.get(BOOK_URL, {"search": term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book["id"] for book in response.data["results"]]
+
+    def test_matches_in_the_title_rank_first(self):
+        self.assertEqual(self.search("hobbit"), [self.hobbit.id, self.animal_farm.id])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.search("orwell farm"), [self.animal_farm.id])
+        self.assertEqual(
+            self.search("George Orwell"),
+            [self.animal_farm.id, self.nineteen_eighty_four.id],
+        )
+        self.assertEqual(self.search("hobbit eighty"), [])
+
+    def test_empty_search_lists_every_book(self):
+        self.assertEqual(len(self.search("  ")), 3)
+
+    def test_misspelled_authors_are_found(self):
+        if connection.vendor == "postgresql" and not trigram_installed(connection):
+            self.skipTest("The pg_trgm extension is not installed")
+
+        self.assertEqual(self.search("tolkin"), [self.hobbit.id])
+        self.assertEqual(
+            self.search("orwel"),
+            [self.animal_farm.id, self.nineteen_eighty_four.id],
+        )
+
+    def test_new_books_are_found(self):
+        self.assertEqual(self.search("silmarillion"), [])
+
+        book = Book.objects.create(title="The Silmarillion", year_of_publishing=1977)
+
+        self.assertEqual(search_books(Book.objects.all(), "silmarillion")[0], book)
+
+    def test_reading_does_not_rebuild_the_inverted_index(self):
+        index = get_inverted_index("default")
+
+        session = ReadingSession.objects.create(user=self.user, book=self.hobbit)
+        ReadingSession.objects.stop(session.id, self.user.id)
+        self.assertIs(get_inverted_index("default"), index)
+
+        self.hobbit.title = "The Hobbit, or There and Back Again"
+        self.hobbit.save()
+        self.assertIsNot(get_inverted_index("default"), index)
+
+    def test_word_similarity(self):
+        self.assertAlmostEqual(word_similarity("tolkin", "J. R. R. Tolkien"), 5 / 7)
+        self.assertEqual(word_similarity("", "Tolkien"), 0.0)
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN output is PostgreSQL specific")
+class BookSearchIndexTests(TestCase):
+    def test_search_uses_the_gin_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = search_books(Book.objects.all(), "hobbit adventure").explain()
+
+        self.assertIn("book_search_idx", plan)
@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from reader.models import Book, Profile, ReadingSession
+
+
+class SeedReadingDataTests(TestCase):
+    def seed(self, *args):
+        call_command(
+            "seed_reading_data",
+            "--users=20",
+            "--books=10",
+            "--sessions=5",
+            "--chunk-size=7",
+            *args,
+            stdout=StringIO(),
+        )
+
+    def test_seed_reading_data(self):
+        self.seed("--no-copy")
+        # The default is COPY on PostgreSQL
+        self.seed()
+
+        self.assertEqual(get_user_model().objects.count(), 40)
+        self.assertEqual(Profile.objects.count(), 40)
+        self.assertEqual(Book.objects.count(), 20)
+        self.assertTrue(ReadingSession.objects.exists())
+
+        # The id sequences continue after the seeded rows
+        user = get_user_model().objects.create_user(email="new@example.com")
+        self.assertTrue(Profile.objects.filter(user=user).exists())
+        Book.objects.create(title="New", year_of_publishing=2000)
+
+    def test_sessions_are_finished_and_do_not_overlap(self):
+        self.seed()
+
+        previous = {}
+        for session in ReadingSession.objects.order_by("user", "start_time"):
+            self.assertLess(session.start_time, session.end_time)
+            if session.user_id in previous:
+                self.assertLessEqual(previous[session.user_id], session.start_time)
+            previous[session.user_id] = session.end_time
+
+        for profile in Profile.objects.all():
+            self.assertEqual(
+                profile.number_of_reading_sessions,
+                ReadingSession.objects.filter(user=profile.user_id).count(),
+            )
+
+    def test_seed_is_reproducible(self):
+        def seeded_rows():
+            return (
+                list(Book.objects.order_by("id").values_list("title", "author")),
+                list(
+                    get_user_model()
+                    .objects.order_by("id")
+                    .values_list("first_name", "last_name")
+                ),
+            )
+
+        self.seed("--seed=7")
+        first = seeded_rows()
+        Book.objects.all().delete()
+        get_user_model().objects.all().delete()
+
+        self.seed("--seed=7")
+        self.assertEqual(first, seeded_rows())
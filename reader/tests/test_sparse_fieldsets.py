@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from reader.models import Book, ReadingSession
+
+BOOK_URL = reverse("reader:book-list")
+READING_SESSION_URL = reverse("reader:reading-session-list")
+
+
+def detail_url(book_id: int):
+    return reverse("reader:book-detail", args=[book_id])
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(self.user)
+        self.book = Book.objects.create(
+            title="Book",
+            author="Author",
+            year_of_publishing=2000,
+            short_description="Short",
+            long_description="Long",
+        )
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, " ".join(query["sql"] for query in queries)
+
+    def test_list_with_fields(self):
+        response, sql = self.get(BOOK_URL, {"fields": "title,author,unknown"})
+
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.book.id, "title": "Book", "author": "Author"}],
+        )
+        self.assertNotIn("description", sql)
+        self.assertNotIn("stats", sql)
+
+        # Cached pages keep the fieldset
+        response = self.client.get(BOOK_URL, {"fields": "title,author,unknown"})
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(set(response.data["results"][0]), {"id", "title", "author"})
+
+    def test_list_with_omitted_fields(self):
+        response, sql = self.get(
+            BOOK_URL, {"omit": "id,short_description,total_reading_time_for_user"}
+        )
+
+        self.assertEqual(
+            set(response.data["results"][0]),
+            {
+                "id",
+                "title",
+                "author",
+                "year_of_publishing",
+                "last_time_read",
+                "total_number_of_reading_sessions_for_all_users",
+                "total_reading_time_for_all_users",
+            },
+        )
+        self.assertNotIn("description", sql)
+        self.assertNotIn("user_stats", sql)
+
+    def test_detail_fieldsets_are_cached_apart(self):
+        response, sql = self.get(detail_url(self.book.id), {"fields": "title"})
+        self.assertEqual(response.data, {"id": self.book.id, "title": "Book"})
+        self.assertNotIn("long_description", sql)
+
+        response = self.client.get(detail_url(self.book.id))
+        self.assertEqual(response.data["long_description"], "Long")
+        self.assertIn("total_reading_time_for_user", response.data)
+
+    def test_reading_sessions_with_fields(self):
+        reading_session = ReadingSession.objects.create(user=self.user, book=self.book)
+
+        response, _ = self.get(READING_SESSION_URL, {"fields": "book,duration"})
+
+        self.assertEqual(
+            response.data["results"],
+            [{"id": reading_session.id, "book": self.book.id, "duration": None}],
+        )
+
+    def test_writes_keep_every_field(self):
+        response = self.client.post(
+            f"{READING_SESSION_URL}?fields=id", {"book": self.book.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["book"], self.book.id)
@@ -0,0 +1,97 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from reader.models import Book, Profile, ReadingSession
+from reader.tasks import rebuild_profile, schedule_profile_rebuild
+
+
+class ProfileRebuildTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.book = Book.objects.create(title="Book", year_of_publishing=2000)
+        # Scheduled rebuilds are remembered in the cache
+        self.addCleanup(cache.clear)
+
+    @override_settings(PROFILE_REBUILD_DELAY=30)
+    def test_events_are_coalesced_until_the_task_starts(self):
+        with mock.patch.object(rebuild_profile, "apply_async") as apply_async:
+            for _ in range(3):
+                schedule_profile_rebuild(self.user.id)
+
+            apply_async.assert_called_once_with((self.user.id,), countdown=30)
+
+            rebuild_profile(self.user.id)
+            schedule_profile_rebuild(self.user.id)
+
+        self.assertEqual(apply_async.call_count, 2)
+
+    def test_events_of_a_transaction_schedule_one_rebuild(self):
+        now = timezone.now()
+        with mock.patch.object(rebuild_profile, "apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                for hours in range(3):
+                    ReadingSession.objects.create(
+                        user=self.user,
+                        book=self.book,
+                        start_time=now - timedelta(hours=hours + 1),
+                        end_time=now - timedelta(hours=hours),
+                    )
+
+        apply_async.assert_called_once()
+        rebuild_profile(self.user.id)
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.number_of_reading_sessions, 3)
+        self.assertEqual(profile.number_of_completed_sessions, 3)
+        self.assertEqual(profile.total_reading_time, timedelta(hours=3))
+        self.assertEqual(profile.last_book_read, self.book)
+        self.assertIsNotNone(profile.stats_updated_at)
+
+    def test_profile_is_updated_without_a_broker(self):
+        conf = rebuild_profile.app.conf
+        conf.task_always_eager = False
+        self.addCleanup(setattr, conf, "task_always_eager", True)
+        now = timezone.now()
+
+        with mock.patch.object(rebuild_profile, "apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                session = ReadingSession.objects.create(
+                    user=self.user, book=self.book, start_time=now - timedelta(hours=1)
+                )
+                ReadingSession.objects.stop(session.id, self.user.id, end_time=now)
+
+        apply_async.assert_not_called()
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.number_of_reading_sessions, 1)
+        self.assertEqual(profile.number_of_completed_sessions, 1)
+        self.assertEqual(profile.total_reading_time, timedelta(hours=1))
+        self.assertEqual(profile.last_book_read, self.book)
+        self.assertEqual(profile.last_activity, session.start_time)
+
+    def test_profile_is_not_rebuilt_when_rolled_back(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                ReadingSession.objects.create(user=self.user, book=self.book)
+                raise RuntimeError
+
+        self.assertEqual(callbacks, [])
+
+    def test_stats_as_of_is_exposed(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            ReadingSession.objects.create(user=self.user, book=self.book)
+
+        response = client.get(reverse("reader:profile-list"))
+
+        self.assertIsNotNone(response.data[0]["stats_updated_at"])
@@ -0,0 +1,151 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from reader.models import Book, ReadingSession, UserBookStats
+
+BOOK_URL = reverse("reader:book-list")
+READING_HISTORY_URL = reverse("reader:profile-books")
+
+
+def sample_book(**params):
+    defaults = {
+        "title": "Sample Book",
+        "author": "Sample Author",
+        "year_of_publishing": 2022,
+    }
+    defaults.update(params)
+
+    return Book.objects.create(**defaults)
+
+
+class UserBookStatsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.book = sample_book()
+
+    def test_stats_updated_on_start_and_stop(self):
+        session = ReadingSession.objects.create(user=self.user, book=self.book)
+        stats = UserBookStats.objects.get(user=self.user, book=self.book)
+        self.assertEqual(stats.number_of_reading_sessions, 1)
+        self.assertEqual(stats.total_reading_time, timedelta())
+
+        session.stop_reading()
+        stats.refresh_from_db()
+
+        self.assertEqual(stats.total_reading_time, session.calculate_duration())
+        self.assertEqual(stats.last_time_read, session.end_time)
+        self.assertFalse(UserBookStats.objects.filter(user=self.other_user).exists())
+
+    def test_book_list_reads_current_user_stats(self):
+        now = timezone.now()
+        for user, hours in ((self.user, 1), (self.other_user, 5)):
+            ReadingSession.objects.create(
+                user=user,
+                book=self.book,
+                start_time=now,
+                end_time=now + timedelta(hours=hours),
+            )
+
+        response = self.client.get(BOOK_URL)
+        book = response.data["results"][0]
+
+        self.assertEqual(
+            book["total_reading_time_for_user"],
+            self.book.total_reading_time_for_user(self.user),
+        )
+        self.assertEqual(
+            book["total_reading_time_for_all_users"],
+            self.book.total_reading_time_for_all_users(),
+        )
+
+    def test_rebuild_user_book_stats(self):
+        ReadingSession.objects.create(
+            user=self.user,
+            book=self.book,
+            end_time=timezone.now() + timedelta(hours=1),
+        )
+        UserBookStats.objects.filter(user=self.user).update(
+            total_reading_time=timedelta(days=1)
+        )
+
+        call_command("rebuild_book_stats", stdout=StringIO())
+
+        stats = UserBookStats.objects.get(user=self.user, book=self.book)
+        self.assertEqual(
+            stats.total_reading_time, self.book.total_reading_time_for_user(self.user)
+        )
+
+
+class ReadingHistoryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="testuser@example.com",
+            password="testpassword",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpassword",
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.books = [sample_book(title=f"Book {i}") for i in range(5)]
+        for book in self.books:
+            ReadingSession.objects.create(user=self.user, book=book)
+        ReadingSession.objects.create(user=self.other_user, book=self.books[0])
+
+    def test_reading_history_only_contains_own_books(self):
+        response = self.client.get(READING_HISTORY_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["book"] for row in response.data["results"]],
+            # Starting a session stops the previous one, the open session of
+            # the last book has not been completed yet
+            [self.books[i].id for i in (3, 2, 1, 0, 4)],
+        )
+        self.assertNotIn("count", response.data)
+
+    def test_reading_history_keyset_pagination(self):
+        first_page = self.client.get(READING_HISTORY_URL, {"page_size": 3})
+        second_page = self.client.get(first_page.data["next"])
+
+        self.assertEqual(len(first_page.data["results"]), 3)
+        self.assertEqual(len(second_page.data["results"]), 2)
+        self.assertIsNone(second_page.data["next"])
+        self.assertEqual(second_page.data["results"][-1]["title"], "Book 4")
+
+    def test_reading_history_most_recently_read_first(self):
+        now = timezone.now()
+        stats = UserBookStats.objects.filter(user=self.user)
+        stats.update(last_time_read=None)
+        for hours_ago, index in ((3, 2), (2, 0), (1, 4)):
+            stats.filter(book=self.books[index]).update(
+                last_time_read=now - timedelta(hours=hours_ago)
+            )
+
+        books = []
+        url, params = READING_HISTORY_URL, {"page_size": 2}
+        while url:
+            response = self.client.get(url, params)
+            books += [row["book"] for row in response.data["results"]]
+            url, params = response.data["next"], None
+
+        # Books without a completed session last, the newest first
+        self.assertEqual(books, [self.books[i].id for i in (4, 0, 2, 3, 1)])
@@ -0,0 +1,56 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase
+
+
+class WaitForDbTests(TestCase):
+    def call(self, *args):
+        stdout = StringIO()
+        call_command("wait_for_db", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_ready(self):
+        output = self.call("--once", "--migrated")
+        self.assertIn("Database default answered in", output)
+        self.assertIn("Successfully connected", output)
+
+    def test_unavailable(self):
+        with mock.patch.object(
+            connection, "cursor", side_effect=OperationalError
+        ), mock.patch.object(connection, "close"):
+            with self.assertRaisesMessage(
+                CommandError, "Database default is unavailable"
+            ):
+                self.call("--once")
+
+    def test_unapplied_migrations(self):
+        with mock.patch.object(
+            MigrationExecutor, "migration_plan", return_value=[object()]
+        ):
+            self.call("--once")
+            with self.assertRaisesMessage(CommandError, "1 unapplied migrations"):
+                self.call("--once", "--migrated")
+
+    def test_waits_until_ready(self):
+        with mock.patch(
+            "reader.management.commands.wait_for_db.Command.check",
+            side_effect=["Database default is unavailable", None],
+        ), mock.patch("time.sleep") as sleep:
+            output = self.call("--interval", "1")
+        sleep.assert_called_once_with(1)
+        self.assertIn("Database default is unavailable, please wait ...", output)
+        self.assertIn("Successfully connected", output)
+
+    def test_timeout(self):
+        with mock.patch(
+            "reader.management.commands.wait_for_db.Command.check",
+            return_value="Database default is unavailable",
+        ), mock.patch("time.sleep"):
+            with self.assertRaisesMessage(
+                CommandError, "Database default is unavailable"
+            ):
+                self.call("--timeout", "1", "--interval", "2")
@@ -1,12 +1,26 @@
+from django.urls import path
 from rest_framework import routers
-from .views import BookViewSet, ReadingSessionViewSet, ProfileViewSet
+from .async_views import AsyncReadingSessionViewSet
+from .views import BookViewSet, ReadingSessionViewSet, ProfileViewSet, ReaderViewSet
 
 router = routers.DefaultRouter()
 router.register(r"books", BookViewSet, basename="book")
 router.register(r"reading-sessions", ReadingSessionViewSet, basename="reading-session")
 router.register(r"profile", ProfileViewSet, basename="profile")
+router.register(r"readers", ReaderViewSet, basename="reader")
 
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path(
+        "async/reading-sessions/",
+        AsyncReadingSessionViewSet.as_view({"get": "list", "post": "create"}),
+        name="async-reading-session-list",
+    ),
+    path(
+        "async/reading-sessions/<pk>/stop_reading/",
+        AsyncReadingSessionViewSet.as_view({"post": "stop_reading"}),
+        name="async-reading-session-stop-reading",
+    ),
+]
 
 app_name = "reader"
@@ -1,39 +1,513 @@
-from django.utils import timezone
+from datetime import timedelta
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import (
+    BigIntegerField,
+    DateField,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    FilteredRelation,
+    Q,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Trunc
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from rest_framework import viewsets, status, mixins
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from .models import Book, ReadingSession, Profile
+from . import cache as book_cache
+from . import leaderboards
+from .activity import periods
+from .filters import (
+    STATS_ANNOTATIONS,
+    BookFilter,
+    BookOrderingFilter,
+    BookSearchFilter,
+)
+from .importers import guess_format, import_books, iter_file_rows
+from .models import (
+    Book,
+    DailyReading,
+    Leaderboard,
+    ReadingSession,
+    Profile,
+    UserBookStats,
+    last_read,
+)
+from .pagination import Pagination, ReadingHistoryPagination
 from .permissions import IsAdminOrIfAuthentificatedReadOnly
+from .renderers import CSVRenderer, FastJSONRenderer, JSONLinesRenderer
+from .rows import ValuesSerializer, iterate_chunks
 from .serializers import (
+    ActivityQuerySerializer,
+    ActivitySerializer,
     BookSerializer,
+    ReadingSessionBulkSerializer,
     ReadingSessionSerializer,
     BookDetailSerializer,
+    BookImportSerializer,
+    LeaderboardQuerySerializer,
     ProfileSerializer,
+    TopBookSerializer,
+    TopReaderSerializer,
+    UserBookStatsSerializer,
 )
 
 
-class Pagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = "page_size"
-    max_page_size = 100
+def activity_response(request, rows):
+    """
+    Sum the daily reading rows per day, week or month of the requested
+    range, periods without reading are included with a zero reading time.
+    """
+    query = ActivityQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    granularity = query.validated_data["granularity"]
+    start = query.validated_data["start"]
+    end = query.validated_data["end"]
+
+    totals = dict(
+        rows.filter(day__range=(start, end))
+        .annotate(period=Trunc("day", granularity, output_field=DateField()))
+        .values("period")
+        .annotate(total=Sum("reading_time"))
+        .values_list("period", "total")
+    )
+    serializer = ActivitySerializer(
+        [
+            {"period": period, "reading_time": totals.get(period, timedelta())}
+            for period in periods(start, end, granularity)
+        ],
+        many=True,
+    )
+    return Response(
+        {
+            "granularity": granularity,
+            "start": start,
+            "end": end,
+            "results": serializer.data,
+        }
+    )
+
+
+def leaderboard_response(request, board, serializer_class):
+    """
+    Serve the top rows of a materialized leaderboard, the ETag changes with
+    every refresh so clients revalidate instead of downloading it again.
+    """
+    query = LeaderboardQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    by = query.validated_data["by"]
+    window = query.validated_data["window"]
+    limit = query.validated_data["limit"]
+
+    refreshed_at = leaderboards.refreshed_at()
+    version = refreshed_at.timestamp() if refreshed_at else 0
+    etag = quote_etag(f"{board}-{by}-{window}-{limit}-{version}")
+    last_modified = int(version) if refreshed_at else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        rows = Leaderboard.objects.filter(
+            board=board, window=window, ranking=by
+        ).select_related(Leaderboard.board_key(board))[:limit]
+        response = Response(
+            {
+                "by": by,
+                "window": window,
+                "refreshed_at": refreshed_at,
+                "results": serializer_class(rows, many=True).data,
+            }
+        )
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified)
+
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, versions, get_response):
+    """
+    Respond with 304 Not Modified when the client has the representation of
+    the versions. The ETag hashes them with the URL and the format, the
+    Last-Modified is the time of the latest version.
+    """
+    if not settings.SHARED_CACHE:
+        # The versions bumped by the other processes are not seen here
+        return get_response()
+
+    etag, last_modified, response = check_conditional_request(request, versions)
+    if response is not None:
+        return add_validators(response, etag)
 
+    response = get_response()
+    if response.status_code != status.HTTP_200_OK:
+        return response
+    return add_validators(response, etag, last_modified)
+
+
+async def aconditional_response(request, versions, get_response):
+    # conditional_response of an async get_response
+    if not settings.SHARED_CACHE:
+        return await get_response()
+
+    etag, last_modified, response = check_conditional_request(request, versions)
+    if response is not None:
+        return add_validators(response, etag)
+
+    response = await get_response()
+    if response.status_code != status.HTTP_200_OK:
+        return response
+    return add_validators(response, etag, last_modified)
+
+
+def check_conditional_request(request, versions):
+    """
+    The ETag and the Last-Modified of the versions, and the response to the
+    conditional request if the client has the representation already.
+    """
+    etag = book_cache.etag(
+        request.get_full_path(), request.accepted_renderer.format, *versions
+    )
+    last_modified = book_cache.version_time(*versions)
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified and int(last_modified)
+    )
+    return etag, last_modified, response
+
+
+def add_validators(response, etag, last_modified=None):
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class UserConditionalMixin:
+    """
+    Conditional GET of the resources of the current user, they change with
+    the version of the user.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            partial(super().list, request, *args, **kwargs)
+        )
 
-class BookViewSet(viewsets.ModelViewSet):
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            partial(super().retrieve, request, *args, **kwargs)
+        )
+
+    def conditional_response(self, get_response):
+        return conditional_response(
+            self.request, book_cache.user_versions(self.request.user.id), get_response
+        )
+
+
+async def iterate_async(chunks):
+    # One chunk at a time in the thread of the sync view, the cursor and its
+    # connection belong to it
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
+
+
+class ValuesListMixin:
+    """
+    List JSON rows read with .values() and converted by a ValuesSerializer,
+    the same bytes as the serializer gives without its per row overhead.
+    Other formats, e.g. the browsable API, are serialized as usual.
+    """
+
+    # Annotations of the SerializerMethodFields, see ValuesSerializer
+    values_method_fields = {}
+
+    def list(self, request, *args, **kwargs):
+        if not self.lists_values():
+            return super().list(request, *args, **kwargs)
+
+        rows, queryset = self.get_values_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(rows.convert(queryset))
+        return self.get_paginated_response(rows.convert(page))
+
+    def lists_values(self):
+        return (
+            settings.FAST_JSON_LISTS and self.request.accepted_renderer.format == "json"
+        )
+
+    def get_values_queryset(self, queryset):
+        """
+        The ValuesSerializer of the rows and the .values() queryset it reads.
+        """
+        rows = ValuesSerializer(self.get_serializer(), self.values_method_fields)
+        # The keyset pagination reads its position from the rows
+        ordering = self.paginator.cursor_pagination_class().get_ordering(
+            self.request, queryset, self
+        )
+        return rows, rows.values(queryset, *(term.lstrip("-") for term in ordering))
+
+
+class BookViewSet(ValuesListMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     pagination_class = Pagination
     permission_classes = (IsAdminOrIfAuthentificatedReadOnly,)
+    filter_backends = (BookSearchFilter, BookFilter, BookOrderingFilter)
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
+    max_import_errors = 100
+    values_method_fields = {
+        "total_reading_time_for_user": ("annotated_total_reading_time_for_user", None),
+        "total_number_of_reading_sessions_for_all_users": (
+            "annotated_total_number_of_reading_sessions_for_all_users",
+            STATS_ANNOTATIONS[
+                "annotated_total_number_of_reading_sessions_for_all_users"
+            ],
+        ),
+        "total_reading_time_for_all_users": (
+            "annotated_total_reading_time_for_all_users",
+            STATS_ANNOTATIONS["annotated_total_reading_time_for_all_users"],
+        ),
+    }
+
+    def get_queryset(self):
+        queryset = self.queryset
+        fields = self.get_read_fields()
+        ordering = self.get_ordering_fields()
+
+        # The global stats and the stats of the current user are joined from
+        # their rollup tables, one row each per book, when they are read
+        if fields & {
+            "total_number_of_reading_sessions_for_all_users",
+            "total_reading_time_for_all_users",
+        }:
+            queryset = queryset.select_related("stats")
+        if "total_reading_time_for_user" in fields | ordering:
+            queryset = queryset.annotate(
+                current_user_stats=FilteredRelation(
+                    "user_stats", condition=Q(user_stats__user=self.request.user)
+                )
+            ).annotate(
+                annotated_total_reading_time_for_user=Coalesce(
+                    F("current_user_stats__total_reading_time"),
+                    Value(timedelta(), output_field=DurationField()),
+                )
+            )
+
+        # Columns that are not serialized, e.g. the long description of the
+        # list, are not loaded. The cursor reads the ordering field
+        return queryset.defer(
+            *(
+                field.attname
+                for field in Book._meta.concrete_fields
+                if not field.primary_key and field.name not in fields | ordering
+            )
+        )
+
+    def get_ordering_fields(self):
+        return {
+            term.strip().lstrip("-")
+            for term in self.request.query_params.get(
+                BookOrderingFilter.ordering_param, ""
+            ).split(",")
+        }
+
+    def get_read_fields(self):
+        # Every field is read by the other actions, their responses are
+        # not serialized with the book serializers or never sparse
+        if self.action not in ("list", "retrieve"):
+            return {field.name for field in Book._meta.concrete_fields} | {
+                "total_number_of_reading_sessions_for_all_users",
+                "total_reading_time_for_all_users",
+                "total_reading_time_for_user",
+            }
+        return {
+            name
+            for name, field in self.get_serializer().fields.items()
+            if not field.write_only
+        }
+
+    def get_sparse_fields(self):
+        query_params = self.request.query_params
+        if "fields" not in query_params and "omit" not in query_params:
+            return ()
+        return sorted(self.get_read_fields())
 
     def get_serializer_class(self):
         if self.action == "retrieve":
             return BookDetailSerializer
+        if self.action == "bulk":
+            return BookImportSerializer
         return BookSerializer
 
+    @action(detail=False, methods=["post"], parser_classes=(MultiPartParser,))
+    def bulk(self, request):
+        # Import a CSV or JSON Lines file of books, the file is streamed
+        # and inserted in batches
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        file = serializer.validated_data["file"]
+
+        file_format = serializer.validated_data.get("file_format") or guess_format(
+            file.name
+        )
+        if not file_format:
+            return Response(
+                {"file_format": ["Can not guess the format from the file name."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Only the first errors are reported, the count has all of them
+        errors = []
+
+        def on_error(row, row_errors):
+            if len(errors) < self.max_import_errors:
+                errors.append({"row": row, "errors": row_errors})
+
+        report = import_books(
+            iter_file_rows(file, file_format),
+            batch_size=serializer.validated_data["batch_size"],
+            on_error=on_error,
+        )
+        report["errors"] = errors
+        report["errors_omitted"] = report["failed"] - len(errors)
+
+        return Response(
+            report,
+            status=status.HTTP_201_CREATED if report["created"] else status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=["get"], serializer_class=ActivitySerializer)
+    def activity(self, request, pk=None):
+        # Reading time of all users, charted from the daily rollup
+        book = self.get_object()
+        return activity_response(request, DailyReading.objects.filter(book=book))
+
+    @action(
+        detail=False,
+        methods=["get"],
+        serializer_class=TopBookSerializer,
+        pagination_class=None,
+    )
+    def top(self, request):
+        # Most read books of the refreshed leaderboard
+        return leaderboard_response(request, Leaderboard.BOOKS, TopBookSerializer)
+
+    # The global fields of the books are cached for all users, the fields of
+    # the current user are merged into the cached data on every request.
+    # Pages ordered by the stats of the user are cached for that user only.
+    # Clients revalidate with the versions of the books and the user
+    def list(self, request, *args, **kwargs):
+        user_id = (
+            request.user.id
+            if "total_reading_time_for_user" in self.get_ordering_fields()
+            else None
+        )
+        return conditional_response(
+            request,
+            [
+                book_cache.catalogue_version(),
+                *book_cache.user_versions(request.user.id),
+            ],
+            partial(
+                self.cached_response,
+                book_cache.list_key(request, user_id),
+                super().list,
+                request,
+                *args,
+                **kwargs,
+            ),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        book_id = kwargs[self.lookup_field]
+        return conditional_response(
+            request,
+            [
+                book_cache.book_version(book_id),
+                *book_cache.user_versions(request.user.id),
+            ],
+            partial(
+                self.cached_response,
+                book_cache.detail_key(book_id, self.get_sparse_fields()),
+                super().retrieve,
+                request,
+                *args,
+                **kwargs,
+            ),
+        )
+
+    def cached_response(self, key, view, request, *args, **kwargs):
+        if not settings.SHARED_CACHE:
+            return view(request, *args, **kwargs)
+
+        data = book_cache.fetch(key)
+        if data is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                book_cache.store(key, self.without_user_fields(response.data))
+            response["X-Cache"] = "MISS"
+            return response
+
+        self.merge_user_fields(data)
+        response = Response(data)
+        response["X-Cache"] = "HIT"
+        return response
+
+    def get_rows(self, data):
+        return data["results"] if "results" in data else [data]
+
+    def without_user_fields(self, data):
+        data = data.copy()
+        rows = [row.copy() for row in self.get_rows(data)]
+        for row in rows:
+            for field in BookSerializer.user_fields:
+                if field in row:
+                    row[field] = None
+
+        if "results" in data:
+            data["results"] = rows
+        else:
+            data = rows[0]
+        return data
+
+    def merge_user_fields(self, data):
+        rows = [
+            row for row in self.get_rows(data) if "total_reading_time_for_user" in row
+        ]
+        if not rows:
+            return
+        user_stats = dict(
+            UserBookStats.objects.filter(
+                user=self.request.user, book_id__in=[row["id"] for row in rows]
+            ).values_list("book_id", "total_reading_time")
+        )
+        for row in rows:
+            row["total_reading_time_for_user"] = user_stats.get(row["id"], timedelta())
+
 
 class ReadingSessionViewSet(
+    UserConditionalMixin,
+    ValuesListMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
@@ -41,46 +515,166 @@ class ReadingSessionViewSet(
 ):
     serializer_class = ReadingSessionSerializer
     pagination_class = Pagination
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
+    values_method_fields = {
+        "duration": (
+            "annotated_duration",
+            ExpressionWrapper(
+                F("end_time") - F("start_time"), output_field=DurationField()
+            ),
+        ),
+    }
 
     def get_queryset(self):
         return ReadingSession.objects.filter(user=self.request.user).select_related(
             "book"
         )
 
-    def create(self, request, *args, **kwargs):
-        # Check if the user already has an active session and stop it
-        active_sessions = ReadingSession.objects.filter(
-            user=request.user, end_time=None
+    def get_serializer_class(self):
+        if self.action == "bulk":
+            return ReadingSessionBulkSerializer
+        return ReadingSessionSerializer
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        # Completed sessions synced from offline devices, inserted together
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False
         )
-        if active_sessions.exists():
-            active_sessions.first().stop_reading()
+        serializer.is_valid(raise_exception=True)
+        reading_sessions = serializer.save()
 
-        return super().create(request, *args, **kwargs)
+        return Response(
+            ReadingSessionSerializer(reading_sessions, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
 
     @action(detail=True, methods=["post"])
     def stop_reading(self, request, pk=None):
-        reading_session = self.get_object()
+        # Stop the session with one conditional UPDATE, it is only loaded
+        # when it could not be stopped
+        reading_session = ReadingSession.objects.stop(
+            self.get_session_id(pk), user_id=request.user.id
+        )
 
-        # Check if the reading session has already been completed
-        if reading_session.end_time:
+        if reading_session is None:
+            # Responds with 404 if the session does not exist
+            self.get_object()
             return Response(
                 {"detail": "Reading session has already been completed."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        reading_session.end_time = timezone.now()
-        reading_session.save()
-
-        # Update the number_of_reading_sessions in the associated Profile
-        reading_session.user.profile.update_reading_sessions_count()
-
         serializer = ReadingSessionSerializer(reading_session)
         return Response(serializer.data)
 
+    @staticmethod
+    def get_session_id(pk):
+        # The raw UPDATE fails on ids that are not integers in the range of
+        # the bigint column, e.g. superscript digits, no such session exists
+        try:
+            session_id = int(pk)
+            if not 0 < session_id <= BigIntegerField.MAX_BIGINT:
+                raise ValueError(pk)
+        except ValueError:
+            raise NotFound()
+        return session_id
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=(CSVRenderer, JSONLinesRenderer),
+        pagination_class=None,
+    )
+    def export(self, request):
+        # Full reading history of the authenticated user
+        return self.export_response(self.get_queryset(), "reading-sessions")
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="export/all",
+        renderer_classes=(CSVRenderer, JSONLinesRenderer),
+        pagination_class=None,
+        permission_classes=(IsAdminUser,),
+    )
+    def export_all(self, request):
+        # Sessions of every user, for the admins
+        return self.export_response(
+            ReadingSession.objects.all(), "reading-sessions-all"
+        )
+
+    def export_response(self, queryset, filename):
+        """
+        Stream the sessions in the requested format, read in chunks while
+        the response is consumed.
+        """
+        rows = ValuesSerializer(self.get_serializer(), self.values_method_fields)
+        queryset = rows.values(queryset.order_by("id"))
+        renderer = self.request.accepted_renderer
+
+        chunks = renderer.stream(
+            rows.iterate(iterate_chunks(queryset, settings.EXPORT_CHUNK_SIZE))
+        )
+        if isinstance(self.request._request, ASGIRequest):
+            # Django buffers sync iterators served under ASGI
+            chunks = iterate_async(chunks)
+
+        response = StreamingHttpResponse(
+            chunks,
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="{filename}.{renderer.format}"'
+        return response
+
 
-class ProfileViewSet(viewsets.ReadOnlyModelViewSet):
+class ProfileViewSet(UserConditionalMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = ProfileSerializer
 
     def get_queryset(self):
         # Only return the profile of the authenticated user
         return Profile.objects.filter(user=self.request.user)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        serializer_class=UserBookStatsSerializer,
+        pagination_class=ReadingHistoryPagination,
+    )
+    def books(self, request):
+        # Reading history of the authenticated user, one row per book
+        return self.conditional_response(self.reading_history)
+
+    def reading_history(self):
+        queryset = (
+            UserBookStats.objects.filter(user=self.request.user)
+            .annotate(last_read=last_read())
+            .select_related("book")
+        )
+        page = self.paginate_queryset(queryset)
+
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        serializer_class=ActivitySerializer,
+        pagination_class=None,
+    )
+    def activity(self, request):
+        # Reading time of the authenticated user, charted from the daily rollup
+        return activity_response(
+            request, DailyReading.objects.filter(user=request.user)
+        )
+
+
+class ReaderViewSet(GenericViewSet):
+    serializer_class = TopReaderSerializer
+
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def top(self, request):
+        # Readers with the most reading of the refreshed leaderboard
+        return leaderboard_response(request, Leaderboard.READERS, TopReaderSerializer)